@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+
+from app.settings import settings
+from app.time import utcnow
+
+
+SKIPPED_PREFIXES = ("/events/stream", "/ui", "/docs", "/openapi.json", "/redoc")
+RECORDED_HEADERS = ("content-type", "if-none-match", "last-event-id")
+
+
+class CaptureWriter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path: str | None = None
+        self._file = None
+
+    def write(self, path: str, record: dict) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._path != path:
+                if self._file is not None:
+                    self._file.close()
+                self._file = open(path, "a", encoding="utf-8")
+                self._path = path
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._file, self._path = None, None
+
+
+writer = CaptureWriter()
+
+
+def _decode(body: bytes) -> str | None:
+    if not body:
+        return None
+    try:
+        return body.decode()
+    except UnicodeDecodeError:
+        return None
+
+
+class TrafficCaptureMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = settings.traffic_capture_path
+        if not path or scope["type"] != "http" or scope["path"].startswith(SKIPPED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.traffic_capture_max_body_bytes
+        request_body = bytearray()
+        response_body = bytearray()
+        status = {"code": None}
+        started_at = utcnow()
+        start = time.perf_counter()
+
+        async def capture_receive():
+            message = await receive()
+            if message["type"] == "http.request" and len(request_body) <= limit:
+                request_body.extend(message.get("body", b""))
+            return message
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            elif message["type"] == "http.response.body" and scope["method"] == "POST" and len(response_body) <= limit:
+                response_body.extend(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+            record = {
+                "ts": started_at.isoformat(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode(),
+                "headers": {k: headers[k] for k in RECORDED_HEADERS if k in headers},
+                "body": _decode(bytes(request_body)) if len(request_body) <= limit else None,
+                "status": status["code"],
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            }
+            created_id = _created_id(bytes(response_body)) if len(response_body) <= limit else None
+            if created_id is not None:
+                record["response_id"] = created_id
+            writer.write(path, record)
+
+
+def _created_id(body: bytes) -> str | None:
+    if not body:
+        return None
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    if isinstance(data, dict) and isinstance(data.get("id"), str):
+        return data["id"]
+    return None
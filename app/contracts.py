@@ -0,0 +1,318 @@
+import datetime as dt
+from decimal import Decimal
+from typing import NamedTuple
+
+from app.money import q, q_rate
+
+
+DEPOSIT = "deposit_account"
+LOAN = "loan_account"
+
+RATE_UNITS = 1_000_000
+
+
+def to_cents(amount: Decimal | str) -> int:
+    return int(q(Decimal(amount)).scaleb(2))
+
+
+def to_rate_units(annual_rate: Decimal | str) -> int:
+    return int(q_rate(Decimal(annual_rate)).scaleb(6))
+
+
+def money(cents: int) -> str:
+    return str(Decimal(cents).scaleb(-2))
+
+
+def rate(units: int) -> str:
+    return str(Decimal(units).scaleb(-6))
+
+
+def interest_cents(balance: int, rate_units: int, days: int, day_count_basis: int) -> int:
+    # Exact integer form of q(balance * rate * days / basis): round half away from zero, like money.q.
+    numerator = balance * rate_units * days
+    denominator = day_count_basis * RATE_UNITS
+    magnitude = (2 * abs(numerator) + denominator) // (2 * denominator)
+    return magnitude if numerator >= 0 else -magnitude
+
+
+class LedgerRecord(NamedTuple):
+    account_type: str
+    account_id: str
+    effective_date: dt.date
+    txn_id: str
+    description: str
+    debit_account: str
+    credit_account: str
+    amount: int
+
+
+class EventRecord(NamedTuple):
+    aggregate_type: str
+    aggregate_id: str
+    event_type: str
+    payload: dict
+
+
+class Outcome(NamedTuple):
+    ledger: tuple[LedgerRecord, ...] = ()
+    events: tuple[EventRecord, ...] = ()
+
+
+NOTHING = Outcome()
+
+
+class DepositState:
+    __slots__ = ("account_id", "balance", "accrued", "rate", "day_count_basis", "last_accrual")
+
+    def __init__(
+        self,
+        account_id: str,
+        *,
+        balance: int,
+        accrued: int,
+        rate: int,
+        day_count_basis: int,
+        last_accrual: dt.date,
+    ):
+        self.account_id = account_id
+        self.balance = balance
+        self.accrued = accrued
+        self.rate = rate
+        self.day_count_basis = day_count_basis
+        self.last_accrual = last_accrual
+
+
+class LoanState:
+    __slots__ = ("account_id", "outstanding", "accrued", "rate", "day_count_basis", "last_accrual")
+
+    def __init__(
+        self,
+        account_id: str,
+        *,
+        outstanding: int,
+        accrued: int,
+        rate: int,
+        day_count_basis: int,
+        last_accrual: dt.date,
+    ):
+        self.account_id = account_id
+        self.outstanding = outstanding
+        self.accrued = accrued
+        self.rate = rate
+        self.day_count_basis = day_count_basis
+        self.last_accrual = last_accrual
+
+
+def open_deposit(
+    account_id: str, *, opened_on: dt.date, annual_rate: int, day_count_basis: int
+) -> tuple[DepositState, Outcome]:
+    state = DepositState(
+        account_id, balance=0, accrued=0, rate=annual_rate, day_count_basis=day_count_basis, last_accrual=opened_on
+    )
+    event = EventRecord(
+        DEPOSIT,
+        account_id,
+        "DEPOSIT_ACCOUNT_OPENED",
+        {
+            "opened_on": opened_on.isoformat(),
+            "annual_interest_rate": rate(annual_rate),
+            "day_count_basis": day_count_basis,
+        },
+    )
+    return state, Outcome(events=(event,))
+
+
+def deposit(state: DepositState, amount: int, *, effective_date: dt.date, ref: str) -> Outcome:
+    state.balance += amount
+    return Outcome(
+        (
+            LedgerRecord(
+                DEPOSIT,
+                state.account_id,
+                effective_date,
+                f"deposit:{ref}",
+                "Customer deposit",
+                "cash",
+                "customer_deposits",
+                amount,
+            ),
+        ),
+        (
+            EventRecord(
+                DEPOSIT,
+                state.account_id,
+                "DEPOSIT_POSTED",
+                {"amount": money(amount), "effective_date": effective_date.isoformat()},
+            ),
+        ),
+    )
+
+
+def withdraw(state: DepositState, amount: int, *, effective_date: dt.date, ref: str) -> Outcome:
+    if state.balance < amount:
+        raise ValueError("insufficient_funds")
+    state.balance -= amount
+    return Outcome(
+        (
+            LedgerRecord(
+                DEPOSIT,
+                state.account_id,
+                effective_date,
+                f"withdrawal:{ref}",
+                "Customer withdrawal",
+                "customer_deposits",
+                "cash",
+                amount,
+            ),
+        ),
+        (
+            EventRecord(
+                DEPOSIT,
+                state.account_id,
+                "WITHDRAWAL_POSTED",
+                {"amount": money(amount), "effective_date": effective_date.isoformat()},
+            ),
+        ),
+    )
+
+
+def _accrue(
+    state: DepositState | LoanState, principal: int, as_of_date: dt.date, event_type: str, aggregate_type: str
+) -> Outcome:
+    start_date = state.last_accrual
+    if as_of_date <= start_date:
+        return NOTHING
+
+    days = (as_of_date - start_date).days
+    interest = interest_cents(principal, state.rate, days, state.day_count_basis)
+    state.accrued += interest
+    state.last_accrual = as_of_date
+    payload = {
+        "from_date": start_date.isoformat(),
+        "to_date": as_of_date.isoformat(),
+        "days": days,
+        "interest": money(interest),
+    }
+    return Outcome(events=(EventRecord(aggregate_type, state.account_id, event_type, payload),))
+
+
+def accrue_deposit(state: DepositState, as_of_date: dt.date) -> Outcome:
+    return _accrue(state, state.balance, as_of_date, "INTEREST_ACCRUED", DEPOSIT)
+
+
+def month_end(state: DepositState, effective_date: dt.date) -> Outcome:
+    accrued = state.accrued
+    if accrued == 0:
+        return NOTHING
+
+    state.balance += accrued
+    state.accrued = 0
+    return Outcome(
+        (
+            LedgerRecord(
+                DEPOSIT,
+                state.account_id,
+                effective_date,
+                f"interest_post:{effective_date.isoformat()}:{state.account_id}",
+                "Month-end interest posting",
+                "interest_expense",
+                "customer_deposits",
+                accrued,
+            ),
+        ),
+        (
+            EventRecord(
+                DEPOSIT,
+                state.account_id,
+                "MONTH_END_APPLIED",
+                {"effective_date": effective_date.isoformat(), "interest_posted": money(accrued)},
+            ),
+        ),
+    )
+
+
+def open_loan(
+    account_id: str, *, opened_on: dt.date, principal: int, annual_rate: int, day_count_basis: int, ref: str
+) -> tuple[LoanState, Outcome]:
+    state = LoanState(
+        account_id,
+        outstanding=principal,
+        accrued=0,
+        rate=annual_rate,
+        day_count_basis=day_count_basis,
+        last_accrual=opened_on,
+    )
+    disbursement = LedgerRecord(
+        LOAN,
+        account_id,
+        opened_on,
+        f"loan_disburse:{ref}",
+        "Loan disbursement",
+        "loan_receivable",
+        "cash",
+        principal,
+    )
+    event = EventRecord(
+        LOAN,
+        account_id,
+        "LOAN_OPENED",
+        {
+            "opened_on": opened_on.isoformat(),
+            "principal": money(principal),
+            "annual_interest_rate": rate(annual_rate),
+            "day_count_basis": day_count_basis,
+        },
+    )
+    return state, Outcome((disbursement,), (event,))
+
+
+def accrue_loan(state: LoanState, as_of_date: dt.date) -> Outcome:
+    return _accrue(state, state.outstanding, as_of_date, "LOAN_INTEREST_ACCRUED", LOAN)
+
+
+def repay(state: LoanState, amount: int, *, effective_date: dt.date, ref: str) -> Outcome:
+    # Interest is settled before principal; any overpayment is ignored.
+    pay_interest = min(amount, state.accrued)
+    pay_principal = min(amount - pay_interest, state.outstanding)
+    state.accrued -= pay_interest
+    state.outstanding -= pay_principal
+
+    ledger = []
+    if pay_interest > 0:
+        ledger.append(
+            LedgerRecord(
+                LOAN,
+                state.account_id,
+                effective_date,
+                f"loan_payment_interest:{ref}",
+                "Loan payment (interest)",
+                "cash",
+                "interest_income",
+                pay_interest,
+            )
+        )
+    if pay_principal > 0:
+        ledger.append(
+            LedgerRecord(
+                LOAN,
+                state.account_id,
+                effective_date,
+                f"loan_payment_principal:{ref}",
+                "Loan payment (principal)",
+                "cash",
+                "loan_receivable",
+                pay_principal,
+            )
+        )
+    event = EventRecord(
+        LOAN,
+        state.account_id,
+        "LOAN_REPAYMENT_POSTED",
+        {
+            "amount": money(amount),
+            "interest_paid": money(pay_interest),
+            "principal_paid": money(pay_principal),
+            "effective_date": effective_date.isoformat(),
+        },
+    )
+    return Outcome(tuple(ledger), (event,))
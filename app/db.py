@@ -1,11 +1,62 @@
-from sqlalchemy import create_engine
+import threading
+from collections.abc import Callable
+from typing import TypeVar
+
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
 
+from app.services.balances import snapshot_new_entries
+from app.services.integrity import chain_new_rows
 from app.settings import settings
 
 
-engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+T = TypeVar("T")
+
+
+class ConcurrentUpdateError(Exception):
+    pass
+
+
+_engine: Engine | None = None
+_read_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+_session_factory = sessionmaker(autocommit=False, autoflush=False)
+event.listen(_session_factory, "before_flush", chain_new_rows)
+event.listen(_session_factory, "after_flush", snapshot_new_entries)
+
+
+def _create_engine(url: str) -> Engine:
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(settings.database_url)
+    return _engine
+
+
+def get_read_engine() -> Engine:
+    global _read_engine
+    if not settings.read_model_database_url:
+        return get_engine()
+    if _read_engine is None:
+        with _engine_lock:
+            if _read_engine is None:
+                _read_engine = _create_engine(settings.read_model_database_url)
+    return _read_engine
+
+
+def SessionLocal() -> Session:
+    return _session_factory(bind=get_engine())
+
+
+def ReadSessionLocal() -> Session:
+    return _session_factory(bind=get_read_engine())
 
 
 def get_db():
@@ -14,3 +65,22 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    db: Session = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def retry_on_conflict(db: Session, op: Callable[[], T]) -> T:
+    for _ in range(settings.max_conflict_retries + 1):
+        try:
+            result = op()
+            db.commit()
+            return result
+        except StaleDataError:
+            db.rollback()
+    raise ConcurrentUpdateError("concurrent_update")
@@ -0,0 +1,52 @@
+import logging
+import threading
+import time
+
+
+class FailureTracker:
+    # Counts failures of a background loop and logs at most one traceback per interval.
+
+    def __init__(self, logger: logging.Logger, message: str, *, log_interval_seconds: float):
+        self.logger = logger
+        self.message = message
+        self.log_interval_seconds = log_interval_seconds
+        self.failures = 0
+        self.consecutive = 0
+        self.last_error: str | None = None
+        self._suppressed = 0
+        self._last_logged: float | None = None
+        self._lock = threading.Lock()
+
+    def record(self, exc: BaseException) -> int:
+        now = time.monotonic()
+        with self._lock:
+            self.failures += 1
+            self.consecutive += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            if self._last_logged is not None and now - self._last_logged < self.log_interval_seconds:
+                self._suppressed += 1
+                return self.consecutive
+            suppressed, self._suppressed = self._suppressed, 0
+            self._last_logged = now
+            consecutive = self.consecutive
+
+        self.logger.error(
+            "%s (%d in a row, %d not logged since last report)",
+            self.message,
+            consecutive,
+            suppressed,
+            exc_info=exc,
+        )
+        return consecutive
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.consecutive = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "failures": self.failures,
+                "consecutive_failures": self.consecutive,
+                "last_error": self.last_error,
+            }
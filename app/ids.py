@@ -0,0 +1,44 @@
+import datetime as dt
+import os
+import threading
+import uuid
+
+from app.time import utcnow
+
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7(ms: int, counter: int = 0) -> str:
+    # RFC 9562 layout: 48-bit unix ms, version 7, 12-bit counter, variant, 62 random bits.
+    value = (ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= (counter & 0xFFF) << 64
+    value |= 0b10 << 62
+    value |= int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return str(uuid.UUID(int=value))
+
+
+def new_id() -> str:
+    global _last_ms, _counter
+    ms = int(utcnow().timestamp() * 1000)
+    with _lock:
+        if ms > _last_ms:
+            _last_ms, _counter = ms, 0
+        else:
+            # Same millisecond, or the clock stepped back: keep counting so ids stay strictly increasing.
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms, _counter = _last_ms + 1, 0
+        ms, counter = _last_ms, _counter
+    return uuid7(ms, counter)
+
+
+def id_at(moment: dt.datetime, counter: int = 0) -> str:
+    return uuid7(int(moment.timestamp() * 1000), counter)
+
+
+def is_time_ordered(value: str) -> bool:
+    return len(value) == 36 and value[14] == "7"
@@ -0,0 +1,380 @@
+import datetime as dt
+import logging
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal, retry_on_conflict
+from app.failures import FailureTracker
+from app.models import DepositAccount, Job, LoanAccount
+from app.services import deposit as deposit_service
+from app.services import loan as loan_service
+from app.services.integrity import verify_chains
+from app.services.outbox import count_replay, replay_outbox
+from app.services.reconciliation import run_reconciliation
+from app.services.retention import run_retention
+from app.services.statements import generate_statements
+from app.settings import settings
+from app.time import as_utc, utcnow
+
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+CANCELLED = "CANCELLED"
+
+FINAL_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    def __init__(self, job: Job):
+        self.job_id = job.id
+        self.checkpoint = dict(job.checkpoint) if job.checkpoint else None
+
+    def report(self, processed: int, *, total: int | None = None, checkpoint: dict | None = None) -> None:
+        with SessionLocal() as db:
+            job = db.get(Job, self.job_id)
+            job.processed = processed
+            if total is not None:
+                job.total = total
+            if checkpoint is not None:
+                job.checkpoint = checkpoint
+                self.checkpoint = checkpoint
+            job.updated_at = utcnow()
+            cancel = job.cancel_requested
+            db.commit()
+        if cancel:
+            raise JobCancelled()
+
+
+JobHandler = Callable[[JobContext, dict], dict | None]
+
+JOB_HANDLERS: dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    def register(fn: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+class JobRunner:
+    def __init__(self):
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=settings.job_workers, thread_name_prefix="job")
+            return self._executor
+
+    def start(self) -> None:
+        self._ensure_executor()
+        with SessionLocal() as db:
+            stale_before = utcnow() - dt.timedelta(seconds=settings.job_stale_seconds)
+            # Running jobs heartbeat every JOB_HEARTBEAT_SECONDS; one that stopped (e.g. the process restarted)
+            # resumes from its checkpoint.
+            db.execute(
+                update(Job)
+                .where(Job.status == RUNNING)
+                .where(Job.updated_at < stale_before)
+                .values(status=QUEUED, updated_at=utcnow())
+            )
+            db.commit()
+            queued = [job_id for (job_id,) in db.query(Job.id).filter(Job.status == QUEUED).order_by(Job.created_at).all()]
+        for job_id in queued:
+            self._schedule(job_id)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule(self, job_id: str) -> None:
+        self._ensure_executor().submit(self._run, job_id)
+
+    def submit(self, db: Session, *, kind: str, params: dict) -> Job:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"unknown_job_kind:{kind}")
+        job = Job(kind=kind, status=QUEUED, params=params, processed=0, cancel_requested=False)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._schedule(job.id)
+        return job
+
+    def cancel(self, db: Session, job_id: str) -> Job | None:
+        job = db.get(Job, job_id)
+        if job is None:
+            return None
+        if job.status == QUEUED:
+            job.status = CANCELLED
+            job.finished_at = utcnow()
+        elif job.status == RUNNING:
+            job.cancel_requested = True
+        job.updated_at = utcnow()
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def _claim(self, job_id: str) -> Job | None:
+        with SessionLocal() as db:
+            now = utcnow()
+            claimed = db.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .where(Job.status == QUEUED)
+                .values(status=RUNNING, started_at=now, updated_at=now)
+            ).rowcount
+            db.commit()
+            if not claimed:
+                return None
+            job = db.get(Job, job_id)
+            db.expunge(job)
+            return job
+
+    def _finish(self, job_id: str, **values) -> None:
+        with SessionLocal() as db:
+            job = db.get(Job, job_id)
+            for key, value in values.items():
+                setattr(job, key, value)
+            job.finished_at = utcnow()
+            job.updated_at = job.finished_at
+            db.commit()
+
+    @contextmanager
+    def _heartbeat(self, job_id: str) -> Iterator[None]:
+        # Keeps updated_at fresh while the handler runs, so start() only reclaims jobs whose worker is gone.
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(settings.job_heartbeat_seconds):
+                try:
+                    with SessionLocal() as db:
+                        db.execute(
+                            update(Job)
+                            .where(Job.id == job_id)
+                            .where(Job.status == RUNNING)
+                            .values(updated_at=utcnow())
+                        )
+                        db.commit()
+                except Exception:
+                    logger.warning("Heartbeat for job %s failed", job_id, exc_info=True)
+
+        thread = threading.Thread(target=beat, name=f"job-heartbeat-{job_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def _run(self, job_id: str) -> None:
+        job = self._claim(job_id)
+        if job is None:
+            return
+        try:
+            with self._heartbeat(job_id):
+                result = JOB_HANDLERS[job.kind](JobContext(job), job.params)
+        except JobCancelled:
+            self._finish(job_id, status=CANCELLED)
+        except Exception as e:
+            self._finish(job_id, status=FAILED, error=str(e))
+        else:
+            self._finish(job_id, status=SUCCEEDED, result=result)
+
+
+runner = JobRunner()
+
+
+class HotAccountFlusher:
+    def __init__(self):
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.failures = FailureTracker(
+            logger,
+            "Hot account flush failed",
+            log_interval_seconds=settings.background_error_log_interval_seconds,
+        )
+
+    def start(self) -> None:
+        if settings.hot_account_flush_interval_ms <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="hot-account-flusher", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def _loop(self) -> None:
+        interval = settings.hot_account_flush_interval_ms / 1000
+        while not self._stop.wait(interval):
+            try:
+                with SessionLocal() as db:
+                    deposit_service.flush_hot_accounts(db, max_accounts=settings.hot_account_flush_batch_size)
+            except Exception as e:
+                # Unflushed entries stay in the journal and are picked up on the next tick.
+                self.failures.record(e)
+            else:
+                self.failures.succeeded()
+
+    def stats(self) -> dict:
+        return {"running": self._thread is not None, **self.failures.stats()}
+
+
+hot_account_flusher = HotAccountFlusher()
+
+
+def job_rate(job: Job) -> float | None:
+    if job.started_at is None:
+        return None
+    end = as_utc(job.finished_at) if job.finished_at is not None else utcnow()
+    elapsed = (end - as_utc(job.started_at)).total_seconds()
+    if elapsed <= 0:
+        return None
+    return job.processed / elapsed
+
+
+REPLAY_FILTERS = ("aggregate_type", "aggregate_id", "event_type", "destination", "created_after", "created_before")
+
+
+@job_handler("outbox_replay")
+def _outbox_replay(ctx: JobContext, params: dict) -> dict:
+    filters = {key: params.get(key) for key in REPLAY_FILTERS}
+    for key in ("created_after", "created_before"):
+        if filters[key] is not None:
+            filters[key] = dt.datetime.fromisoformat(filters[key])
+    checkpoint = ctx.checkpoint or {"last_id": "", "updated": 0}
+
+    with SessionLocal() as db:
+        if ctx.checkpoint is None:
+            ctx.report(0, total=count_replay(db, **filters), checkpoint=checkpoint)
+        updated = replay_outbox(
+            db,
+            chunk_size=params.get("chunk_size", 1000),
+            start_after=checkpoint["last_id"],
+            progress=lambda n, last_id: ctx.report(
+                checkpoint["updated"] + n,
+                checkpoint={"last_id": last_id, "updated": checkpoint["updated"] + n},
+            ),
+            **filters,
+        )
+    return {"updated": checkpoint["updated"] + updated}
+
+
+@job_handler("bulk_accrual")
+def _bulk_accrual(ctx: JobContext, params: dict) -> dict:
+    as_of_date = dt.date.fromisoformat(params["as_of_date"])
+    chunk_size = params.get("chunk_size", 500)
+    kinds = {
+        "deposit_account": (DepositAccount, deposit_service.accrue_interest),
+        "loan_account": (LoanAccount, loan_service.accrue_interest),
+    }
+    account_types = params.get("account_types") or list(kinds)
+    checkpoint = ctx.checkpoint or {"account_type": account_types[0], "last_id": "", "processed": 0}
+
+    with SessionLocal() as db:
+        if ctx.checkpoint is None:
+            total = sum(db.query(kinds[t][0]).count() for t in account_types)
+            ctx.report(0, total=total, checkpoint=checkpoint)
+
+        for account_type in account_types[account_types.index(checkpoint["account_type"]) :]:
+            model, accrue = kinds[account_type]
+            last_id = checkpoint["last_id"] if account_type == checkpoint["account_type"] else ""
+            while True:
+                ids = [
+                    account_id
+                    for (account_id,) in db.query(model.id)
+                    .filter(model.id > last_id)
+                    .filter(model.status == "OPEN")
+                    .order_by(model.id.asc())
+                    .limit(chunk_size)
+                    .all()
+                ]
+                if not ids:
+                    break
+                for account_id in ids:
+                    retry_on_conflict(db, lambda: accrue(db, account_id=account_id, as_of_date=as_of_date))
+
+                last_id = ids[-1]
+                checkpoint = {
+                    "account_type": account_type,
+                    "last_id": last_id,
+                    "processed": checkpoint["processed"] + len(ids),
+                }
+                ctx.report(checkpoint["processed"], checkpoint=checkpoint)
+    return {"accrued": checkpoint["processed"]}
+
+
+@job_handler("retention")
+def _retention(ctx: JobContext, params: dict) -> dict:
+    days = params.get("retention_days", settings.retention_days)
+    with SessionLocal() as db:
+        archived = run_retention(
+            db,
+            older_than=utcnow() - dt.timedelta(days=days),
+            batch_size=params.get("batch_size", settings.retention_batch_size),
+            tables=params.get("tables"),
+            progress=ctx.report,
+        )
+    ctx.report(sum(archived.values()))
+    return {"archived": archived}
+
+
+@job_handler("integrity_verify")
+def _integrity_verify(ctx: JobContext, params: dict) -> dict:
+    with SessionLocal() as db:
+        results = verify_chains(
+            db,
+            chains=params.get("chains"),
+            chunk_size=params.get("chunk_size", 1000),
+            progress=ctx.report,
+        )
+    ctx.report(sum(r["verified"] for r in results))
+    return {"ok": all(r["ok"] for r in results), "chains": results}
+
+
+@job_handler("reconciliation")
+def _reconciliation(ctx: JobContext, params: dict) -> dict:
+    with SessionLocal() as db:
+        run = run_reconciliation(
+            db,
+            account_types=params.get("account_types"),
+            chunk_size=params.get("chunk_size", settings.reconciliation_chunk_size),
+            workers=params.get("workers", settings.reconciliation_workers),
+            progress=ctx.report,
+        )
+        return {"run_id": run.id, "accounts_checked": run.accounts_checked, "breaks": run.breaks}
+
+
+@job_handler("statements")
+def _statements(ctx: JobContext, params: dict) -> dict:
+    with SessionLocal() as db:
+        manifest = generate_statements(
+            db,
+            period_start=dt.date.fromisoformat(params["period_start"]),
+            period_end=dt.date.fromisoformat(params["period_end"]),
+            shard_size=params.get("shard_size", settings.statement_shard_size),
+            workers=params.get("workers", settings.statement_workers),
+            progress=ctx.report,
+        )
+    return {"output_dir": manifest["output_dir"], "accounts": manifest["accounts"], "shards": len(manifest["shards"])}
@@ -1,4 +1,5 @@
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI
 from fastapi.responses import RedirectResponse
@@ -6,14 +7,30 @@ from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.db import engine, get_db
-from app.models import Base
+from app.capture import TrafficCaptureMiddleware, writer as capture_writer
+from app.db import get_db
+from app.jobs import hot_account_flusher, runner
+from app.migrations import check_schema
 from app.routes import router
+from app.services.group_commit import group_commit
+from app.services.stream import notifier
 
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_schema()
+    runner.start()
+    hot_account_flusher.start()
+    yield
+    notifier.shutdown()
+    group_commit.shutdown()
+    hot_account_flusher.shutdown()
+    runner.shutdown()
+    capture_writer.close()
 
-app = FastAPI(title="Fintech Contract Integrations Demo")
+
+app = FastAPI(title="Fintech Contract Integrations Demo", lifespan=lifespan)
+app.add_middleware(TrafficCaptureMiddleware)
 app.include_router(router)
 
 
@@ -0,0 +1,514 @@
+import argparse
+import sys
+from collections.abc import Callable
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Connection,
+    Date,
+    DateTime,
+    Engine,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    func,
+    insert,
+    inspect,
+    literal_column,
+    select,
+    update,
+)
+
+from app.db import get_engine, get_read_engine
+from app.ids import id_at, is_time_ordered
+from app.models import (
+    AggregateSequence,
+    BalanceSnapshot,
+    ChainCheckpoint,
+    ChainHead,
+    DepositAccount,
+    DepositAccountSummary,
+    DomainEvent,
+    IdempotencyKey,
+    Job,
+    LedgerEntry,
+    LoanAccount,
+    LoanAccountSummary,
+    OutboxMessage,
+    PostingJournalEntry,
+    QueueConsumerOffset,
+    QueueMessage,
+    QueueTopicOffset,
+    ReadModelBase,
+    ReconciliationBreak,
+    ReconciliationRun,
+    WebhookSubscription,
+    WebhookSubscriptionHealth,
+)
+from app.services.balances import backfill_snapshots
+from app.services.integrity import CHAINS, GENESIS_HASH, GLOBAL_KEY, backfill_chains
+from app.time import as_utc
+
+
+MigrationStep = Callable[[Connection], None]
+
+_version_metadata = MetaData()
+schema_version = Table("schema_version", _version_metadata, Column("version", Integer, nullable=False))
+read_model_schema_version = Table(
+    "read_model_schema_version",
+    _version_metadata,
+    Column("version", Integer, nullable=False),
+)
+
+
+# The schema the app created with create_all before migrations existed. Step 1 must keep building exactly
+# this, because later steps add columns to these tables and a frozen copy does not move with app.models.
+_baseline_metadata = MetaData()
+Table(
+    "deposit_accounts",
+    _baseline_metadata,
+    Column("id", String, primary_key=True),
+    Column("opened_on", Date, nullable=False),
+    Column("status", String, nullable=False),
+    Column("annual_interest_rate", String, nullable=False),
+    Column("day_count_basis", Integer, nullable=False),
+    Column("current_balance", String, nullable=False),
+    Column("accrued_interest", String, nullable=False),
+    Column("last_accrual_date", Date, nullable=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+)
+Table(
+    "loan_accounts",
+    _baseline_metadata,
+    Column("id", String, primary_key=True),
+    Column("opened_on", Date, nullable=False),
+    Column("status", String, nullable=False),
+    Column("principal", String, nullable=False),
+    Column("annual_interest_rate", String, nullable=False),
+    Column("day_count_basis", Integer, nullable=False),
+    Column("outstanding_principal", String, nullable=False),
+    Column("accrued_interest", String, nullable=False),
+    Column("last_accrual_date", Date, nullable=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+)
+Table(
+    "ledger_entries",
+    _baseline_metadata,
+    Column("id", String, primary_key=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("effective_date", Date, nullable=False),
+    Column("account_type", String, nullable=False),
+    Column("account_id", String, nullable=False),
+    Column("txn_id", String, nullable=False),
+    Column("description", String, nullable=False),
+    Column("debit_account", String, nullable=False),
+    Column("credit_account", String, nullable=False),
+    Column("amount", String, nullable=False),
+)
+Table(
+    "domain_events",
+    _baseline_metadata,
+    Column("id", String, primary_key=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("aggregate_type", String, nullable=False),
+    Column("aggregate_id", String, nullable=False),
+    Column("event_type", String, nullable=False),
+    Column("event_time", DateTime(timezone=True), nullable=False),
+    Column("payload", JSON, nullable=False),
+    Column("idempotency_key", String, nullable=True),
+)
+Table(
+    "outbox_messages",
+    _baseline_metadata,
+    Column("id", String, primary_key=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("event_id", String, ForeignKey("domain_events.id"), nullable=False),
+    Column("destination", String, nullable=False),
+    Column("status", String, nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("next_attempt_at", DateTime(timezone=True), nullable=True),
+    Column("last_error", String, nullable=True),
+)
+Table(
+    "webhook_subscriptions",
+    _baseline_metadata,
+    Column("id", String, primary_key=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("target_url", String, nullable=False),
+    Column("enabled", Boolean, nullable=False),
+)
+Table(
+    "queue_messages",
+    _baseline_metadata,
+    Column("id", String, primary_key=True),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+    Column("topic", String, nullable=False),
+    Column("payload", JSON, nullable=False),
+)
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def add_column(conn: Connection, column: Column, *, default_sql: str | None = None) -> None:
+    table = column.table.name
+    if column.name in {c["name"] for c in inspect(conn).get_columns(table)}:
+        return
+    sql = f'ALTER TABLE {table} ADD COLUMN "{column.name}" {column.type.compile(dialect=conn.dialect)}'
+    if default_sql is not None:
+        sql += f" DEFAULT {default_sql}"
+    if not column.nullable:
+        sql += " NOT NULL"
+    conn.exec_driver_sql(sql)
+
+
+def drop_column(conn: Connection, table: str, name: str) -> None:
+    if name not in {c["name"] for c in inspect(conn).get_columns(table)}:
+        return
+    conn.exec_driver_sql(f'ALTER TABLE {table} DROP COLUMN "{name}"')
+
+
+def create_index(conn: Connection, index: Index) -> None:
+    if index.name in {i["name"] for i in inspect(conn).get_indexes(index.table.name)}:
+        return
+    index.create(conn)
+
+
+def _index(model, *columns: str) -> Index:
+    return next(i for i in model.__table__.indexes if tuple(c.name for c in i.columns) == columns)
+
+
+def _initial_schema(conn: Connection) -> None:
+    _baseline_metadata.create_all(conn)
+
+
+def _queue_consumer_offsets(conn: Connection) -> None:
+    queue = QueueMessage.__table__
+    add_column(conn, queue.c.offset, default_sql="-1")
+    add_column(conn, queue.c.event_id, default_sql="''")
+
+    # Baseline messages carried the event inline; they become by-reference messages ordered as they were written.
+    if "payload" in {c["name"] for c in inspect(conn).get_columns(queue.name)}:
+        next_offsets: dict[str, int] = {}
+        updates = []
+        for row in conn.execute(
+            select(queue.c.id, queue.c.topic, literal_column("payload", JSON).label("payload"))
+            .where(queue.c.offset < 0)
+            .order_by(queue.c.created_at.asc(), queue.c.id.asc())
+        ):
+            if row.topic not in next_offsets:
+                last = conn.execute(select(func.max(queue.c.offset)).where(queue.c.topic == row.topic)).scalar()
+                next_offsets[row.topic] = (-1 if last is None else last) + 1
+            updates.append({"b_id": row.id, "offset": next_offsets[row.topic], "event_id": row.payload["event_id"]})
+            next_offsets[row.topic] += 1
+        if updates:
+            conn.execute(
+                update(queue)
+                .where(queue.c.id == bindparam("b_id"))
+                .values(offset=bindparam("offset"), event_id=bindparam("event_id")),
+                updates,
+            )
+
+    create_index(conn, _index(QueueMessage, "topic", "offset"))
+    QueueConsumerOffset.__table__.create(conn, checkfirst=True)
+
+
+def _retention_indexes(conn: Connection) -> None:
+    for model in (DomainEvent, OutboxMessage, QueueMessage):
+        create_index(conn, _index(model, "created_at"))
+
+
+def _webhook_batching(conn: Connection) -> None:
+    add_column(conn, WebhookSubscription.__table__.c.batch_max_size, default_sql="1")
+    add_column(conn, WebhookSubscription.__table__.c.batch_linger_ms, default_sql="0")
+
+
+def _webhook_health(conn: Connection) -> None:
+    WebhookSubscriptionHealth.__table__.create(conn, checkfirst=True)
+
+
+def _stored_envelopes(conn: Connection) -> None:
+    add_column(conn, DomainEvent.__table__.c.envelope)
+    add_column(conn, QueueMessage.__table__.c.envelope)
+    drop_column(conn, QueueMessage.__tablename__, "payload")
+
+
+def _jobs(conn: Connection) -> None:
+    Job.__table__.create(conn, checkfirst=True)
+
+
+def _initial_read_model(conn: Connection) -> None:
+    ReadModelBase.metadata.create_all(conn)
+
+
+def _account_versions(conn: Connection) -> None:
+    add_column(conn, DepositAccount.__table__.c.version, default_sql="1")
+    add_column(conn, LoanAccount.__table__.c.version, default_sql="1")
+
+
+def _write_behind_journal(conn: Connection) -> None:
+    add_column(conn, DepositAccount.__table__.c.write_behind, default_sql="0")
+    PostingJournalEntry.__table__.create(conn, checkfirst=True)
+
+
+def _hash_chains(conn: Connection) -> None:
+    for model in (LedgerEntry, DomainEvent):
+        for column in ("chain_seq", "chain_hash", "account_chain_hash"):
+            add_column(conn, model.__table__.c[column])
+    ChainHead.__table__.create(conn, checkfirst=True)
+    ChainCheckpoint.__table__.create(conn, checkfirst=True)
+    backfill_chains(conn)
+    for model in (LedgerEntry, DomainEvent):
+        create_index(conn, _index(model, "chain_seq"))
+
+
+def _reconciliation_reports(conn: Connection) -> None:
+    ReconciliationRun.__table__.create(conn, checkfirst=True)
+    ReconciliationBreak.__table__.create(conn, checkfirst=True)
+
+
+def _aggregate_sequences(conn: Connection) -> None:
+    add_column(conn, DomainEvent.__table__.c.sequence)
+    AggregateSequence.__table__.create(conn, checkfirst=True)
+
+    events = DomainEvent.__table__
+    earlier = events.alias()
+    conn.execute(
+        update(events)
+        .where(events.c.sequence.is_(None))
+        .values(
+            sequence=select(func.count())
+            .where(earlier.c.aggregate_type == events.c.aggregate_type)
+            .where(earlier.c.aggregate_id == events.c.aggregate_id)
+            .where(earlier.c.chain_seq <= events.c.chain_seq)
+            .scalar_subquery()
+        )
+    )
+    if conn.execute(select(func.count()).select_from(AggregateSequence.__table__)).scalar() == 0:
+        conn.execute(
+            insert(AggregateSequence.__table__).from_select(
+                ["aggregate_type", "aggregate_id", "last_sequence", "version"],
+                select(events.c.aggregate_type, events.c.aggregate_id, func.max(events.c.sequence), 1).group_by(
+                    events.c.aggregate_type, events.c.aggregate_id
+                ),
+            )
+        )
+    create_index(conn, _index(DomainEvent, "aggregate_type", "aggregate_id", "sequence"))
+
+
+def _journal_flushed_index(conn: Connection) -> None:
+    for index in PostingJournalEntry.__table__.indexes:
+        create_index(conn, index)
+
+
+def _balance_snapshots(conn: Connection) -> None:
+    BalanceSnapshot.__table__.create(conn, checkfirst=True)
+    if conn.execute(select(func.count()).select_from(BalanceSnapshot.__table__)).scalar() == 0:
+        backfill_snapshots(conn)
+
+
+def _ledger_account_index(conn: Connection) -> None:
+    create_index(conn, _index(LedgerEntry, "account_type", "account_id", "effective_date"))
+
+
+def _subscription_filters(conn: Connection) -> None:
+    for column in ("event_types", "aggregate_types", "updated_at"):
+        add_column(conn, WebhookSubscription.__table__.c[column])
+
+
+def _time_ordered_ids(conn: Connection) -> None:
+    # Only internal tables are rekeyed. Account, subscription, event and ledger ids are part of the API
+    # contract or the hash chains, so legacy rows there keep their ids and new rows get time-ordered ones.
+    for model in (OutboxMessage, QueueMessage, PostingJournalEntry):
+        table = model.__table__
+        rows = conn.execute(select(table.c.id, table.c.created_at).order_by(table.c.created_at.asc(), table.c.id.asc()))
+        renames = []
+        last_ms, counter = None, 0
+        for row in rows:
+            ms = int(as_utc(row.created_at).timestamp() * 1000)
+            counter = counter + 1 if ms == last_ms else 0
+            last_ms = ms
+            if not is_time_ordered(row.id):
+                renames.append({"old_id": row.id, "new_id": id_at(as_utc(row.created_at), counter)})
+        if renames:
+            conn.execute(
+                update(table).where(table.c.id == bindparam("old_id")).values(id=bindparam("new_id")),
+                renames,
+            )
+
+
+def _idempotency_keys(conn: Connection) -> None:
+    keys = IdempotencyKey.__table__
+    keys.create(conn, checkfirst=True)
+    for index in keys.indexes:
+        create_index(conn, index)
+    if conn.execute(select(func.count()).select_from(keys)).scalar() == 0:
+        events = DomainEvent.__table__
+        conn.execute(
+            insert(keys).from_select(
+                ["event_id", "created_at", "aggregate_type", "aggregate_id", "event_type", "idempotency_key"],
+                select(
+                    events.c.id,
+                    events.c.created_at,
+                    events.c.aggregate_type,
+                    events.c.aggregate_id,
+                    events.c.event_type,
+                    events.c.idempotency_key,
+                ).where(events.c.idempotency_key.is_not(None)),
+            )
+        )
+
+
+def _account_list_keys(conn: Connection) -> None:
+    for model in (DepositAccount, LoanAccount):
+        for index in model.__table__.indexes:
+            create_index(conn, index)
+
+
+def _account_summary_list_keys(conn: Connection) -> None:
+    for model in (DepositAccountSummary, LoanAccountSummary):
+        for index in model.__table__.indexes:
+            create_index(conn, index)
+
+
+def _global_chain_heads(conn: Connection) -> None:
+    heads = ChainHead.__table__
+    for chain in CHAINS:
+        if conn.execute(select(heads.c.key).where(heads.c.chain == chain, heads.c.key == GLOBAL_KEY)).first():
+            continue
+        conn.execute(
+            insert(heads).values(chain=chain, key=GLOBAL_KEY, last_seq=0, last_hash=GENESIS_HASH, version=1)
+        )
+
+
+def _queue_topic_offsets(conn: Connection) -> None:
+    QueueTopicOffset.__table__.create(conn, checkfirst=True)
+    messages = QueueMessage.__table__
+    if conn.execute(select(func.count()).select_from(QueueTopicOffset.__table__)).scalar() == 0:
+        conn.execute(
+            insert(QueueTopicOffset.__table__).from_select(
+                ["topic", "last_offset"],
+                select(messages.c.topic, func.max(messages.c.offset)).group_by(messages.c.topic),
+            )
+        )
+
+
+MIGRATIONS: list[tuple[int, str, MigrationStep]] = [
+    (1, "baseline schema", _initial_schema),
+    (2, "queue offsets and consumer groups", _queue_consumer_offsets),
+    (3, "created_at indexes for retention", _retention_indexes),
+    (4, "webhook batching", _webhook_batching),
+    (5, "webhook circuit breaker health", _webhook_health),
+    (6, "stored event envelopes", _stored_envelopes),
+    (7, "background jobs", _jobs),
+    (8, "account version columns", _account_versions),
+    (9, "write-behind posting journal", _write_behind_journal),
+    (10, "ledger and event hash chains", _hash_chains),
+    (11, "reconciliation reports", _reconciliation_reports),
+    (12, "per-aggregate event sequences", _aggregate_sequences),
+    (13, "posting journal flushed index", _journal_flushed_index),
+    (14, "daily balance snapshots", _balance_snapshots),
+    (15, "ledger account index", _ledger_account_index),
+    (16, "webhook subscription filters", _subscription_filters),
+    (17, "time-ordered ids for internal tables", _time_ordered_ids),
+    (18, "idempotency keys kept through retention", _idempotency_keys),
+    (19, "account list keyset indexes", _account_list_keys),
+    (20, "global chain heads", _global_chain_heads),
+    (21, "queue topic offset counters", _queue_topic_offsets),
+]
+
+READ_MODEL_MIGRATIONS: list[tuple[int, str, MigrationStep]] = [
+    (1, "initial read model", _initial_read_model),
+    (2, "account summary keyset indexes", _account_summary_list_keys),
+]
+
+
+def current_version(conn: Connection, table: Table = schema_version) -> int:
+    if not inspect(conn).has_table(table.name):
+        return 0
+    return conn.execute(select(table.c.version)).scalar() or 0
+
+
+def head_version(steps: list[tuple[int, str, MigrationStep]]) -> int:
+    return steps[-1][0] if steps else 0
+
+
+def _upgrade(engine: Engine, steps: list[tuple[int, str, MigrationStep]], table: Table) -> list[int]:
+    with engine.begin() as conn:
+        table.create(conn, checkfirst=True)
+        version = current_version(conn, table)
+        if conn.execute(select(table.c.version)).first() is None:
+            conn.execute(table.insert().values(version=0))
+
+    applied: list[int] = []
+    for number, _, step in steps:
+        if number <= version:
+            continue
+        # One transaction per step so a failure leaves the database at the last completed version.
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(table.update().values(version=number))
+        applied.append(number)
+    return applied
+
+
+def upgrade(engine: Engine | None = None, read_engine: Engine | None = None) -> dict[str, list[int]]:
+    engine = engine or get_engine()
+    read_engine = read_engine or (engine if engine is not get_engine() else get_read_engine())
+    return {
+        "database": _upgrade(engine, MIGRATIONS, schema_version),
+        "read_model": _upgrade(read_engine, READ_MODEL_MIGRATIONS, read_model_schema_version),
+    }
+
+
+def _check(engine: Engine, steps: list[tuple[int, str, MigrationStep]], table: Table, name: str) -> None:
+    with engine.connect() as conn:
+        version = current_version(conn, table)
+    expected = head_version(steps)
+    if version != expected:
+        raise SchemaOutOfDate(
+            f"{name} schema is at version {version}, expected {expected}; run `python -m app.migrations upgrade`"
+        )
+
+
+def check_schema(engine: Engine | None = None, read_engine: Engine | None = None) -> None:
+    engine = engine or get_engine()
+    read_engine = read_engine or (engine if engine is not get_engine() else get_read_engine())
+    _check(engine, MIGRATIONS, schema_version, "database")
+    _check(read_engine, READ_MODEL_MIGRATIONS, read_model_schema_version, "read model")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations")
+    parser.add_argument("command", choices=["upgrade", "current", "check"], nargs="?", default="upgrade")
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        applied = upgrade()
+        print(f"applied: {applied}")
+    elif args.command == "current":
+        with get_engine().connect() as conn:
+            print(f"database: {current_version(conn)} (head {head_version(MIGRATIONS)})")
+        with get_read_engine().connect() as conn:
+            version = current_version(conn, read_model_schema_version)
+            print(f"read model: {version} (head {head_version(READ_MODEL_MIGRATIONS)})")
+    else:
+        try:
+            check_schema()
+        except SchemaOutOfDate as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        print("ok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
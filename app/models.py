@@ -1,9 +1,9 @@
 import datetime as dt
-import uuid
 
-from sqlalchemy import JSON, Boolean, Date, DateTime, ForeignKey, Integer, Numeric, String
+from sqlalchemy import JSON, BigInteger, Boolean, Date, DateTime, ForeignKey, Index, Integer, LargeBinary, Numeric, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
+from app.ids import new_id
 from app.time import utcnow
 
 
@@ -13,8 +13,9 @@ class Base(DeclarativeBase):
 
 class DepositAccount(Base):
     __tablename__ = "deposit_accounts"
+    __table_args__ = (Index("ix_deposit_accounts_created_id", "created_at", "id"),)
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
     opened_on: Mapped[dt.date] = mapped_column(Date, nullable=False)
     status: Mapped[str] = mapped_column(String, nullable=False, default="OPEN")
 
@@ -25,13 +26,38 @@ class DepositAccount(Base):
     accrued_interest: Mapped[str] = mapped_column(String, nullable=False, default="0")
     last_accrual_date: Mapped[dt.date | None] = mapped_column(Date, nullable=True)
 
+    write_behind: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+class PostingJournalEntry(Base):
+    __tablename__ = "posting_journal"
+    __table_args__ = (
+        Index("ix_posting_journal_account_flushed", "account_id", "flushed_at"),
+        Index("ix_posting_journal_flushed", "flushed_at"),
+        Index("ux_posting_journal_account_idempotency", "account_id", "idempotency_key", unique=True),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+    account_id: Mapped[str] = mapped_column(String, ForeignKey("deposit_accounts.id"), nullable=False)
+    amount: Mapped[str] = mapped_column(String, nullable=False)
+    effective_date: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    idempotency_key: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    flushed_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
 class LoanAccount(Base):
     __tablename__ = "loan_accounts"
+    __table_args__ = (Index("ix_loan_accounts_created_id", "created_at", "id"),)
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
     opened_on: Mapped[dt.date] = mapped_column(Date, nullable=False)
     status: Mapped[str] = mapped_column(String, nullable=False, default="OPEN")
 
@@ -45,12 +71,19 @@ class LoanAccount(Base):
     last_accrual_date: Mapped[dt.date | None] = mapped_column(Date, nullable=True)
 
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 class LedgerEntry(Base):
     __tablename__ = "ledger_entries"
+    __table_args__ = (
+        Index("ux_ledger_entries_chain_seq", "chain_seq", unique=True),
+        Index("ix_ledger_entries_account_date", "account_type", "account_id", "effective_date"),
+    )
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
 
     effective_date: Mapped[dt.date] = mapped_column(Date, nullable=False)
@@ -65,28 +98,98 @@ class LedgerEntry(Base):
 
     amount: Mapped[str] = mapped_column(String, nullable=False)
 
+    chain_seq: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    chain_hash: Mapped[str | None] = mapped_column(String, nullable=True)
+    account_chain_hash: Mapped[str | None] = mapped_column(String, nullable=True)
+
+
+class BalanceSnapshot(Base):
+    __tablename__ = "balance_snapshots"
+
+    account_type: Mapped[str] = mapped_column(String, primary_key=True)
+    account_id: Mapped[str] = mapped_column(String, primary_key=True)
+    as_of: Mapped[dt.date] = mapped_column(Date, primary_key=True)
+    balance_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
 
 class DomainEvent(Base):
     __tablename__ = "domain_events"
+    __table_args__ = (
+        Index("ux_domain_events_chain_seq", "chain_seq", unique=True),
+        Index("ux_domain_events_aggregate_sequence", "aggregate_type", "aggregate_id", "sequence", unique=True),
+    )
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow, index=True)
 
     aggregate_type: Mapped[str] = mapped_column(String, nullable=False)
     aggregate_id: Mapped[str] = mapped_column(String, nullable=False)
+    sequence: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     event_type: Mapped[str] = mapped_column(String, nullable=False)
     event_time: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    envelope: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
 
     idempotency_key: Mapped[str | None] = mapped_column(String, nullable=True)
 
+    chain_seq: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    chain_hash: Mapped[str | None] = mapped_column(String, nullable=True)
+    account_chain_hash: Mapped[str | None] = mapped_column(String, nullable=True)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_lookup", "aggregate_type", "idempotency_key", "created_at"),)
+
+    # Kept when domain_events are archived, so retries stay idempotent after retention runs.
+    event_id: Mapped[str] = mapped_column(String, primary_key=True)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+    aggregate_type: Mapped[str] = mapped_column(String, nullable=False)
+    aggregate_id: Mapped[str] = mapped_column(String, nullable=False)
+    event_type: Mapped[str] = mapped_column(String, nullable=False)
+    idempotency_key: Mapped[str] = mapped_column(String, nullable=False)
+
+
+class AggregateSequence(Base):
+    __tablename__ = "aggregate_sequences"
+
+    aggregate_type: Mapped[str] = mapped_column(String, primary_key=True)
+    aggregate_id: Mapped[str] = mapped_column(String, primary_key=True)
+    last_sequence: Mapped[int] = mapped_column(Integer, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+class ChainHead(Base):
+    __tablename__ = "chain_heads"
+
+    chain: Mapped[str] = mapped_column(String, primary_key=True)
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    last_seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_hash: Mapped[str] = mapped_column(String, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+class ChainCheckpoint(Base):
+    __tablename__ = "chain_checkpoints"
+
+    chain: Mapped[str] = mapped_column(String, primary_key=True)
+    key: Mapped[str] = mapped_column(String, primary_key=True)
+    last_seq: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_hash: Mapped[str] = mapped_column(String, nullable=False)
+    verified_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
 
 class OutboxMessage(Base):
     __tablename__ = "outbox_messages"
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow, index=True)
 
     event_id: Mapped[str] = mapped_column(String, ForeignKey("domain_events.id"), nullable=False)
     destination: Mapped[str] = mapped_column(String, nullable=False)
@@ -103,18 +206,166 @@ class OutboxMessage(Base):
 class WebhookSubscription(Base):
     __tablename__ = "webhook_subscriptions"
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
     created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
 
     target_url: Mapped[str] = mapped_column(String, nullable=False)
     enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
 
+    batch_max_size: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    batch_linger_ms: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # None matches everything; a list restricts fan-out to those values.
+    event_types: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    aggregate_types: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    updated_at: Mapped[dt.datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, default=utcnow, onupdate=utcnow
+    )
+
+
+class WebhookSubscriptionHealth(Base):
+    __tablename__ = "webhook_subscription_health"
+
+    subscription_id: Mapped[str] = mapped_column(String, ForeignKey("webhook_subscriptions.id"), primary_key=True)
+    circuit_state: Mapped[str] = mapped_column(String, nullable=False, default="CLOSED", index=True)
+    consecutive_failures: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    window: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+
+    opened_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    next_probe_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    probe_interval_seconds: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
 
 class QueueMessage(Base):
     __tablename__ = "queue_messages"
+    __table_args__ = (Index("ux_queue_messages_topic_offset", "topic", "offset", unique=True),)
 
-    id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow, index=True)
 
     topic: Mapped[str] = mapped_column(String, nullable=False, default="domain_events")
-    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    offset: Mapped[int] = mapped_column(Integer, nullable=False)
+    event_id: Mapped[str] = mapped_column(String, nullable=False)
+    envelope: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+
+
+class QueueTopicOffset(Base):
+    __tablename__ = "queue_topic_offsets"
+
+    topic: Mapped[str] = mapped_column(String, primary_key=True)
+    last_offset: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class QueueConsumerOffset(Base):
+    __tablename__ = "queue_consumer_offsets"
+
+    topic: Mapped[str] = mapped_column(String, primary_key=True)
+    group_name: Mapped[str] = mapped_column(String, primary_key=True)
+    committed_offset: Mapped[int] = mapped_column(Integer, nullable=False, default=-1)
+    updated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="QUEUED", index=True)
+    params: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+
+    processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    checkpoint: Mapped[dict | None] = mapped_column(JSON(none_as_null=True), nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSON(none_as_null=True), nullable=True)
+    error: Mapped[str | None] = mapped_column(String, nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    started_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+
+class ReconciliationRun(Base):
+    __tablename__ = "reconciliation_runs"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+    status: Mapped[str] = mapped_column(String, nullable=False, default="RUNNING")
+    account_types: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
+    accounts_checked: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    breaks: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    finished_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class ReconciliationBreak(Base):
+    __tablename__ = "reconciliation_breaks"
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=new_id)
+    run_id: Mapped[str] = mapped_column(String, ForeignKey("reconciliation_runs.id"), nullable=False, index=True)
+
+    account_type: Mapped[str] = mapped_column(String, nullable=False)
+    account_id: Mapped[str] = mapped_column(String, nullable=False)
+    stored_balance: Mapped[str | None] = mapped_column(String, nullable=True)
+    ledger_balance: Mapped[str] = mapped_column(String, nullable=False)
+    difference: Mapped[str] = mapped_column(String, nullable=False)
+
+
+class ReadModelBase(DeclarativeBase):
+    pass
+
+
+class DepositAccountSummary(ReadModelBase):
+    __tablename__ = "deposit_account_summaries"
+    __table_args__ = (Index("ix_deposit_account_summaries_created_id", "created_at", "id"),)
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    opened_on: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="OPEN")
+
+    annual_interest_rate: Mapped[str] = mapped_column(String, nullable=False)
+    day_count_basis: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    current_balance: Mapped[str] = mapped_column(String, nullable=False, default="0")
+    accrued_interest: Mapped[str] = mapped_column(String, nullable=False, default="0")
+    last_accrual_date: Mapped[dt.date | None] = mapped_column(Date, nullable=True)
+
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    last_event_id: Mapped[str] = mapped_column(String, nullable=False)
+    last_event_time: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class LoanAccountSummary(ReadModelBase):
+    __tablename__ = "loan_account_summaries"
+    __table_args__ = (Index("ix_loan_account_summaries_created_id", "created_at", "id"),)
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    opened_on: Mapped[dt.date] = mapped_column(Date, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="OPEN")
+
+    principal: Mapped[str] = mapped_column(String, nullable=False)
+    annual_interest_rate: Mapped[str] = mapped_column(String, nullable=False)
+    day_count_basis: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    outstanding_principal: Mapped[str] = mapped_column(String, nullable=False)
+    accrued_interest: Mapped[str] = mapped_column(String, nullable=False, default="0")
+    last_accrual_date: Mapped[dt.date | None] = mapped_column(Date, nullable=True)
+
+    created_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    last_event_id: Mapped[str] = mapped_column(String, nullable=False)
+    last_event_time: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class ProjectionCheckpoint(ReadModelBase):
+    __tablename__ = "projection_checkpoints"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    last_offset: Mapped[int] = mapped_column(Integer, nullable=False, default=-1)
+    last_event_time: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    messages_applied: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    synced_at: Mapped[dt.datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[dt.datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
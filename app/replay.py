@@ -0,0 +1,175 @@
+import argparse
+import datetime as dt
+import json
+import math
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from app.time import as_utc
+
+
+ID_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def load_capture(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class IdMap:
+    def __init__(self, records: list[dict], *, wait_seconds: float):
+        self._created = {r["response_id"]: threading.Event() for r in records if r.get("response_id")}
+        self._ids: dict[str, str] = {}
+        self._wait_seconds = wait_seconds
+
+    def resolve(self, text: str) -> str:
+        def substitute(match: re.Match) -> str:
+            captured = match.group(0)
+            created = self._created.get(captured)
+            if created is not None:
+                created.wait(self._wait_seconds)
+            return self._ids.get(captured, captured)
+
+        return ID_PATTERN.sub(substitute, text)
+
+    def record(self, captured_id: str, new_id: str | None) -> None:
+        if new_id is not None:
+            self._ids.setdefault(captured_id, new_id)
+        self._created[captured_id].set()
+
+
+def percentile(values: list[float], p: float) -> float | None:
+    if not values:
+        return None
+    rank = max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))
+    return round(values[rank], 3)
+
+
+def _response_id(response) -> str | None:
+    if "application/json" not in response.headers.get("content-type", ""):
+        return None
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    return data.get("id") if isinstance(data, dict) else None
+
+
+def replay(
+    records: list[dict],
+    *,
+    client_factory,
+    speed: float | None,
+    concurrency: int,
+    wait_seconds: float = 30.0,
+) -> dict:
+    ids = IdMap(records, wait_seconds=wait_seconds)
+    local = threading.local()
+    results: list[tuple[float, int | None]] = []
+    results_lock = threading.Lock()
+
+    def send(record: dict) -> None:
+        if not hasattr(local, "client"):
+            local.client = client_factory()
+        path = ids.resolve(record["path"])
+        query = ids.resolve(record.get("query") or "")
+        body = ids.resolve(record["body"]) if record.get("body") is not None else None
+
+        status = None
+        new_id = None
+        start = time.perf_counter()
+        try:
+            response = local.client.request(
+                record["method"],
+                path + (f"?{query}" if query else ""),
+                content=body.encode() if body is not None else None,
+                headers=record.get("headers") or {},
+            )
+            status = response.status_code
+            if record.get("response_id"):
+                new_id = _response_id(response)
+        except httpx.HTTPError:
+            pass
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000
+            if record.get("response_id"):
+                ids.record(record["response_id"], new_id)
+            with results_lock:
+                results.append((latency_ms, status))
+
+    offsets = [0.0] * len(records)
+    if records and speed:
+        first = as_utc(dt.datetime.fromisoformat(records[0]["ts"]))
+        offsets = [(as_utc(dt.datetime.fromisoformat(r["ts"])) - first).total_seconds() / speed for r in records]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as pool:
+        for record, offset in zip(records, offsets):
+            delay = offset - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, record)
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in results)
+    statuses = Counter("error" if status is None else f"{status // 100}xx" for _, status in results)
+    errors = statuses["error"] + statuses["5xx"]
+    return {
+        "requests": len(results),
+        "duration_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed > 0 else None,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": round(latencies[-1], 3) if latencies else None,
+        },
+        "status": dict(sorted(statuses.items())),
+        "errors": errors,
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay captured API traffic and report latency.")
+    parser.add_argument("capture", help="JSONL file written by the traffic capture middleware")
+    parser.add_argument(
+        "--target",
+        default="inprocess",
+        help="'inprocess' to drive the app directly, or a base URL such as http://127.0.0.1:8001",
+    )
+    parser.add_argument("--speed", default="1", help="replay speed multiplier (1, 10, ...) or 'max'")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    if args.target == "inprocess":
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        def client_factory():
+            return TestClient(app, raise_server_exceptions=False)
+
+    else:
+
+        def client_factory():
+            return httpx.Client(base_url=args.target, timeout=30.0)
+
+    report = replay(
+        load_capture(args.capture),
+        client_factory=client_factory,
+        speed=None if args.speed == "max" else float(args.speed),
+        concurrency=args.concurrency,
+    )
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
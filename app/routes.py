@@ -1,39 +1,100 @@
 from decimal import Decimal
+import asyncio
 import datetime as dt
+import hashlib
+from collections.abc import Callable
 
-import httpx
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
-
-from app.db import get_db
-from app.models import DepositAccount, DomainEvent, LedgerEntry, OutboxMessage, QueueMessage, WebhookSubscription
+from starlette.concurrency import run_in_threadpool
+
+from app.db import ConcurrentUpdateError, get_db, get_read_db, retry_on_conflict
+from app.jobs import REPLAY_FILTERS, hot_account_flusher, job_rate, runner
+from app.models import (
+    ChainHead,
+    DepositAccount,
+    DepositAccountSummary,
+    DomainEvent,
+    Job,
+    LedgerEntry,
+    LoanAccountSummary,
+    OutboxMessage,
+    PostingJournalEntry,
+    ReconciliationBreak,
+    ReconciliationRun,
+    WebhookSubscription,
+)
 from app.schemas import (
     AccrueInterestRequest,
     ApplyMonthEndRequest,
+    ArchiveListResponse,
+    ArchiveRestoreRequest,
+    BalanceAsOfResponse,
     DepositAccountOpenRequest,
     DepositAccountResponse,
     DepositAccountListResponse,
     DomainEventResponse,
     DomainEventListResponse,
     DispatchOutboxRequest,
+    IntegrityVerifyRequest,
+    JobListResponse,
+    JobResponse,
+    JobSubmitRequest,
     LedgerEntryResponse,
     LedgerEntryListResponse,
     MoneyRequest,
     OutboxMessageResponse,
     OutboxMessageListResponse,
     OutboxReplayRequest,
+    ProjectReadModelRequest,
+    QueueAckRequest,
+    QueueAckResponse,
+    QueueConsumerGroupListResponse,
+    QueueConsumerGroupResponse,
+    QueuePollResponse,
+    ReconciliationBreakResponse,
+    ReconciliationRunRequest,
+    ReconciliationRunResponse,
+    RetentionRunRequest,
+    StatementRunRequest,
     LoanAccountOpenRequest,
     LoanAccountResponse,
     LoanAccountListResponse,
     WebhookSubscriptionCreateRequest,
+    WebhookSubscriptionHealthResponse,
     WebhookSubscriptionResponse,
     WebhookSubscriptionListResponse,
+    WebhookSubscriptionUpdateRequest,
+    WriteBehindRequest,
+)
+from app.services import circuit
+from app.services.account_cache import account_cache
+from app.services.group_commit import group_commit
+from app.services.balances import balance_as_of
+from app.services.deposit import (
+    apply_month_end,
+    accrue_interest,
+    flush_hot_accounts,
+    open_account,
+    post_deposit,
+    post_withdrawal,
+    set_write_behind,
+    unflushed_totals,
 )
-from app.services.deposit import apply_month_end, accrue_interest, open_account, post_deposit, post_withdrawal
 from app.models import LoanAccount
+from app.services.integrity import verify_chains
 from app.services.loan import accrue_interest as loan_accrue_interest
 from app.services.loan import open_loan, post_repayment
+from app.services.outbox import count_replay, dispatch_outbox, replay_outbox
+from app.services.projection import get_checkpoint, read_model_lag, run_projection
+from app.services.reconciliation import run_reconciliation
+from app.services import queue as queue_service
+from app.services.retention import iter_archive, restore_archive, run_retention
+from app.services.statements import generate_statements
+from app.services.stream import Subscription, head_seq, notifier
+from app.settings import settings
 from app.time import utcnow
 
 
@@ -44,18 +105,118 @@ def _dec(s: str) -> Decimal:
     return Decimal(s)
 
 
-def _deposit_response(acct: DepositAccount) -> DepositAccountResponse:
+def _set_read_model_headers(response: Response, read_db: Session) -> None:
+    synced_at, lag = read_model_lag(read_db)
+    if synced_at is None:
+        response.headers["X-Read-Model-Lag"] = "unknown"
+        return
+    response.headers["X-Read-Model-Synced-At"] = synced_at.isoformat()
+    response.headers["X-Read-Model-Lag"] = f"{lag:.3f}"
+
+
+def _etag(*parts) -> str:
+    return '"' + hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _not_modified(etag: str, response: Response) -> Response:
+    headers = {k: v for k, v in response.headers.items() if k.lower().startswith("x-read-model")}
+    return Response(status_code=304, headers={**headers, "ETag": etag})
+
+
+def _events_marker(db: Session) -> int:
+    head = db.get(ChainHead, ("domain_events", ""))
+    return head.last_seq if head is not None else 0
+
+
+def _projection_marker(read_db: Session) -> int:
+    checkpoint = get_checkpoint(read_db)
+    return checkpoint.last_offset if checkpoint is not None else -1
+
+
+def _deposit_response(
+    acct: DepositAccount | DepositAccountSummary, unflushed: Decimal = Decimal("0")
+) -> DepositAccountResponse:
     return DepositAccountResponse(
         id=acct.id,
         opened_on=acct.opened_on,
         status=acct.status,
         annual_interest_rate=_dec(acct.annual_interest_rate),
         day_count_basis=acct.day_count_basis,
-        current_balance=_dec(acct.current_balance),
+        current_balance=_dec(acct.current_balance) + unflushed,
         accrued_interest=_dec(acct.accrued_interest),
     )
 
 
+def _deposit_responses(db: Session, accts: list[DepositAccount]) -> list[DepositAccountResponse]:
+    unflushed = unflushed_totals(db, [a.id for a in accts if a.write_behind])
+    return [_deposit_response(a, unflushed.get(a.id, Decimal("0"))) for a in accts]
+
+
+def _apply_posting(db: Session, model, op: Callable[[Session], DepositAccount | LoanAccount]):
+    try:
+        if settings.group_commit_enabled:
+            account_id = group_commit.submit(lambda session: op(session).id)
+        else:
+            account_id = retry_on_conflict(db, lambda: op(db)).id
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return db.get(model, account_id)
+
+
+def _before_account(q, model, before_id: str | None):
+    if before_id is None:
+        return q
+    anchor = q.session.get(model, before_id)
+    if anchor is None:
+        raise HTTPException(status_code=400, detail="unknown_before_id")
+    return q.filter(
+        or_(
+            model.created_at < anchor.created_at,
+            and_(model.created_at == anchor.created_at, model.id < anchor.id),
+        )
+    )
+
+
+def _subscription_response(sub: WebhookSubscription) -> WebhookSubscriptionResponse:
+    return WebhookSubscriptionResponse(
+        id=sub.id,
+        target_url=sub.target_url,
+        enabled=sub.enabled,
+        batch_max_size=sub.batch_max_size,
+        batch_linger_ms=sub.batch_linger_ms,
+        event_types=sub.event_types,
+        aggregate_types=sub.aggregate_types,
+    )
+
+
+def _job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        params=job.params,
+        processed=job.processed,
+        total=job.total,
+        rate_per_second=job_rate(job),
+        result=job.result,
+        error=job.error,
+        cancel_requested=job.cancel_requested,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        updated_at=job.updated_at,
+    )
+
+
 def _outbox_response(msg: OutboxMessage) -> OutboxMessageResponse:
     return OutboxMessageResponse(
         id=msg.id,
@@ -76,6 +237,8 @@ def _event_response(ev: DomainEvent) -> DomainEventResponse:
         created_at=ev.created_at,
         aggregate_type=ev.aggregate_type,
         aggregate_id=ev.aggregate_id,
+        sequence=ev.sequence,
+        chain_seq=ev.chain_seq,
         event_type=ev.event_type,
         event_time=ev.event_time,
         payload=ev.payload,
@@ -95,10 +258,11 @@ def _ledger_response(le: LedgerEntry) -> LedgerEntryResponse:
         debit_account=le.debit_account,
         credit_account=le.credit_account,
         amount=_dec(le.amount),
+        chain_seq=le.chain_seq,
     )
 
 
-def _loan_response(acct: LoanAccount) -> LoanAccountResponse:
+def _loan_response(acct: LoanAccount | LoanAccountSummary) -> LoanAccountResponse:
     return LoanAccountResponse(
         id=acct.id,
         opened_on=acct.opened_on,
@@ -126,65 +290,182 @@ def create_deposit_account(req: DepositAccountOpenRequest, db: Session = Depends
 
 
 @router.get("/deposit/accounts", response_model=DepositAccountListResponse)
-def list_deposit_accounts(limit: int = 100, offset: int = 0, db: Session = Depends(get_db)):
+def list_deposit_accounts(
+    response: Response,
+    limit: int = 100,
+    offset: int = 0,
+    before_id: str | None = None,
+    read_model: bool = False,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+):
+    if read_model:
+        _set_read_model_headers(response, read_db)
+        etag = _etag("deposit_accounts", "read_model", _projection_marker(read_db), limit, offset, before_id)
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag, response)
+        response.headers["ETag"] = etag
+        q = read_db.query(DepositAccountSummary)
+        total = q.count()
+        rows = (
+            _before_account(q, DepositAccountSummary, before_id)
+            .order_by(DepositAccountSummary.created_at.desc(), DepositAccountSummary.id.desc())
+            .offset(offset)
+            .limit(min(limit, 500))
+            .all()
+        )
+        return DepositAccountListResponse(total=total, items=[_deposit_response(a) for a in rows])
+
+    unflushed = db.query(func.count(PostingJournalEntry.id)).filter(PostingJournalEntry.flushed_at.is_(None)).scalar()
+    etag = _etag("deposit_accounts", _events_marker(db), unflushed, limit, offset, before_id)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag, response)
+    response.headers["ETag"] = etag
     q = db.query(DepositAccount)
     total = q.count()
-    rows = q.order_by(DepositAccount.created_at.desc()).offset(offset).limit(min(limit, 500)).all()
-    return DepositAccountListResponse(total=total, items=[_deposit_response(a) for a in rows])
+    rows = (
+        _before_account(q, DepositAccount, before_id)
+        .order_by(DepositAccount.created_at.desc(), DepositAccount.id.desc())
+        .offset(offset)
+        .limit(min(limit, 500))
+        .all()
+    )
+    return DepositAccountListResponse(total=total, items=_deposit_responses(db, rows))
 
 
 @router.get("/deposit/accounts/{account_id}", response_model=DepositAccountResponse)
-def get_deposit_account(account_id: str, db: Session = Depends(get_db)):
+def get_deposit_account(
+    account_id: str,
+    response: Response,
+    read_model: bool = False,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+):
+    if read_model:
+        _set_read_model_headers(response, read_db)
+        marker = (
+            read_db.query(DepositAccountSummary.last_event_id)
+            .filter(DepositAccountSummary.id == account_id)
+            .first()
+        )
+        if marker is None:
+            raise HTTPException(status_code=404, detail="account_not_found")
+        etag = _etag("deposit_account", "read_model", account_id, marker.last_event_id)
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag, response)
+        response.headers["ETag"] = etag
+        return _deposit_response(read_db.get(DepositAccountSummary, account_id))
+
+    marker = (
+        db.query(DepositAccount.version, DepositAccount.write_behind)
+        .filter(DepositAccount.id == account_id)
+        .first()
+    )
+    if marker is None:
+        raise HTTPException(status_code=404, detail="account_not_found")
+    journaled = 0
+    if marker.write_behind:
+        journaled = (
+            db.query(func.count(PostingJournalEntry.id))
+            .filter(PostingJournalEntry.account_id == account_id)
+            .scalar()
+        )
+    etag = _etag("deposit_account", account_id, marker.version, journaled)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag, response)
+    response.headers["ETag"] = etag
+
+    cached = account_cache.get("deposit_account", account_id, marker.version)
+    if cached is None:
+        cached = _deposit_response(db.get(DepositAccount, account_id))
+        account_cache.put("deposit_account", account_id, marker.version, cached)
+    if not journaled:
+        return cached
+    unflushed = unflushed_totals(db, [account_id]).get(account_id, Decimal("0"))
+    return cached.model_copy(update={"current_balance": cached.current_balance + unflushed})
+
+
+@router.get("/deposit/accounts/{account_id}/balance", response_model=BalanceAsOfResponse)
+def get_deposit_balance(account_id: str, as_of: dt.date, db: Session = Depends(get_db)):
     acct = db.get(DepositAccount, account_id)
-    if not acct:
+    if acct is None:
         raise HTTPException(status_code=404, detail="account_not_found")
-    return _deposit_response(acct)
+    balance, snapshot_date = balance_as_of(db, account_type="deposit_account", account_id=account_id, as_of=as_of)
+    if acct.write_behind:
+        balance += unflushed_totals(db, [account_id], as_of=as_of).get(account_id, Decimal("0"))
+    return BalanceAsOfResponse(account_id=account_id, as_of=as_of, balance=balance, snapshot_date=snapshot_date)
 
 
 @router.post("/deposit/accounts/{account_id}/deposit", response_model=DepositAccountResponse)
 def deposit(account_id: str, req: MoneyRequest, db: Session = Depends(get_db)):
-    try:
-        acct = post_deposit(
-            db,
+    acct = _apply_posting(
+        db,
+        DepositAccount,
+        lambda session: post_deposit(
+            session,
             account_id=account_id,
             amount=req.amount,
             effective_date=req.effective_date,
             idempotency_key=req.idempotency_key,
-        )
+        ),
+    )
+    return _deposit_responses(db, [acct])[0]
+
+
+@router.post("/deposit/accounts/{account_id}/write-behind", response_model=DepositAccountResponse)
+def deposit_write_behind(account_id: str, req: WriteBehindRequest, db: Session = Depends(get_db)):
+    try:
+        acct = retry_on_conflict(db, lambda: set_write_behind(db, account_id=account_id, enabled=req.enabled))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-    db.commit()
     db.refresh(acct)
-    return _deposit_response(acct)
+    return _deposit_responses(db, [acct])[0]
+
+
+@router.post("/deposit/hot-accounts/flush")
+def flush_deposit_hot_accounts(db: Session = Depends(get_db)):
+    try:
+        flushed = flush_hot_accounts(db, max_accounts=settings.hot_account_flush_batch_size)
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"accounts": len(flushed), "entries": sum(flushed.values())}
+
+
+@router.get("/deposit/hot-accounts/flusher")
+def hot_account_flusher_stats():
+    return hot_account_flusher.stats()
 
 
 @router.post("/deposit/accounts/{account_id}/withdraw", response_model=DepositAccountResponse)
 def withdraw(account_id: str, req: MoneyRequest, db: Session = Depends(get_db)):
-    try:
-        acct = post_withdrawal(
-            db,
+    acct = _apply_posting(
+        db,
+        DepositAccount,
+        lambda session: post_withdrawal(
+            session,
             account_id=account_id,
             amount=req.amount,
             effective_date=req.effective_date,
             idempotency_key=req.idempotency_key,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-    db.commit()
-    db.refresh(acct)
+        ),
+    )
     return _deposit_response(acct)
 
 
 @router.post("/deposit/accounts/{account_id}/accrue", response_model=DepositAccountResponse)
 def accrue(account_id: str, req: AccrueInterestRequest, db: Session = Depends(get_db)):
     try:
-        acct = accrue_interest(db, account_id=account_id, as_of_date=req.as_of_date)
+        acct = retry_on_conflict(db, lambda: accrue_interest(db, account_id=account_id, as_of_date=req.as_of_date))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-    db.commit()
     db.refresh(acct)
     return _deposit_response(acct)
 
@@ -192,22 +473,64 @@ def accrue(account_id: str, req: AccrueInterestRequest, db: Session = Depends(ge
 @router.post("/deposit/accounts/{account_id}/month-end", response_model=DepositAccountResponse)
 def month_end(account_id: str, req: ApplyMonthEndRequest, db: Session = Depends(get_db)):
     try:
-        acct = apply_month_end(db, account_id=account_id, effective_date=req.effective_date)
+        acct = retry_on_conflict(db, lambda: apply_month_end(db, account_id=account_id, effective_date=req.effective_date))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-    db.commit()
     db.refresh(acct)
     return _deposit_response(acct)
 
 
 @router.post("/webhooks/subscriptions", response_model=WebhookSubscriptionResponse)
 def create_webhook_subscription(req: WebhookSubscriptionCreateRequest, db: Session = Depends(get_db)):
-    sub = WebhookSubscription(target_url=req.target_url, enabled=True)
+    sub = WebhookSubscription(
+        target_url=req.target_url,
+        enabled=True,
+        batch_max_size=req.batch_max_size,
+        batch_linger_ms=req.batch_linger_ms,
+        event_types=req.event_types,
+        aggregate_types=req.aggregate_types,
+    )
     db.add(sub)
     db.commit()
     db.refresh(sub)
-    return WebhookSubscriptionResponse(id=sub.id, target_url=sub.target_url, enabled=sub.enabled)
+    return _subscription_response(sub)
+
+
+@router.patch("/webhooks/subscriptions/{subscription_id}", response_model=WebhookSubscriptionResponse)
+def update_webhook_subscription(
+    subscription_id: str,
+    req: WebhookSubscriptionUpdateRequest,
+    db: Session = Depends(get_db),
+):
+    sub = db.get(WebhookSubscription, subscription_id)
+    if not sub:
+        raise HTTPException(status_code=404, detail="subscription_not_found")
+    for field, value in req.model_dump(exclude_unset=True).items():
+        setattr(sub, field, value)
+    db.commit()
+    db.refresh(sub)
+    return _subscription_response(sub)
+
+
+@router.get("/webhooks/subscriptions/{subscription_id}/health", response_model=WebhookSubscriptionHealthResponse)
+def get_webhook_subscription_health(subscription_id: str, db: Session = Depends(get_db)):
+    if not db.get(WebhookSubscription, subscription_id):
+        raise HTTPException(status_code=404, detail="subscription_not_found")
+    health = circuit.get_health(db, subscription_id)
+    db.commit()
+    return WebhookSubscriptionHealthResponse(
+        subscription_id=subscription_id,
+        circuit_state=health.circuit_state,
+        consecutive_failures=health.consecutive_failures,
+        samples=len(health.window),
+        error_rate=circuit.error_rate(health),
+        p95_latency_ms=circuit.p95_latency_ms(health),
+        opened_at=health.opened_at,
+        next_probe_at=health.next_probe_at,
+    )
 
 
 @router.get("/webhooks/subscriptions", response_model=WebhookSubscriptionListResponse)
@@ -217,7 +540,7 @@ def list_webhook_subscriptions(limit: int = 100, offset: int = 0, enabled: bool
         q = q.filter(WebhookSubscription.enabled.is_(enabled))
     total = q.count()
     rows = q.order_by(WebhookSubscription.created_at.desc()).offset(offset).limit(min(limit, 500)).all()
-    items = [WebhookSubscriptionResponse(id=s.id, target_url=s.target_url, enabled=s.enabled) for s in rows]
+    items = [_subscription_response(s) for s in rows]
     return WebhookSubscriptionListResponse(total=total, items=items)
 
 
@@ -237,10 +560,36 @@ def create_loan_account(req: LoanAccountOpenRequest, db: Session = Depends(get_d
 
 
 @router.get("/loan/accounts", response_model=LoanAccountListResponse)
-def list_loan_accounts(limit: int = 100, offset: int = 0, db: Session = Depends(get_db)):
-    q = db.query(LoanAccount)
+def list_loan_accounts(
+    response: Response,
+    limit: int = 100,
+    offset: int = 0,
+    before_id: str | None = None,
+    read_model: bool = False,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+):
+    if read_model:
+        _set_read_model_headers(response, read_db)
+        etag = _etag("loan_accounts", "read_model", _projection_marker(read_db), limit, offset, before_id)
+        model = LoanAccountSummary
+        q = read_db.query(LoanAccountSummary)
+    else:
+        etag = _etag("loan_accounts", _events_marker(db), limit, offset, before_id)
+        model = LoanAccount
+        q = db.query(LoanAccount)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag, response)
+    response.headers["ETag"] = etag
     total = q.count()
-    rows = q.order_by(LoanAccount.created_at.desc()).offset(offset).limit(min(limit, 500)).all()
+    rows = (
+        _before_account(q, model, before_id)
+        .order_by(model.created_at.desc(), model.id.desc())
+        .offset(offset)
+        .limit(min(limit, 500))
+        .all()
+    )
     return LoanAccountListResponse(total=total, items=[_loan_response(a) for a in rows])
 
 
@@ -253,6 +602,7 @@ def list_outbox_messages(
     event_id: str | None = None,
     aggregate_type: str | None = None,
     aggregate_id: str | None = None,
+    before_id: str | None = None,
     db: Session = Depends(get_db),
 ):
     q = db.query(OutboxMessage)
@@ -267,10 +617,63 @@ def list_outbox_messages(
     if aggregate_id is not None:
         q = q.filter(OutboxMessage.event.has(aggregate_id=aggregate_id))
     total = q.count()
-    rows = q.order_by(OutboxMessage.created_at.desc()).offset(offset).limit(min(limit, 500)).all()
+    if before_id is not None:
+        q = q.filter(OutboxMessage.id < before_id)
+    rows = q.order_by(OutboxMessage.id.desc()).offset(offset).limit(min(limit, 500)).all()
     return OutboxMessageListResponse(total=total, items=[_outbox_response(m) for m in rows])
 
 
+async def _sse_frames(sub: Subscription):
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(sub.queue.get(), timeout=settings.event_stream_keepalive_seconds)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if frame is None:
+                return
+            yield frame
+    finally:
+        notifier.unsubscribe(sub)
+
+
+@router.get("/events/stream")
+async def stream_events(
+    aggregate_type: str | None = None,
+    aggregate_id: str | None = None,
+    event_type: str | None = None,
+    last_event_id: int | None = None,
+    last_event_id_header: str | None = Header(None, alias="Last-Event-ID"),
+):
+    if last_event_id_header:
+        try:
+            last_event_id = int(last_event_id_header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="invalid_last_event_id")
+    if last_event_id is None:
+        last_event_id = await run_in_threadpool(head_seq)
+
+    sub = Subscription(
+        asyncio.get_running_loop(),
+        after_seq=last_event_id,
+        aggregate_type=aggregate_type,
+        aggregate_id=aggregate_id,
+        event_type=event_type,
+    )
+    notifier.subscribe(sub)
+    return StreamingResponse(
+        _sse_frames(sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/events/stream/stats")
+def event_stream_stats():
+    return notifier.stats()
+
+
 @router.get("/events", response_model=DomainEventListResponse)
 def list_events(
     limit: int = 200,
@@ -279,6 +682,8 @@ def list_events(
     aggregate_id: str | None = None,
     event_type: str | None = None,
     idempotency_key: str | None = None,
+    after_sequence: int | None = None,
+    before_seq: int | None = None,
     db: Session = Depends(get_db),
 ):
     q = db.query(DomainEvent)
@@ -290,8 +695,18 @@ def list_events(
         q = q.filter(DomainEvent.event_type == event_type)
     if idempotency_key is not None:
         q = q.filter(DomainEvent.idempotency_key == idempotency_key)
+
+    if after_sequence is not None:
+        if aggregate_id is None:
+            raise HTTPException(status_code=400, detail="after_sequence_requires_aggregate_id")
+        q = q.filter(DomainEvent.sequence > after_sequence)
+        rows = q.order_by(DomainEvent.sequence.asc()).limit(min(limit, 1000)).all()
+        return DomainEventListResponse(total=len(rows), items=[_event_response(e) for e in rows])
+
     total = q.count()
-    rows = q.order_by(DomainEvent.created_at.desc()).offset(offset).limit(min(limit, 1000)).all()
+    if before_seq is not None:
+        q = q.filter(DomainEvent.chain_seq < before_seq)
+    rows = q.order_by(DomainEvent.chain_seq.desc()).offset(offset).limit(min(limit, 1000)).all()
     return DomainEventListResponse(total=total, items=[_event_response(e) for e in rows])
 
 
@@ -304,6 +719,7 @@ def list_ledger_entries(
     txn_id: str | None = None,
     effective_date_from: dt.date | None = None,
     effective_date_to: dt.date | None = None,
+    before_seq: int | None = None,
     db: Session = Depends(get_db),
 ):
     q = db.query(LedgerEntry)
@@ -318,159 +734,336 @@ def list_ledger_entries(
     if effective_date_to is not None:
         q = q.filter(LedgerEntry.effective_date <= effective_date_to)
     total = q.count()
-    rows = q.order_by(LedgerEntry.created_at.desc()).offset(offset).limit(min(limit, 1000)).all()
+    if before_seq is not None:
+        q = q.filter(LedgerEntry.chain_seq < before_seq)
+    rows = q.order_by(LedgerEntry.chain_seq.desc()).offset(offset).limit(min(limit, 1000)).all()
     return LedgerEntryListResponse(total=total, items=[_ledger_response(le) for le in rows])
 
 
 @router.get("/loan/accounts/{account_id}", response_model=LoanAccountResponse)
-def get_loan_account(account_id: str, db: Session = Depends(get_db)):
-    acct = db.get(LoanAccount, account_id)
-    if not acct:
+def get_loan_account(
+    account_id: str,
+    response: Response,
+    read_model: bool = False,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+):
+    if read_model:
+        _set_read_model_headers(response, read_db)
+        marker = read_db.query(LoanAccountSummary.last_event_id).filter(LoanAccountSummary.id == account_id).first()
+        if marker is None:
+            raise HTTPException(status_code=404, detail="account_not_found")
+        etag = _etag("loan_account", "read_model", account_id, marker.last_event_id)
+        if _etag_matches(if_none_match, etag):
+            return _not_modified(etag, response)
+        response.headers["ETag"] = etag
+        return _loan_response(read_db.get(LoanAccountSummary, account_id))
+
+    marker = db.query(LoanAccount.version).filter(LoanAccount.id == account_id).first()
+    if marker is None:
         raise HTTPException(status_code=404, detail="account_not_found")
-    return _loan_response(acct)
+    etag = _etag("loan_account", account_id, marker.version)
+    if _etag_matches(if_none_match, etag):
+        return _not_modified(etag, response)
+    response.headers["ETag"] = etag
+
+    cached = account_cache.get("loan_account", account_id, marker.version)
+    if cached is None:
+        cached = _loan_response(db.get(LoanAccount, account_id))
+        account_cache.put("loan_account", account_id, marker.version, cached)
+    return cached
+
+
+@router.get("/loan/accounts/{account_id}/balance", response_model=BalanceAsOfResponse)
+def get_loan_balance(account_id: str, as_of: dt.date, db: Session = Depends(get_db)):
+    if db.get(LoanAccount, account_id) is None:
+        raise HTTPException(status_code=404, detail="account_not_found")
+    balance, snapshot_date = balance_as_of(db, account_type="loan_account", account_id=account_id, as_of=as_of)
+    return BalanceAsOfResponse(account_id=account_id, as_of=as_of, balance=balance, snapshot_date=snapshot_date)
 
 
 @router.post("/loan/accounts/{account_id}/accrue", response_model=LoanAccountResponse)
 def loan_accrue(account_id: str, req: AccrueInterestRequest, db: Session = Depends(get_db)):
     try:
-        acct = loan_accrue_interest(db, account_id=account_id, as_of_date=req.as_of_date)
+        acct = retry_on_conflict(db, lambda: loan_accrue_interest(db, account_id=account_id, as_of_date=req.as_of_date))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
-    db.commit()
     db.refresh(acct)
     return _loan_response(acct)
 
 
 @router.post("/loan/accounts/{account_id}/repay", response_model=LoanAccountResponse)
 def loan_repay(account_id: str, req: MoneyRequest, db: Session = Depends(get_db)):
-    try:
-        acct = post_repayment(
-            db,
+    acct = _apply_posting(
+        db,
+        LoanAccount,
+        lambda session: post_repayment(
+            session,
             account_id=account_id,
             amount=req.amount,
             effective_date=req.effective_date,
             idempotency_key=req.idempotency_key,
-        )
+        ),
+    )
+    return _loan_response(acct)
+
+
+@router.post("/outbox/dispatch")
+def dispatch(req: DispatchOutboxRequest, db: Session = Depends(get_db)):
+    results = dispatch_outbox(db, max_messages=req.max_messages)
+    db.commit()
+    lingering = sum(1 for r in results if r["status"] == "LINGER")
+    return {"processed": len(results) - lingering, "lingering": lingering, "results": results}
+
+
+@router.post("/read-model/project")
+def project_read_model(
+    req: ProjectReadModelRequest,
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+):
+    return run_projection(db, read_db, max_messages=req.max_messages)
+
+
+@router.get("/queue/{topic}/poll", response_model=QueuePollResponse)
+async def poll_queue(
+    topic: str,
+    group: str = Query(..., min_length=1),
+    max_messages: int = Query(100, alias="max", ge=1, le=1000),
+    wait: float = Query(0.0, ge=0.0, le=30.0),
+):
+    committed, batch = await queue_service.poll(topic=topic, group=group, max_messages=max_messages, wait_seconds=wait)
+    body = queue_service.encode_poll_response(
+        topic=topic,
+        group=group,
+        committed_offset=committed,
+        next_offset=batch[-1][0] + 1 if batch else committed + 1,
+        batch=batch,
+    )
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/queue/{topic}/ack", response_model=QueueAckResponse)
+def ack_queue(topic: str, req: QueueAckRequest, db: Session = Depends(get_db)):
+    try:
+        committed = queue_service.ack(db, topic=topic, group=req.group, offset=req.offset)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     db.commit()
-    db.refresh(acct)
-    return _loan_response(acct)
+    return QueueAckResponse(topic=topic, group=req.group, committed_offset=committed)
+
+
+@router.get("/queue/{topic}/groups", response_model=QueueConsumerGroupListResponse)
+def list_queue_groups(topic: str, db: Session = Depends(get_db)):
+    head = queue_service.head_offset(db, topic=topic)
+    items = [
+        QueueConsumerGroupResponse(
+            group=g.group_name,
+            committed_offset=g.committed_offset,
+            lag=head - g.committed_offset,
+            updated_at=g.updated_at,
+        )
+        for g in queue_service.list_groups(db, topic=topic)
+    ]
+    return QueueConsumerGroupListResponse(topic=topic, head_offset=head, items=items)
 
 
-@router.post("/outbox/dispatch")
-def dispatch_outbox(req: DispatchOutboxRequest, db: Session = Depends(get_db)):
-    now = utcnow()
-    pending = (
-        db.query(OutboxMessage)
-        .filter(OutboxMessage.status == "PENDING")
-        .filter(or_(OutboxMessage.next_attempt_at.is_(None), OutboxMessage.next_attempt_at <= now))
-        .order_by(OutboxMessage.created_at.asc())
-        .limit(req.max_messages)
+@router.post("/retention/run")
+def retention_run(req: RetentionRunRequest, db: Session = Depends(get_db)):
+    days = settings.retention_days if req.retention_days is None else req.retention_days
+    try:
+        archived = run_retention(
+            db,
+            older_than=utcnow() - dt.timedelta(days=days),
+            batch_size=req.batch_size or settings.retention_batch_size,
+            tables=req.tables,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"archived": archived}
+
+
+@router.post("/integrity/verify")
+def integrity_verify(req: IntegrityVerifyRequest, db: Session = Depends(get_db)):
+    try:
+        results = verify_chains(db, chains=req.chains, chunk_size=req.chunk_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"ok": all(r["ok"] for r in results), "chains": results}
+
+
+def _reconciliation_response(db: Session, run: ReconciliationRun, limit: int) -> ReconciliationRunResponse:
+    breaks = (
+        db.query(ReconciliationBreak)
+        .filter(ReconciliationBreak.run_id == run.id)
+        .order_by(ReconciliationBreak.account_type.asc(), ReconciliationBreak.account_id.asc())
+        .limit(min(limit, 5000))
         .all()
     )
+    return ReconciliationRunResponse(
+        id=run.id,
+        status=run.status,
+        account_types=run.account_types,
+        accounts_checked=run.accounts_checked,
+        breaks=run.breaks,
+        created_at=run.created_at,
+        finished_at=run.finished_at,
+        items=[
+            ReconciliationBreakResponse(
+                account_type=b.account_type,
+                account_id=b.account_id,
+                stored_balance=_dec(b.stored_balance) if b.stored_balance is not None else None,
+                ledger_balance=_dec(b.ledger_balance),
+                difference=_dec(b.difference),
+            )
+            for b in breaks
+        ],
+    )
 
-    results: list[dict] = []
-    for msg in pending:
-        if msg.attempts >= msg.max_attempts:
-            msg.status = "DEAD"
-            results.append({"id": msg.id, "destination": msg.destination, "status": "DEAD"})
-            continue
 
-        msg.attempts += 1
-        try:
-            if msg.destination.startswith("queue:"):
-                db.add(
-                    QueueMessage(
-                        topic=msg.destination.split(":", 1)[1],
-                        payload={
-                            "event_id": msg.event.id,
-                            "aggregate_type": msg.event.aggregate_type,
-                            "aggregate_id": msg.event.aggregate_id,
-                            "event_type": msg.event.event_type,
-                            "event_time": msg.event.event_time.isoformat(),
-                            "payload": msg.event.payload,
-                        },
-                    )
-                )
-                msg.status = "SENT"
-                msg.last_error = None
-                msg.next_attempt_at = None
-                results.append({"id": msg.id, "destination": msg.destination, "status": "SENT"})
-
-            elif msg.destination.startswith("webhook:"):
-                sub_id = msg.destination.split(":", 1)[1]
-                sub = db.get(WebhookSubscription, sub_id)
-                if not sub or not sub.enabled:
-                    msg.status = "SKIPPED"
-                    msg.last_error = "subscription_disabled_or_missing"
-                    results.append({"id": msg.id, "destination": msg.destination, "status": "SKIPPED"})
-                else:
-                    body = {
-                        "event_id": msg.event.id,
-                        "aggregate_type": msg.event.aggregate_type,
-                        "aggregate_id": msg.event.aggregate_id,
-                        "event_type": msg.event.event_type,
-                        "event_time": msg.event.event_time.isoformat(),
-                        "payload": msg.event.payload,
-                    }
-                    with httpx.Client(timeout=5.0) as client:
-                        r = client.post(sub.target_url, json=body)
-                        r.raise_for_status()
-
-                    msg.status = "SENT"
-                    msg.last_error = None
-                    msg.next_attempt_at = None
-                    results.append({"id": msg.id, "destination": msg.destination, "status": "SENT"})
-            else:
-                msg.status = "FAILED"
-                msg.last_error = f"unknown_destination:{msg.destination}"
-                results.append({"id": msg.id, "destination": msg.destination, "status": "FAILED"})
-
-        except Exception as e:
-            msg.last_error = str(e)
-            if msg.attempts >= msg.max_attempts:
-                msg.status = "DEAD"
-                msg.next_attempt_at = None
-                results.append({"id": msg.id, "destination": msg.destination, "status": "DEAD", "error": str(e)})
-            else:
-                backoff_seconds = min(300, 2 ** (msg.attempts - 1))
-                msg.status = "PENDING"
-                msg.next_attempt_at = now + dt.timedelta(seconds=backoff_seconds)
-                results.append(
-                    {
-                        "id": msg.id,
-                        "destination": msg.destination,
-                        "status": "RETRY",
-                        "error": str(e),
-                        "next_attempt_at": msg.next_attempt_at.isoformat(),
-                    }
-                )
+@router.post("/reconciliation/run", response_model=ReconciliationRunResponse)
+def reconciliation_run(req: ReconciliationRunRequest, limit: int = 500, db: Session = Depends(get_db)):
+    try:
+        run = run_reconciliation(
+            db,
+            account_types=req.account_types,
+            chunk_size=req.chunk_size or settings.reconciliation_chunk_size,
+            workers=settings.reconciliation_workers if req.workers is None else req.workers,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _reconciliation_response(db, run, limit)
 
-    db.commit()
-    return {"processed": len(results), "results": results}
+
+@router.get("/reconciliation/runs/{run_id}", response_model=ReconciliationRunResponse)
+def get_reconciliation_run(run_id: str, limit: int = 500, db: Session = Depends(get_db)):
+    run = db.get(ReconciliationRun, run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="reconciliation_run_not_found")
+    return _reconciliation_response(db, run, limit)
+
+
+@router.post("/statements/run")
+def statements_run(req: StatementRunRequest, db: Session = Depends(get_db)):
+    try:
+        return generate_statements(
+            db,
+            period_start=req.period_start,
+            period_end=req.period_end,
+            shard_size=req.shard_size or settings.statement_shard_size,
+            workers=settings.statement_workers if req.workers is None else req.workers,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/cache/accounts")
+def account_cache_stats():
+    return account_cache.stats()
+
+
+@router.get("/archive/{table}", response_model=ArchiveListResponse)
+def list_archive(
+    table: str,
+    limit: int = 200,
+    date_from: dt.date | None = None,
+    date_to: dt.date | None = None,
+    event_id: str | None = None,
+    aggregate_type: str | None = None,
+    aggregate_id: str | None = None,
+    destination: str | None = None,
+    status: str | None = None,
+    topic: str | None = None,
+):
+    filters = {
+        "event_id": event_id,
+        "aggregate_type": aggregate_type,
+        "aggregate_id": aggregate_id,
+        "destination": destination,
+        "status": status,
+        "topic": topic,
+    }
+    items: list[dict] = []
+    try:
+        for item in iter_archive(table, date_from=date_from, date_to=date_to, filters=filters):
+            items.append(item)
+            if len(items) >= min(limit, 1000):
+                break
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ArchiveListResponse(table=table, items=items)
+
+
+@router.post("/archive/{table}/restore")
+def restore_from_archive(table: str, req: ArchiveRestoreRequest, db: Session = Depends(get_db)):
+    try:
+        restored = restore_archive(
+            db,
+            table=table,
+            date_from=req.date_from,
+            date_to=req.date_to,
+            filters=req.filters,
+            batch_size=settings.retention_batch_size,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"restored": restored}
 
 
 @router.post("/outbox/replay")
-def replay_outbox(req: OutboxReplayRequest, db: Session = Depends(get_db)):
-    q = db.query(OutboxMessage).join(OutboxMessage.event)
-
-    if req.aggregate_type is not None:
-        q = q.filter(OutboxMessage.event.has(aggregate_type=req.aggregate_type))
-    if req.aggregate_id is not None:
-        q = q.filter(OutboxMessage.event.has(aggregate_id=req.aggregate_id))
-    if req.destination is not None:
-        q = q.filter(OutboxMessage.destination == req.destination)
-
-    updated = 0
-    for msg in q.all():
-        msg.status = "PENDING"
-        msg.attempts = 0
-        msg.last_error = None
-        msg.next_attempt_at = utcnow()
-        updated += 1
+def replay(req: OutboxReplayRequest, db: Session = Depends(get_db)):
+    filters = req.model_dump(include=set(REPLAY_FILTERS))
+    if req.dry_run:
+        return {"matched": count_replay(db, **filters)}
+    if req.background:
+        params = req.model_dump(mode="json", include={*REPLAY_FILTERS, "chunk_size"})
+        return _job_response(runner.submit(db, kind="outbox_replay", params=params))
+    return {"updated": replay_outbox(db, chunk_size=req.chunk_size, **filters)}
+
+
+@router.post("/jobs", response_model=JobResponse)
+def submit_job(req: JobSubmitRequest, db: Session = Depends(get_db)):
+    try:
+        job = runner.submit(db, kind=req.kind, params=req.params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _job_response(job)
 
-    db.commit()
-    return {"updated": updated}
+
+@router.get("/jobs", response_model=JobListResponse)
+def list_jobs(
+    limit: int = 100,
+    offset: int = 0,
+    status: str | None = None,
+    kind: str | None = None,
+    db: Session = Depends(get_db),
+):
+    q = db.query(Job)
+    if status is not None:
+        q = q.filter(Job.status == status)
+    if kind is not None:
+        q = q.filter(Job.kind == kind)
+    total = q.count()
+    rows = q.order_by(Job.created_at.desc()).offset(offset).limit(min(limit, 500)).all()
+    return JobListResponse(total=total, items=[_job_response(j) for j in rows])
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    return _job_response(job)
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+def cancel_job(job_id: str, db: Session = Depends(get_db)):
+    job = runner.cancel(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    return _job_response(job)
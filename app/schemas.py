@@ -1,7 +1,7 @@
 import datetime as dt
 from decimal import Decimal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class DepositAccountOpenRequest(BaseModel):
@@ -26,12 +26,23 @@ class DepositAccountListResponse(BaseModel):
     items: list[DepositAccountResponse]
 
 
+class BalanceAsOfResponse(BaseModel):
+    account_id: str
+    as_of: dt.date
+    balance: Decimal
+    snapshot_date: dt.date | None
+
+
 class MoneyRequest(BaseModel):
     amount: Decimal = Field(..., gt=Decimal("0"))
     effective_date: dt.date
     idempotency_key: str | None = None
 
 
+class WriteBehindRequest(BaseModel):
+    enabled: bool
+
+
 class AccrueInterestRequest(BaseModel):
     as_of_date: dt.date
 
@@ -42,12 +53,48 @@ class ApplyMonthEndRequest(BaseModel):
 
 class WebhookSubscriptionCreateRequest(BaseModel):
     target_url: str
+    batch_max_size: int = Field(1, ge=1, le=1000)
+    batch_linger_ms: int = Field(0, ge=0, le=600000)
+    event_types: list[str] | None = Field(None, min_length=1)
+    aggregate_types: list[str] | None = Field(None, min_length=1)
+
+
+class WebhookSubscriptionUpdateRequest(BaseModel):
+    target_url: str | None = None
+    enabled: bool | None = None
+    batch_max_size: int | None = Field(None, ge=1, le=1000)
+    batch_linger_ms: int | None = Field(None, ge=0, le=600000)
+    event_types: list[str] | None = Field(None, min_length=1)
+    aggregate_types: list[str] | None = Field(None, min_length=1)
+
+    # Only the filters may be cleared; the other columns are NOT NULL.
+    @field_validator("target_url", "enabled", "batch_max_size", "batch_linger_ms")
+    @classmethod
+    def _not_null(cls, value):
+        if value is None:
+            raise ValueError("may not be null")
+        return value
 
 
 class WebhookSubscriptionResponse(BaseModel):
     id: str
     target_url: str
     enabled: bool
+    batch_max_size: int
+    batch_linger_ms: int
+    event_types: list[str] | None
+    aggregate_types: list[str] | None
+
+
+class WebhookSubscriptionHealthResponse(BaseModel):
+    subscription_id: str
+    circuit_state: str
+    consecutive_failures: int
+    samples: int
+    error_rate: float
+    p95_latency_ms: float | None
+    opened_at: dt.datetime | None
+    next_probe_at: dt.datetime | None
 
 
 class WebhookSubscriptionListResponse(BaseModel):
@@ -59,10 +106,74 @@ class DispatchOutboxRequest(BaseModel):
     max_messages: int = Field(50, ge=1, le=500)
 
 
+class ProjectReadModelRequest(BaseModel):
+    max_messages: int = Field(500, ge=1, le=5000)
+
+
 class OutboxReplayRequest(BaseModel):
     aggregate_type: str | None = None
     aggregate_id: str | None = None
+    event_type: str | None = None
     destination: str | None = None
+    created_after: dt.datetime | None = None
+    created_before: dt.datetime | None = None
+    dry_run: bool = False
+    background: bool = False
+    chunk_size: int = Field(1000, ge=1, le=50000)
+
+
+class RetentionRunRequest(BaseModel):
+    retention_days: int | None = Field(None, ge=0)
+    batch_size: int | None = Field(None, ge=1, le=10000)
+    tables: list[str] | None = None
+
+
+class IntegrityVerifyRequest(BaseModel):
+    chains: list[str] | None = None
+    chunk_size: int = Field(1000, ge=1, le=50000)
+
+
+class ReconciliationRunRequest(BaseModel):
+    account_types: list[str] | None = None
+    chunk_size: int | None = Field(None, ge=1, le=100000)
+    workers: int | None = Field(None, ge=0, le=64)
+
+
+class ReconciliationBreakResponse(BaseModel):
+    account_type: str
+    account_id: str
+    stored_balance: Decimal | None
+    ledger_balance: Decimal
+    difference: Decimal
+
+
+class ReconciliationRunResponse(BaseModel):
+    id: str
+    status: str
+    account_types: list[str]
+    accounts_checked: int
+    breaks: int
+    created_at: dt.datetime
+    finished_at: dt.datetime | None
+    items: list[ReconciliationBreakResponse]
+
+
+class StatementRunRequest(BaseModel):
+    period_start: dt.date
+    period_end: dt.date
+    shard_size: int | None = Field(None, ge=1, le=1000000)
+    workers: int | None = Field(None, ge=0, le=64)
+
+
+class ArchiveRestoreRequest(BaseModel):
+    date_from: dt.date | None = None
+    date_to: dt.date | None = None
+    filters: dict[str, str] | None = None
+
+
+class ArchiveListResponse(BaseModel):
+    table: str
+    items: list[dict]
 
 
 class LoanAccountOpenRequest(BaseModel):
@@ -111,6 +222,8 @@ class DomainEventResponse(BaseModel):
     created_at: dt.datetime
     aggregate_type: str
     aggregate_id: str
+    sequence: int | None
+    chain_seq: int | None
     event_type: str
     event_time: dt.datetime
     payload: dict
@@ -133,8 +246,73 @@ class LedgerEntryResponse(BaseModel):
     debit_account: str
     credit_account: str
     amount: Decimal
+    chain_seq: int | None
 
 
 class LedgerEntryListResponse(BaseModel):
     total: int
     items: list[LedgerEntryResponse]
+
+
+class QueueMessageEnvelope(BaseModel):
+    offset: int
+    envelope: dict
+
+
+class QueuePollResponse(BaseModel):
+    topic: str
+    group: str
+    committed_offset: int
+    next_offset: int
+    messages: list[QueueMessageEnvelope]
+
+
+class QueueAckRequest(BaseModel):
+    group: str = Field(..., min_length=1)
+    offset: int = Field(..., ge=0)
+
+
+class QueueAckResponse(BaseModel):
+    topic: str
+    group: str
+    committed_offset: int
+
+
+class QueueConsumerGroupResponse(BaseModel):
+    group: str
+    committed_offset: int
+    lag: int
+    updated_at: dt.datetime
+
+
+class QueueConsumerGroupListResponse(BaseModel):
+    topic: str
+    head_offset: int
+    items: list[QueueConsumerGroupResponse]
+
+
+class JobSubmitRequest(BaseModel):
+    kind: str
+    params: dict = Field(default_factory=dict)
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    params: dict
+    processed: int
+    total: int | None
+    rate_per_second: float | None
+    result: dict | None
+    error: str | None
+    cancel_requested: bool
+    created_at: dt.datetime
+    started_at: dt.datetime | None
+    finished_at: dt.datetime | None
+    updated_at: dt.datetime
+
+
+class JobListResponse(BaseModel):
+    total: int
+    items: list[JobResponse]
@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import DepositAccount, LoanAccount
+from app.settings import settings
+
+
+ACCOUNT_TYPES = {DepositAccount: "deposit_account", LoanAccount: "loan_account"}
+
+
+class AccountCache:
+    def __init__(self):
+        self._entries: OrderedDict[tuple[str, str], tuple[int, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, account_type: str, account_id: str, version: int):
+        key = (account_type, account_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            # The caller read the current version from the database, so a version mismatch is never served.
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, account_type: str, account_id: str, version: int, snapshot) -> None:
+        max_entries = settings.account_cache_size
+        if max_entries <= 0:
+            return
+        key = (account_type, account_id)
+        with self._lock:
+            self._entries[key] = (version, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys) -> None:
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": settings.account_cache_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+account_cache = AccountCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_written_accounts(session: Session, flush_context) -> None:
+    keys = session.info.setdefault("account_cache_keys", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        account_type = ACCOUNT_TYPES.get(type(obj))
+        if account_type is not None:
+            keys.add((account_type, obj.id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_accounts(session: Session) -> None:
+    keys = session.info.pop("account_cache_keys", None)
+    if keys:
+        account_cache.invalidate(keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_accounts(session: Session) -> None:
+    session.info.pop("account_cache_keys", None)
@@ -0,0 +1,103 @@
+import datetime as dt
+
+from sqlalchemy.orm import Session
+
+from app.models import WebhookSubscriptionHealth
+from app.settings import settings
+from app.time import as_utc
+
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+
+def get_health(db: Session, subscription_id: str) -> WebhookSubscriptionHealth:
+    health = db.get(WebhookSubscriptionHealth, subscription_id)
+    if health is None:
+        health = WebhookSubscriptionHealth(
+            subscription_id=subscription_id,
+            circuit_state=CLOSED,
+            consecutive_failures=0,
+            window=[],
+            probe_interval_seconds=0,
+        )
+        db.add(health)
+        db.flush()
+    return health
+
+
+def blocked_destinations(db: Session, now: dt.datetime) -> list[str]:
+    rows = (
+        db.query(WebhookSubscriptionHealth.subscription_id)
+        .filter(WebhookSubscriptionHealth.circuit_state.in_((OPEN, HALF_OPEN)))
+        .filter(WebhookSubscriptionHealth.next_probe_at > now)
+        .all()
+    )
+    return [f"webhook:{sub_id}" for (sub_id,) in rows]
+
+
+def allow_request(health: WebhookSubscriptionHealth, now: dt.datetime) -> bool:
+    if health.circuit_state == CLOSED:
+        return True
+    if health.next_probe_at is not None and as_utc(health.next_probe_at) > now:
+        return False
+
+    # Let a single probe through; later messages in the same run wait for its outcome.
+    health.circuit_state = HALF_OPEN
+    health.next_probe_at = now + dt.timedelta(seconds=health.probe_interval_seconds or settings.circuit_open_seconds)
+    health.updated_at = now
+    return True
+
+
+def _open(health: WebhookSubscriptionHealth, now: dt.datetime, interval: int) -> None:
+    health.circuit_state = OPEN
+    health.opened_at = now
+    health.probe_interval_seconds = interval
+    health.next_probe_at = now + dt.timedelta(seconds=interval)
+
+
+def error_rate(health: WebhookSubscriptionHealth) -> float:
+    if not health.window:
+        return 0.0
+    return sum(1 for ok, _ in health.window if not ok) / len(health.window)
+
+
+def p95_latency_ms(health: WebhookSubscriptionHealth) -> float | None:
+    latencies = sorted(latency for ok, latency in health.window if ok)
+    if not latencies:
+        return None
+    return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+
+def record_result(health: WebhookSubscriptionHealth, *, ok: bool, latency_ms: float, now: dt.datetime) -> None:
+    window = (health.window or []) + [[ok, round(latency_ms, 1)]]
+    health.window = window[-settings.circuit_window_size :]
+    health.consecutive_failures = 0 if ok else health.consecutive_failures + 1
+    health.updated_at = now
+
+    if health.circuit_state == HALF_OPEN:
+        if ok:
+            health.circuit_state = CLOSED
+            health.window = [[ok, round(latency_ms, 1)]]
+            health.opened_at = None
+            health.next_probe_at = None
+            health.probe_interval_seconds = 0
+        else:
+            interval = min(settings.circuit_max_open_seconds, max(settings.circuit_open_seconds, health.probe_interval_seconds * 2))
+            _open(health, now, interval)
+        return
+
+    if (
+        health.circuit_state == CLOSED
+        and len(health.window) >= settings.circuit_min_samples
+        and error_rate(health) >= settings.circuit_error_rate_threshold
+    ):
+        _open(health, now, settings.circuit_open_seconds)
+
+
+def request_timeout(health: WebhookSubscriptionHealth) -> float:
+    p95 = p95_latency_ms(health)
+    if p95 is None or len(health.window) < settings.circuit_min_samples:
+        return settings.webhook_timeout_seconds
+    return min(settings.webhook_timeout_seconds, max(settings.webhook_min_timeout_seconds, p95 * 4 / 1000))
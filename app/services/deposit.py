@@ -1,21 +1,43 @@
 import datetime as dt
 from decimal import Decimal
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.models import DepositAccount, LedgerEntry
-from app.money import q, q_rate
-from app.services.events import append_event, find_event_by_idempotency_key
-from app.time import utcnow
+from app import contracts
+from app.db import retry_on_conflict
+from app.ids import new_id
+from app.models import DepositAccount, PostingJournalEntry
+from app.money import q
+from app.services.events import find_idempotency_key, record_outcome
+from app.time import as_utc, utcnow
 
 
-AGGREGATE_TYPE = "deposit_account"
+AGGREGATE_TYPE = contracts.DEPOSIT
 
 
 def _dec(s: str) -> Decimal:
     return Decimal(s)
 
 
+def _state(acct: DepositAccount) -> contracts.DepositState:
+    return contracts.DepositState(
+        acct.id,
+        balance=contracts.to_cents(acct.current_balance),
+        accrued=contracts.to_cents(acct.accrued_interest),
+        rate=contracts.to_rate_units(acct.annual_interest_rate),
+        day_count_basis=acct.day_count_basis,
+        last_accrual=acct.last_accrual_date or acct.opened_on,
+    )
+
+
+def _store(acct: DepositAccount, state: contracts.DepositState) -> None:
+    acct.current_balance = contracts.money(state.balance)
+    acct.accrued_interest = contracts.money(state.accrued)
+    if state.last_accrual != (acct.last_accrual_date or acct.opened_on):
+        acct.last_accrual_date = state.last_accrual
+
+
 def open_account(
     db: Session,
     *,
@@ -25,7 +47,7 @@ def open_account(
     idempotency_key: str | None,
 ) -> DepositAccount:
     if idempotency_key:
-        existing = find_event_by_idempotency_key(
+        existing = find_idempotency_key(
             db,
             aggregate_type=AGGREGATE_TYPE,
             idempotency_key=idempotency_key,
@@ -35,30 +57,79 @@ def open_account(
             if acct:
                 return acct
 
+    state, outcome = contracts.open_deposit(
+        new_id(),
+        opened_on=opened_on,
+        annual_rate=contracts.to_rate_units(annual_interest_rate),
+        day_count_basis=day_count_basis,
+    )
     acct = DepositAccount(
+        id=state.account_id,
         opened_on=opened_on,
-        annual_interest_rate=str(q_rate(annual_interest_rate)),
+        annual_interest_rate=contracts.rate(state.rate),
         day_count_basis=day_count_basis,
-        current_balance=str(q(Decimal("0"))),
-        accrued_interest=str(q(Decimal("0"))),
-        last_accrual_date=opened_on,
+        current_balance=contracts.money(state.balance),
+        accrued_interest=contracts.money(state.accrued),
+        last_accrual_date=state.last_accrual,
     )
     db.add(acct)
     db.flush()
 
-    append_event(
-        db,
-        aggregate_type=AGGREGATE_TYPE,
-        aggregate_id=acct.id,
-        event_type="DEPOSIT_ACCOUNT_OPENED",
-        payload={
-            "opened_on": opened_on.isoformat(),
-            "annual_interest_rate": str(q_rate(annual_interest_rate)),
-            "day_count_basis": day_count_basis,
-        },
-        event_time=utcnow(),
-        idempotency_key=idempotency_key,
+    record_outcome(db, outcome, event_time=utcnow(), idempotency_key=idempotency_key)
+    return acct
+
+
+def _record_deposit(
+    db: Session,
+    acct: DepositAccount,
+    *,
+    amount: Decimal,
+    effective_date: dt.date,
+    idempotency_key: str | None,
+    event_time: dt.datetime,
+) -> None:
+    state = _state(acct)
+    outcome = contracts.deposit(
+        state,
+        contracts.to_cents(amount),
+        effective_date=effective_date,
+        ref=idempotency_key or event_time.isoformat(),
     )
+    _store(acct, state)
+    record_outcome(db, outcome, event_time=event_time, idempotency_key=idempotency_key)
+
+
+def _journal_deposit(
+    db: Session,
+    acct: DepositAccount,
+    *,
+    amount: Decimal,
+    effective_date: dt.date,
+    idempotency_key: str | None,
+) -> DepositAccount:
+    if idempotency_key:
+        existing = (
+            db.query(PostingJournalEntry.id)
+            .filter(PostingJournalEntry.account_id == acct.id)
+            .filter(PostingJournalEntry.idempotency_key == idempotency_key)
+            .first()
+        )
+        if existing:
+            return acct
+
+    try:
+        with db.begin_nested():
+            db.add(
+                PostingJournalEntry(
+                    account_id=acct.id,
+                    amount=str(q(amount)),
+                    effective_date=effective_date,
+                    idempotency_key=idempotency_key,
+                )
+            )
+    except IntegrityError:
+        # A concurrent request journaled the same idempotency key first.
+        pass
     return acct
 
 
@@ -75,7 +146,7 @@ def post_deposit(
         raise ValueError("account_not_found")
 
     if idempotency_key:
-        existing = find_event_by_idempotency_key(
+        existing = find_idempotency_key(
             db,
             aggregate_type=AGGREGATE_TYPE,
             idempotency_key=idempotency_key,
@@ -83,33 +154,90 @@ def post_deposit(
         if existing and existing.event_type == "DEPOSIT_POSTED" and existing.aggregate_id == account_id:
             return acct
 
-    amt = q(amount)
-    new_balance = q(_dec(acct.current_balance) + amt)
-    acct.current_balance = str(new_balance)
-
-    txn_id = f"deposit:{idempotency_key or utcnow().isoformat()}"
-    db.add(
-        LedgerEntry(
+    if acct.write_behind:
+        return _journal_deposit(
+            db,
+            acct,
+            amount=amount,
             effective_date=effective_date,
-            account_type=AGGREGATE_TYPE,
-            account_id=account_id,
-            txn_id=txn_id,
-            description="Customer deposit",
-            debit_account="cash",
-            credit_account="customer_deposits",
-            amount=str(amt),
+            idempotency_key=idempotency_key,
         )
-    )
 
-    append_event(
+    _record_deposit(
         db,
-        aggregate_type=AGGREGATE_TYPE,
-        aggregate_id=account_id,
-        event_type="DEPOSIT_POSTED",
-        payload={"amount": str(amt), "effective_date": effective_date.isoformat()},
-        event_time=utcnow(),
+        acct,
+        amount=amount,
+        effective_date=effective_date,
         idempotency_key=idempotency_key,
+        event_time=utcnow(),
+    )
+    return acct
+
+
+def flush_journal(db: Session, acct: DepositAccount) -> int:
+    entries = (
+        db.query(PostingJournalEntry)
+        .filter(PostingJournalEntry.account_id == acct.id)
+        .filter(PostingJournalEntry.flushed_at.is_(None))
+        .order_by(PostingJournalEntry.id.asc())
+        .all()
     )
+    now = utcnow()
+    for entry in entries:
+        _record_deposit(
+            db,
+            acct,
+            amount=_dec(entry.amount),
+            effective_date=entry.effective_date,
+            idempotency_key=entry.idempotency_key,
+            event_time=as_utc(entry.created_at),
+        )
+        entry.flushed_at = now
+    return len(entries)
+
+
+def unflushed_totals(db: Session, account_ids: list[str], *, as_of: dt.date | None = None) -> dict[str, Decimal]:
+    totals: dict[str, Decimal] = {}
+    if not account_ids:
+        return totals
+    query = (
+        db.query(PostingJournalEntry.account_id, PostingJournalEntry.amount)
+        .filter(PostingJournalEntry.account_id.in_(account_ids))
+        .filter(PostingJournalEntry.flushed_at.is_(None))
+    )
+    if as_of is not None:
+        query = query.filter(PostingJournalEntry.effective_date <= as_of)
+    for account_id, amount in query.all():
+        totals[account_id] = totals.get(account_id, Decimal("0")) + _dec(amount)
+    return totals
+
+
+def flush_hot_accounts(db: Session, *, max_accounts: int) -> dict[str, int]:
+    account_ids = [
+        account_id
+        for (account_id,) in db.query(PostingJournalEntry.account_id)
+        .filter(PostingJournalEntry.flushed_at.is_(None))
+        .distinct()
+        .limit(max_accounts)
+        .all()
+    ]
+
+    flushed: dict[str, int] = {}
+    for account_id in account_ids:
+        flushed[account_id] = retry_on_conflict(
+            db, lambda: flush_journal(db, db.get(DepositAccount, account_id))
+        )
+    return flushed
+
+
+def set_write_behind(db: Session, *, account_id: str, enabled: bool) -> DepositAccount:
+    acct = db.get(DepositAccount, account_id)
+    if not acct:
+        raise ValueError("account_not_found")
+
+    if acct.write_behind and not enabled:
+        flush_journal(db, acct)
+    acct.write_behind = enabled
     return acct
 
 
@@ -126,7 +254,7 @@ def post_withdrawal(
         raise ValueError("account_not_found")
 
     if idempotency_key:
-        existing = find_event_by_idempotency_key(
+        existing = find_idempotency_key(
             db,
             aggregate_type=AGGREGATE_TYPE,
             idempotency_key=idempotency_key,
@@ -134,36 +262,19 @@ def post_withdrawal(
         if existing and existing.event_type == "WITHDRAWAL_POSTED" and existing.aggregate_id == account_id:
             return acct
 
-    amt = q(amount)
-    if _dec(acct.current_balance) < amt:
-        raise ValueError("insufficient_funds")
-
-    new_balance = q(_dec(acct.current_balance) - amt)
-    acct.current_balance = str(new_balance)
-
-    txn_id = f"withdrawal:{idempotency_key or utcnow().isoformat()}"
-    db.add(
-        LedgerEntry(
-            effective_date=effective_date,
-            account_type=AGGREGATE_TYPE,
-            account_id=account_id,
-            txn_id=txn_id,
-            description="Customer withdrawal",
-            debit_account="customer_deposits",
-            credit_account="cash",
-            amount=str(amt),
-        )
-    )
+    if acct.write_behind:
+        flush_journal(db, acct)
 
-    append_event(
-        db,
-        aggregate_type=AGGREGATE_TYPE,
-        aggregate_id=account_id,
-        event_type="WITHDRAWAL_POSTED",
-        payload={"amount": str(amt), "effective_date": effective_date.isoformat()},
-        event_time=utcnow(),
-        idempotency_key=idempotency_key,
+    now = utcnow()
+    state = _state(acct)
+    outcome = contracts.withdraw(
+        state,
+        contracts.to_cents(amount),
+        effective_date=effective_date,
+        ref=idempotency_key or now.isoformat(),
     )
+    _store(acct, state)
+    record_outcome(db, outcome, event_time=now, idempotency_key=idempotency_key)
     return acct
 
 
@@ -177,32 +288,16 @@ def accrue_interest(
     if not acct:
         raise ValueError("account_not_found")
 
-    start_date = acct.last_accrual_date or acct.opened_on
-    if as_of_date <= start_date:
+    if as_of_date <= (acct.last_accrual_date or acct.opened_on):
         return acct
 
-    days = (as_of_date - start_date).days
-    rate = _dec(acct.annual_interest_rate)
-    balance = _dec(acct.current_balance)
+    if acct.write_behind:
+        flush_journal(db, acct)
 
-    interest = q(balance * rate * Decimal(days) / Decimal(acct.day_count_basis))
-    acct.accrued_interest = str(q(_dec(acct.accrued_interest) + interest))
-    acct.last_accrual_date = as_of_date
-
-    append_event(
-        db,
-        aggregate_type=AGGREGATE_TYPE,
-        aggregate_id=account_id,
-        event_type="INTEREST_ACCRUED",
-        payload={
-            "from_date": start_date.isoformat(),
-            "to_date": as_of_date.isoformat(),
-            "days": days,
-            "interest": str(interest),
-        },
-        event_time=utcnow(),
-        idempotency_key=None,
-    )
+    state = _state(acct)
+    outcome = contracts.accrue_deposit(state, as_of_date)
+    _store(acct, state)
+    record_outcome(db, outcome, event_time=utcnow(), idempotency_key=None)
     return acct
 
 
@@ -216,34 +311,11 @@ def apply_month_end(
     if not acct:
         raise ValueError("account_not_found")
 
-    accrued = q(_dec(acct.accrued_interest))
-    if accrued == Decimal("0.00"):
-        return acct
-
-    acct.current_balance = str(q(_dec(acct.current_balance) + accrued))
-    acct.accrued_interest = str(q(Decimal("0")))
+    if acct.write_behind:
+        flush_journal(db, acct)
 
-    txn_id = f"interest_post:{effective_date.isoformat()}:{account_id}"
-    db.add(
-        LedgerEntry(
-            effective_date=effective_date,
-            account_type=AGGREGATE_TYPE,
-            account_id=account_id,
-            txn_id=txn_id,
-            description="Month-end interest posting",
-            debit_account="interest_expense",
-            credit_account="customer_deposits",
-            amount=str(accrued),
-        )
-    )
-
-    append_event(
-        db,
-        aggregate_type=AGGREGATE_TYPE,
-        aggregate_id=account_id,
-        event_type="MONTH_END_APPLIED",
-        payload={"effective_date": effective_date.isoformat(), "interest_posted": str(accrued)},
-        event_time=utcnow(),
-        idempotency_key=None,
-    )
+    state = _state(acct)
+    outcome = contracts.month_end(state, effective_date)
+    _store(acct, state)
+    record_outcome(db, outcome, event_time=utcnow(), idempotency_key=None)
     return acct
@@ -1,10 +1,105 @@
 import datetime as dt
+import json
+import threading
+
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.models import DomainEvent, OutboxMessage, WebhookSubscription
+from app.contracts import Outcome, money
+from app.ids import new_id
+from app.models import AggregateSequence, DomainEvent, IdempotencyKey, LedgerEntry, OutboxMessage, WebhookSubscription
+from app.settings import settings
 from app.time import utcnow
 
 
+def build_envelope(
+    *,
+    event_id: str,
+    aggregate_type: str,
+    aggregate_id: str,
+    sequence: int | None,
+    event_type: str,
+    event_time: dt.datetime,
+    payload: dict,
+) -> bytes:
+    return json.dumps(
+        {
+            "event_id": event_id,
+            "aggregate_type": aggregate_type,
+            "aggregate_id": aggregate_id,
+            "sequence": sequence,
+            "event_type": event_type,
+            "event_time": event_time.isoformat(),
+            "payload": payload,
+        },
+        separators=(",", ":"),
+    ).encode()
+
+
+def envelope_bytes(event: DomainEvent) -> bytes:
+    if event.envelope is not None:
+        return event.envelope
+    return build_envelope(
+        event_id=event.id,
+        aggregate_type=event.aggregate_type,
+        aggregate_id=event.aggregate_id,
+        sequence=event.sequence,
+        event_type=event.event_type,
+        event_time=event.event_time,
+        payload=event.payload,
+    )
+
+
+class SubscriptionMatcher:
+    def __init__(self, subs: list[tuple[str, list | None, list | None]]):
+        self._subs = [
+            (
+                sub_id,
+                frozenset(event_types) if event_types is not None else None,
+                frozenset(aggregate_types) if aggregate_types is not None else None,
+            )
+            for sub_id, event_types, aggregate_types in subs
+        ]
+        self._matches: dict[tuple[str, str], tuple[str, ...]] = {}
+
+    def match(self, aggregate_type: str, event_type: str) -> tuple[str, ...]:
+        key = (aggregate_type, event_type)
+        matched = self._matches.get(key)
+        if matched is None:
+            matched = tuple(
+                sub_id
+                for sub_id, event_types, aggregate_types in self._subs
+                if (event_types is None or event_type in event_types)
+                and (aggregate_types is None or aggregate_type in aggregate_types)
+            )
+            self._matches[key] = matched
+        return matched
+
+
+_matcher: tuple[tuple, SubscriptionMatcher] | None = None
+_matcher_lock = threading.Lock()
+
+
+def subscription_matcher(db: Session) -> SubscriptionMatcher:
+    global _matcher
+    # Any create or update bumps count or max(updated_at), so the cached matcher is rebuilt only after a change.
+    marker = tuple(db.query(func.count(WebhookSubscription.id), func.max(WebhookSubscription.updated_at)).one())
+    cached = _matcher
+    if cached is not None and cached[0] == marker:
+        return cached[1]
+
+    rows = (
+        db.query(WebhookSubscription.id, WebhookSubscription.event_types, WebhookSubscription.aggregate_types)
+        .filter(WebhookSubscription.enabled.is_(True))
+        .order_by(WebhookSubscription.id.asc())
+        .all()
+    )
+    matcher = SubscriptionMatcher([tuple(row) for row in rows])
+    with _matcher_lock:
+        _matcher = (marker, matcher)
+    return matcher
+
+
 def append_event(
     db: Session,
     *,
@@ -15,45 +110,101 @@ def append_event(
     event_time: dt.datetime,
     idempotency_key: str | None,
 ) -> DomainEvent:
+    counter = db.get(AggregateSequence, (aggregate_type, aggregate_id))
+    if counter is None:
+        counter = AggregateSequence(aggregate_type=aggregate_type, aggregate_id=aggregate_id, last_sequence=0)
+        db.add(counter)
+    counter.last_sequence += 1
+
+    event_id = new_id()
     event = DomainEvent(
+        id=event_id,
         aggregate_type=aggregate_type,
         aggregate_id=aggregate_id,
+        sequence=counter.last_sequence,
         event_type=event_type,
         payload=payload,
+        envelope=build_envelope(
+            event_id=event_id,
+            aggregate_type=aggregate_type,
+            aggregate_id=aggregate_id,
+            sequence=counter.last_sequence,
+            event_type=event_type,
+            event_time=event_time,
+            payload=payload,
+        ),
         event_time=event_time,
         idempotency_key=idempotency_key,
     )
     db.add(event)
+    if idempotency_key:
+        db.add(
+            IdempotencyKey(
+                event_id=event_id,
+                aggregate_type=aggregate_type,
+                aggregate_id=aggregate_id,
+                event_type=event_type,
+                idempotency_key=idempotency_key,
+            )
+        )
     db.flush()
 
-    subs = (
-        db.query(WebhookSubscription)
-        .filter(WebhookSubscription.enabled.is_(True))
-        .all()
-    )
-    for sub in subs:
+    for sub_id in subscription_matcher(db).match(aggregate_type, event_type):
         db.add(
             OutboxMessage(
                 event_id=event.id,
-                destination=f"webhook:{sub.id}",
+                destination=f"webhook:{sub_id}",
                 next_attempt_at=utcnow(),
             )
         )
 
-    db.add(OutboxMessage(event_id=event.id, destination="queue:domain_events", next_attempt_at=utcnow()))
+    if settings.queue_enabled:
+        db.add(OutboxMessage(event_id=event.id, destination="queue:domain_events", next_attempt_at=utcnow()))
     return event
 
 
-def find_event_by_idempotency_key(
+def record_outcome(
+    db: Session,
+    outcome: Outcome,
+    *,
+    event_time: dt.datetime,
+    idempotency_key: str | None,
+) -> None:
+    for record in outcome.ledger:
+        db.add(
+            LedgerEntry(
+                effective_date=record.effective_date,
+                account_type=record.account_type,
+                account_id=record.account_id,
+                txn_id=record.txn_id,
+                description=record.description,
+                debit_account=record.debit_account,
+                credit_account=record.credit_account,
+                amount=money(record.amount),
+            )
+        )
+    for record in outcome.events:
+        append_event(
+            db,
+            aggregate_type=record.aggregate_type,
+            aggregate_id=record.aggregate_id,
+            event_type=record.event_type,
+            payload=record.payload,
+            event_time=event_time,
+            idempotency_key=idempotency_key,
+        )
+
+
+def find_idempotency_key(
     db: Session,
     *,
     aggregate_type: str,
     idempotency_key: str,
-) -> DomainEvent | None:
+) -> IdempotencyKey | None:
     return (
-        db.query(DomainEvent)
-        .filter(DomainEvent.aggregate_type == aggregate_type)
-        .filter(DomainEvent.idempotency_key == idempotency_key)
-        .order_by(DomainEvent.created_at.desc())
+        db.query(IdempotencyKey)
+        .filter(IdempotencyKey.aggregate_type == aggregate_type)
+        .filter(IdempotencyKey.idempotency_key == idempotency_key)
+        .order_by(IdempotencyKey.created_at.desc())
         .first()
     )
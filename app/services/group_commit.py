@@ -0,0 +1,115 @@
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import TypeVar
+
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.db import ConcurrentUpdateError, SessionLocal
+from app.settings import settings
+
+
+T = TypeVar("T")
+
+
+class _Pending:
+    def __init__(self, op: Callable[[Session], object]):
+        self.op = op
+        self.future: Future = Future()
+        self.attempts = 0
+
+
+class GroupCommitWriter:
+    def __init__(self):
+        self._queue: queue.Queue[_Pending] = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, op: Callable[[Session], T]) -> T:
+        pending = _Pending(op)
+        with self._lock:
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="group-commit", daemon=True)
+                self._thread.start()
+            self._queue.put(pending)
+        return pending.future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def _collect(self) -> list[_Pending]:
+        try:
+            batch = [self._queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + settings.group_commit_window_ms / 1000
+        while len(batch) < settings.group_commit_max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self) -> None:
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._collect()
+            if batch:
+                self.apply(batch)
+
+    def _retry(self, pending: _Pending) -> None:
+        pending.attempts += 1
+        if pending.attempts > settings.max_conflict_retries:
+            pending.future.set_exception(ConcurrentUpdateError("concurrent_update"))
+        else:
+            self._queue.put(pending)
+
+    def apply(self, batch: list[_Pending]) -> None:
+        applied: list[tuple[_Pending, object]] = []
+        requeued: list[_Pending] = []
+        try:
+            with SessionLocal() as db:
+                if db.get_bind().dialect.name == "sqlite":
+                    # pysqlite only opens a transaction before DML; the savepoints below need a real one.
+                    db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+                for pending in batch:
+                    try:
+                        with db.begin_nested():
+                            result = pending.op(db)
+                            db.flush()
+                    except StaleDataError:
+                        requeued.append(pending)
+                        self._retry(pending)
+                    except Exception as e:
+                        pending.future.set_exception(e)
+                    else:
+                        applied.append((pending, result))
+                db.commit()
+        except StaleDataError:
+            # The whole transaction is gone; everything not already failed or requeued goes round again.
+            for pending in batch:
+                if not pending.future.done() and pending not in requeued:
+                    self._retry(pending)
+            return
+        except Exception as e:
+            for pending in batch:
+                if not pending.future.done() and pending not in requeued:
+                    pending.future.set_exception(e)
+            return
+
+        for pending, result in applied:
+            pending.future.set_result(result)
+
+
+group_commit = GroupCommitWriter()
@@ -0,0 +1,311 @@
+import hashlib
+import json
+from collections.abc import Callable
+
+from sqlalchemy import Connection, bindparam, inspect, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.ids import new_id
+from app.models import ChainCheckpoint, ChainHead, DomainEvent, LedgerEntry
+from app.time import as_utc, utcnow
+
+
+GENESIS_HASH = "0" * 64
+GLOBAL_KEY = ""
+
+CHAINS = {
+    "ledger_entries": LedgerEntry,
+    "domain_events": DomainEvent,
+}
+
+
+# Only these columns feed the hash, so backfills can run before later steps have added other columns.
+CONTENT_COLUMNS = {
+    "ledger_entries": (
+        "id",
+        "effective_date",
+        "account_type",
+        "account_id",
+        "txn_id",
+        "description",
+        "debit_account",
+        "credit_account",
+        "amount",
+    ),
+    "domain_events": (
+        "id",
+        "aggregate_type",
+        "aggregate_id",
+        "event_type",
+        "event_time",
+        "payload",
+        "envelope",
+        "idempotency_key",
+    ),
+}
+
+
+def _model(chain: str):
+    model = CHAINS.get(chain)
+    if model is None:
+        raise ValueError(f"unknown_chain:{chain}")
+    return model
+
+
+def _account_key(chain: str, row) -> str:
+    return row.account_id if chain == "ledger_entries" else row.aggregate_id
+
+
+def _content(chain: str, row) -> bytes:
+    if chain == "ledger_entries":
+        fields = {
+            "id": row.id,
+            "effective_date": row.effective_date.isoformat(),
+            "account_type": row.account_type,
+            "account_id": row.account_id,
+            "txn_id": row.txn_id,
+            "description": row.description,
+            "debit_account": row.debit_account,
+            "credit_account": row.credit_account,
+            "amount": row.amount,
+        }
+    else:
+        fields = {
+            "id": row.id,
+            "aggregate_type": row.aggregate_type,
+            "aggregate_id": row.aggregate_id,
+            "event_type": row.event_type,
+            "event_time": as_utc(row.event_time).isoformat(),
+            "payload": row.payload,
+            "envelope": row.envelope.decode() if row.envelope is not None else None,
+            "idempotency_key": row.idempotency_key,
+        }
+    return json.dumps(fields, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _link(prev_hash: str, content: bytes) -> str:
+    return hashlib.sha256(prev_hash.encode() + content).hexdigest()
+
+
+def _lock_global_head(conn: Connection, chain: str) -> tuple[int, str]:
+    heads = ChainHead.__table__
+    # Writing the head first takes its lock, so the values read next cannot change before commit. Appenders
+    # queue behind each other here instead of failing a version check on a row every account shares.
+    locked = conn.execute(
+        update(heads)
+        .where(heads.c.chain == chain, heads.c.key == GLOBAL_KEY)
+        .values(version=heads.c.version + 1)
+    )
+    if locked.rowcount == 0:
+        conn.execute(
+            insert(heads).values(chain=chain, key=GLOBAL_KEY, last_seq=0, last_hash=GENESIS_HASH, version=1)
+        )
+        return 0, GENESIS_HASH
+    row = conn.execute(
+        select(heads.c.last_seq, heads.c.last_hash).where(heads.c.chain == chain, heads.c.key == GLOBAL_KEY)
+    ).one()
+    return row.last_seq, row.last_hash
+
+
+def chain_new_rows(session: Session, flush_context, instances) -> None:
+    pending = [
+        obj
+        for obj in session.new
+        if isinstance(obj, (LedgerEntry, DomainEvent)) and obj.chain_seq is None
+    ]
+    if not pending:
+        return
+
+    by_chain: dict[str, list] = {}
+    for obj in sorted(pending, key=lambda o: inspect(o).insert_order):
+        if obj.id is None:
+            obj.id = new_id()
+        by_chain.setdefault(obj.__tablename__, []).append(obj)
+
+    conn = session.connection()
+    heads = ChainHead.__table__
+    for chain in sorted(by_chain):
+        rows = by_chain[chain]
+        seq, last_hash = _lock_global_head(conn, chain)
+        keys = {_account_key(chain, obj) for obj in rows}
+        # Account heads are only written while the global head is locked, so these reads are current too.
+        known = dict(
+            conn.execute(
+                select(heads.c.key, heads.c.last_hash).where(heads.c.chain == chain, heads.c.key.in_(keys))
+            ).all()
+        )
+        account_heads: dict[str, tuple[int, str]] = {}
+        for obj in rows:
+            key = _account_key(chain, obj)
+            content = _content(chain, obj)
+            previous = account_heads[key][1] if key in account_heads else known.get(key, GENESIS_HASH)
+
+            seq += 1
+            obj.chain_seq = seq
+            obj.chain_hash = last_hash = _link(last_hash, content)
+            obj.account_chain_hash = _link(previous, content)
+            account_heads[key] = (seq, obj.account_chain_hash)
+
+        conn.execute(
+            update(heads)
+            .where(heads.c.chain == chain, heads.c.key == GLOBAL_KEY)
+            .values(last_seq=seq, last_hash=last_hash)
+        )
+        changed = [
+            {"b_key": key, "last_seq": key_seq, "last_hash": key_hash}
+            for key, (key_seq, key_hash) in account_heads.items()
+            if key in known
+        ]
+        if changed:
+            conn.execute(
+                update(heads)
+                .where(heads.c.chain == chain, heads.c.key == bindparam("b_key"))
+                .values(last_seq=bindparam("last_seq"), last_hash=bindparam("last_hash"), version=heads.c.version + 1),
+                changed,
+            )
+        added = [
+            {"chain": chain, "key": key, "last_seq": key_seq, "last_hash": key_hash, "version": 1}
+            for key, (key_seq, key_hash) in account_heads.items()
+            if key not in known
+        ]
+        if added:
+            conn.execute(insert(heads), added)
+
+
+def backfill_chains(conn: Connection) -> None:
+    for chain, model in CHAINS.items():
+        table = model.__table__
+        if conn.execute(select(table.c.id).where(table.c.chain_seq.is_not(None)).limit(1)).first():
+            continue
+
+        seq, last_hash = 0, GENESIS_HASH
+        accounts: dict[str, tuple[int, str]] = {}
+        columns = [table.c[name] for name in CONTENT_COLUMNS[chain]]
+        for row in conn.execute(select(*columns).order_by(table.c.created_at.asc(), table.c.id.asc())).all():
+            content = _content(chain, row)
+            key = _account_key(chain, row)
+            seq += 1
+            last_hash = _link(last_hash, content)
+            account_hash = _link(accounts.get(key, (0, GENESIS_HASH))[1], content)
+            accounts[key] = (seq, account_hash)
+            conn.execute(
+                update(table)
+                .where(table.c.id == row.id)
+                .values(chain_seq=seq, chain_hash=last_hash, account_chain_hash=account_hash)
+            )
+
+        if seq:
+            heads = [{"chain": chain, "key": GLOBAL_KEY, "last_seq": seq, "last_hash": last_hash, "version": 1}]
+            heads += [
+                {"chain": chain, "key": key, "last_seq": key_seq, "last_hash": key_hash, "version": 1}
+                for key, (key_seq, key_hash) in accounts.items()
+            ]
+            conn.execute(insert(ChainHead.__table__), heads)
+
+
+def _save_checkpoint(
+    db: Session,
+    checkpoints: dict[str, ChainCheckpoint],
+    *,
+    chain: str,
+    key: str,
+    seq: int,
+    last_hash: str,
+) -> None:
+    checkpoint = checkpoints.get(key)
+    if checkpoint is None:
+        checkpoint = ChainCheckpoint(chain=chain, key=key)
+        db.add(checkpoint)
+        checkpoints[key] = checkpoint
+    checkpoint.last_seq = seq
+    checkpoint.last_hash = last_hash
+    checkpoint.verified_at = utcnow()
+
+
+def verify_chain(
+    db: Session,
+    *,
+    chain: str,
+    chunk_size: int,
+    progress: Callable[[int], None] | None = None,
+) -> dict:
+    model = _model(chain)
+    checkpoints: dict[str, ChainCheckpoint] = {}
+    start = db.get(ChainCheckpoint, (chain, GLOBAL_KEY))
+    if start is not None:
+        checkpoints[GLOBAL_KEY] = start
+    last_seq, last_hash = (start.last_seq, start.last_hash) if start else (0, GENESIS_HASH)
+    verified = 0
+
+    while True:
+        rows = (
+            db.query(model)
+            .filter(model.chain_seq > last_seq)
+            .order_by(model.chain_seq.asc())
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            break
+
+        keys = {_account_key(chain, row) for row in rows} - set(checkpoints)
+        for checkpoint in (
+            db.query(ChainCheckpoint)
+            .filter(ChainCheckpoint.chain == chain)
+            .filter(ChainCheckpoint.key.in_(keys))
+            .all()
+        ):
+            checkpoints[checkpoint.key] = checkpoint
+        account_hashes = {key: checkpoint.last_hash for key, checkpoint in checkpoints.items()}
+        touched: dict[str, int] = {}
+
+        failure = None
+        for row in rows:
+            content = _content(chain, row)
+            key = _account_key(chain, row)
+            if row.chain_seq != last_seq + 1:
+                failure = "sequence_gap"
+            elif row.chain_hash != _link(last_hash, content):
+                failure = "chain_hash_mismatch"
+            elif row.account_chain_hash != _link(account_hashes.get(key, GENESIS_HASH), content):
+                failure = "account_chain_hash_mismatch"
+            if failure:
+                failure = {"error": failure, "seq": row.chain_seq, "id": row.id}
+                break
+
+            last_seq, last_hash = row.chain_seq, row.chain_hash
+            account_hashes[key] = row.account_chain_hash
+            touched[key] = row.chain_seq
+            verified += 1
+
+        if verified:
+            _save_checkpoint(db, checkpoints, chain=chain, key=GLOBAL_KEY, seq=last_seq, last_hash=last_hash)
+        for key, seq in touched.items():
+            _save_checkpoint(db, checkpoints, chain=chain, key=key, seq=seq, last_hash=account_hashes[key])
+        db.commit()
+        if progress is not None:
+            progress(verified)
+
+        if failure:
+            return {"chain": chain, "ok": False, "verified": verified, "last_seq": last_seq, "failure": failure}
+
+    return {"chain": chain, "ok": True, "verified": verified, "last_seq": last_seq}
+
+
+def verify_chains(
+    db: Session,
+    *,
+    chains: list[str] | None = None,
+    chunk_size: int,
+    progress: Callable[[int], None] | None = None,
+) -> list[dict]:
+    chains = chains or list(CHAINS)
+    for chain in chains:
+        _model(chain)
+
+    results: list[dict] = []
+    for chain in chains:
+        done = sum(r["verified"] for r in results)
+        chain_progress = None if progress is None else (lambda n, done=done: progress(done + n))
+        results.append(verify_chain(db, chain=chain, chunk_size=chunk_size, progress=chain_progress))
+    return results
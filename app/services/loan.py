@@ -3,17 +3,32 @@ from decimal import Decimal
 
 from sqlalchemy.orm import Session
 
-from app.models import LedgerEntry, LoanAccount
-from app.money import q, q_rate
-from app.services.events import append_event, find_event_by_idempotency_key
+from app import contracts
+from app.ids import new_id
+from app.models import LoanAccount
+from app.services.events import find_idempotency_key, record_outcome
 from app.time import utcnow
 
 
-AGGREGATE_TYPE = "loan_account"
+AGGREGATE_TYPE = contracts.LOAN
 
 
-def _dec(s: str) -> Decimal:
-    return Decimal(s)
+def _state(acct: LoanAccount) -> contracts.LoanState:
+    return contracts.LoanState(
+        acct.id,
+        outstanding=contracts.to_cents(acct.outstanding_principal),
+        accrued=contracts.to_cents(acct.accrued_interest),
+        rate=contracts.to_rate_units(acct.annual_interest_rate),
+        day_count_basis=acct.day_count_basis,
+        last_accrual=acct.last_accrual_date or acct.opened_on,
+    )
+
+
+def _store(acct: LoanAccount, state: contracts.LoanState) -> None:
+    acct.outstanding_principal = contracts.money(state.outstanding)
+    acct.accrued_interest = contracts.money(state.accrued)
+    if state.last_accrual != (acct.last_accrual_date or acct.opened_on):
+        acct.last_accrual_date = state.last_accrual
 
 
 def open_loan(
@@ -26,7 +41,7 @@ def open_loan(
     idempotency_key: str | None,
 ) -> LoanAccount:
     if idempotency_key:
-        existing = find_event_by_idempotency_key(
+        existing = find_idempotency_key(
             db,
             aggregate_type=AGGREGATE_TYPE,
             idempotency_key=idempotency_key,
@@ -36,47 +51,29 @@ def open_loan(
             if acct:
                 return acct
 
-    p = q(principal)
+    now = utcnow()
+    state, outcome = contracts.open_loan(
+        new_id(),
+        opened_on=opened_on,
+        principal=contracts.to_cents(principal),
+        annual_rate=contracts.to_rate_units(annual_interest_rate),
+        day_count_basis=day_count_basis,
+        ref=idempotency_key or now.isoformat(),
+    )
     acct = LoanAccount(
+        id=state.account_id,
         opened_on=opened_on,
-        principal=str(p),
-        annual_interest_rate=str(q_rate(annual_interest_rate)),
+        principal=contracts.money(state.outstanding),
+        annual_interest_rate=contracts.rate(state.rate),
         day_count_basis=day_count_basis,
-        outstanding_principal=str(p),
-        accrued_interest=str(q(Decimal("0"))),
-        last_accrual_date=opened_on,
+        outstanding_principal=contracts.money(state.outstanding),
+        accrued_interest=contracts.money(state.accrued),
+        last_accrual_date=state.last_accrual,
     )
     db.add(acct)
     db.flush()
 
-    txn_id = f"loan_disburse:{idempotency_key or utcnow().isoformat()}"
-    db.add(
-        LedgerEntry(
-            effective_date=opened_on,
-            account_type=AGGREGATE_TYPE,
-            account_id=acct.id,
-            txn_id=txn_id,
-            description="Loan disbursement",
-            debit_account="loan_receivable",
-            credit_account="cash",
-            amount=str(p),
-        )
-    )
-
-    append_event(
-        db,
-        aggregate_type=AGGREGATE_TYPE,
-        aggregate_id=acct.id,
-        event_type="LOAN_OPENED",
-        payload={
-            "opened_on": opened_on.isoformat(),
-            "principal": str(p),
-            "annual_interest_rate": str(q_rate(annual_interest_rate)),
-            "day_count_basis": day_count_basis,
-        },
-        event_time=utcnow(),
-        idempotency_key=idempotency_key,
-    )
+    record_outcome(db, outcome, event_time=now, idempotency_key=idempotency_key)
     return acct
 
 
@@ -85,32 +82,10 @@ def accrue_interest(db: Session, *, account_id: str, as_of_date: dt.date) -> Loa
     if not acct:
         raise ValueError("account_not_found")
 
-    start_date = acct.last_accrual_date or acct.opened_on
-    if as_of_date <= start_date:
-        return acct
-
-    days = (as_of_date - start_date).days
-    rate = _dec(acct.annual_interest_rate)
-    principal = _dec(acct.outstanding_principal)
-
-    interest = q(principal * rate * Decimal(days) / Decimal(acct.day_count_basis))
-    acct.accrued_interest = str(q(_dec(acct.accrued_interest) + interest))
-    acct.last_accrual_date = as_of_date
-
-    append_event(
-        db,
-        aggregate_type=AGGREGATE_TYPE,
-        aggregate_id=account_id,
-        event_type="LOAN_INTEREST_ACCRUED",
-        payload={
-            "from_date": start_date.isoformat(),
-            "to_date": as_of_date.isoformat(),
-            "days": days,
-            "interest": str(interest),
-        },
-        event_time=utcnow(),
-        idempotency_key=None,
-    )
+    state = _state(acct)
+    outcome = contracts.accrue_loan(state, as_of_date)
+    _store(acct, state)
+    record_outcome(db, outcome, event_time=utcnow(), idempotency_key=None)
     return acct
 
 
@@ -127,7 +102,7 @@ def post_repayment(
         raise ValueError("account_not_found")
 
     if idempotency_key:
-        existing = find_event_by_idempotency_key(
+        existing = find_idempotency_key(
             db,
             aggregate_type=AGGREGATE_TYPE,
             idempotency_key=idempotency_key,
@@ -135,59 +110,14 @@ def post_repayment(
         if existing and existing.event_type == "LOAN_REPAYMENT_POSTED" and existing.aggregate_id == account_id:
             return acct
 
-    amt = q(amount)
-    interest_due = q(_dec(acct.accrued_interest))
-    principal_due = q(_dec(acct.outstanding_principal))
-
-    pay_interest = min(amt, interest_due)
-    remaining = q(amt - pay_interest)
-    pay_principal = min(remaining, principal_due)
-
-    acct.accrued_interest = str(q(interest_due - pay_interest))
-    acct.outstanding_principal = str(q(principal_due - pay_principal))
-
-    txn_base = idempotency_key or utcnow().isoformat()
-    if pay_interest > Decimal("0.00"):
-        db.add(
-            LedgerEntry(
-                effective_date=effective_date,
-                account_type=AGGREGATE_TYPE,
-                account_id=account_id,
-                txn_id=f"loan_payment_interest:{txn_base}",
-                description="Loan payment (interest)",
-                debit_account="cash",
-                credit_account="interest_income",
-                amount=str(pay_interest),
-            )
-        )
-
-    if pay_principal > Decimal("0.00"):
-        db.add(
-            LedgerEntry(
-                effective_date=effective_date,
-                account_type=AGGREGATE_TYPE,
-                account_id=account_id,
-                txn_id=f"loan_payment_principal:{txn_base}",
-                description="Loan payment (principal)",
-                debit_account="cash",
-                credit_account="loan_receivable",
-                amount=str(pay_principal),
-            )
-        )
-
-    append_event(
-        db,
-        aggregate_type=AGGREGATE_TYPE,
-        aggregate_id=account_id,
-        event_type="LOAN_REPAYMENT_POSTED",
-        payload={
-            "amount": str(amt),
-            "interest_paid": str(pay_interest),
-            "principal_paid": str(pay_principal),
-            "effective_date": effective_date.isoformat(),
-        },
-        event_time=utcnow(),
-        idempotency_key=idempotency_key,
+    now = utcnow()
+    state = _state(acct)
+    outcome = contracts.repay(
+        state,
+        contracts.to_cents(amount),
+        effective_date=effective_date,
+        ref=idempotency_key or now.isoformat(),
     )
-
+    _store(acct, state)
+    record_outcome(db, outcome, event_time=now, idempotency_key=idempotency_key)
     return acct
@@ -0,0 +1,292 @@
+import datetime as dt
+import time
+from collections.abc import Callable
+
+import httpx
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models import DomainEvent, OutboxMessage, WebhookSubscription, WebhookSubscriptionHealth
+from app.services import circuit
+from app.services import queue as queue_service
+from app.services.events import envelope_bytes
+from app.settings import settings
+from app.time import as_utc, utcnow
+
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _http_client() -> httpx.Client:
+    return httpx.Client(timeout=settings.webhook_timeout_seconds)
+
+
+def _due(now: dt.datetime):
+    return or_(OutboxMessage.next_attempt_at.is_(None), OutboxMessage.next_attempt_at <= now)
+
+
+def _mark_sent(msg: OutboxMessage) -> dict:
+    msg.status = "SENT"
+    msg.last_error = None
+    msg.next_attempt_at = None
+    return {"id": msg.id, "destination": msg.destination, "status": "SENT"}
+
+
+def _circuit_open(msg: OutboxMessage) -> dict:
+    return {"id": msg.id, "destination": msg.destination, "status": "CIRCUIT_OPEN"}
+
+
+def _post(
+    client: httpx.Client,
+    sub: WebhookSubscription,
+    health: WebhookSubscriptionHealth,
+    now: dt.datetime,
+    **kwargs,
+) -> httpx.Response:
+    started = time.perf_counter()
+    try:
+        r = client.post(sub.target_url, timeout=circuit.request_timeout(health), **kwargs)
+        r.raise_for_status()
+    except Exception:
+        circuit.record_result(health, ok=False, latency_ms=(time.perf_counter() - started) * 1000, now=now)
+        raise
+    circuit.record_result(health, ok=True, latency_ms=(time.perf_counter() - started) * 1000, now=now)
+    return r
+
+
+def _mark_failed(msg: OutboxMessage, error: str, now: dt.datetime) -> dict:
+    msg.last_error = error
+    if msg.attempts >= msg.max_attempts:
+        msg.status = "DEAD"
+        msg.next_attempt_at = None
+        return {"id": msg.id, "destination": msg.destination, "status": "DEAD", "error": error}
+
+    backoff_seconds = min(300, 2 ** (msg.attempts - 1))
+    msg.status = "PENDING"
+    msg.next_attempt_at = now + dt.timedelta(seconds=backoff_seconds)
+    return {
+        "id": msg.id,
+        "destination": msg.destination,
+        "status": "RETRY",
+        "error": error,
+        "next_attempt_at": msg.next_attempt_at.isoformat(),
+    }
+
+
+def _deliver_one(
+    db: Session,
+    msg: OutboxMessage,
+    *,
+    client: httpx.Client,
+    offsets: queue_service.OffsetAllocator,
+    now: dt.datetime,
+) -> dict:
+    sub = None
+    health = None
+    if msg.destination.startswith("webhook:"):
+        sub = db.get(WebhookSubscription, msg.destination.split(":", 1)[1])
+        if sub and sub.enabled:
+            health = circuit.get_health(db, sub.id)
+            if not circuit.allow_request(health, now):
+                return _circuit_open(msg)
+
+    msg.attempts += 1
+    try:
+        if msg.destination.startswith("queue:"):
+            queue_service.publish(db, topic=msg.destination.split(":", 1)[1], event=msg.event, offsets=offsets)
+            return _mark_sent(msg)
+
+        if msg.destination.startswith("webhook:"):
+            if not sub or not sub.enabled:
+                msg.status = "SKIPPED"
+                msg.last_error = "subscription_disabled_or_missing"
+                return {"id": msg.id, "destination": msg.destination, "status": "SKIPPED"}
+
+            _post(client, sub, health, now, content=envelope_bytes(msg.event), headers=JSON_HEADERS)
+            return _mark_sent(msg)
+
+        msg.status = "FAILED"
+        msg.last_error = f"unknown_destination:{msg.destination}"
+        return {"id": msg.id, "destination": msg.destination, "status": "FAILED"}
+
+    except Exception as e:
+        return _mark_failed(msg, str(e), now)
+
+
+def _batch_failures(response: httpx.Response) -> dict[str, str]:
+    try:
+        body = response.json()
+    except ValueError:
+        return {}
+    if not isinstance(body, dict) or not isinstance(body.get("results"), list):
+        return {}
+
+    failures: dict[str, str] = {}
+    for item in body["results"]:
+        if isinstance(item, dict) and item.get("status", "ok") != "ok":
+            failures[str(item.get("event_id"))] = str(item.get("error") or item.get("status"))
+    return failures
+
+
+def _deliver_batch(
+    msgs: list[OutboxMessage],
+    sub: WebhookSubscription,
+    health: WebhookSubscriptionHealth,
+    *,
+    client: httpx.Client,
+    now: dt.datetime,
+) -> list[dict]:
+    for msg in msgs:
+        msg.attempts += 1
+
+    try:
+        r = _post(
+            client,
+            sub,
+            health,
+            now,
+            content=b"[" + b",".join(envelope_bytes(msg.event) for msg in msgs) + b"]",
+            headers={**JSON_HEADERS, "X-Batch-Size": str(len(msgs))},
+        )
+    except Exception as e:
+        return [_mark_failed(msg, str(e), now) for msg in msgs]
+
+    failures = _batch_failures(r)
+    return [
+        _mark_failed(msg, failures[msg.event_id], now) if msg.event_id in failures else _mark_sent(msg)
+        for msg in msgs
+    ]
+
+
+def _dispatch_batched(
+    db: Session,
+    sub: WebhookSubscription,
+    msgs: list[OutboxMessage],
+    *,
+    client: httpx.Client,
+    now: dt.datetime,
+) -> list[dict]:
+    if len(msgs) < sub.batch_max_size:
+        more = (
+            db.query(OutboxMessage)
+            .filter(OutboxMessage.destination == msgs[0].destination)
+            .filter(OutboxMessage.status == "PENDING")
+            .filter(OutboxMessage.attempts < OutboxMessage.max_attempts)
+            .filter(_due(now))
+            .filter(OutboxMessage.id.notin_([m.id for m in msgs]))
+            .order_by(OutboxMessage.id.asc())
+            .limit(sub.batch_max_size - len(msgs))
+            .all()
+        )
+        msgs = msgs + more
+
+    oldest = min(as_utc(m.created_at) for m in msgs)
+    linger = dt.timedelta(milliseconds=sub.batch_linger_ms)
+    if len(msgs) < sub.batch_max_size and now - oldest < linger:
+        return [{"id": m.id, "destination": m.destination, "status": "LINGER"} for m in msgs]
+
+    health = circuit.get_health(db, sub.id)
+    results: list[dict] = []
+    for start in range(0, len(msgs), sub.batch_max_size):
+        chunk = msgs[start : start + sub.batch_max_size]
+        if not circuit.allow_request(health, now):
+            results.extend(_circuit_open(m) for m in chunk)
+            continue
+        results.extend(_deliver_batch(chunk, sub, health, client=client, now=now))
+    return results
+
+
+def dispatch_outbox(db: Session, *, max_messages: int) -> list[dict]:
+    now = utcnow()
+    q = db.query(OutboxMessage).filter(OutboxMessage.status == "PENDING").filter(_due(now))
+    blocked = circuit.blocked_destinations(db, now)
+    if blocked:
+        q = q.filter(OutboxMessage.destination.notin_(blocked))
+    pending = q.order_by(OutboxMessage.id.asc()).limit(max_messages).all()
+
+    offsets = queue_service.OffsetAllocator(db)
+    results: list[dict] = []
+    batches: dict[str, list[OutboxMessage]] = {}
+
+    with _http_client() as client:
+        for msg in pending:
+            if msg.attempts >= msg.max_attempts:
+                msg.status = "DEAD"
+                results.append({"id": msg.id, "destination": msg.destination, "status": "DEAD"})
+                continue
+
+            if msg.destination.startswith("webhook:"):
+                sub = db.get(WebhookSubscription, msg.destination.split(":", 1)[1])
+                if sub and sub.enabled and sub.batch_max_size > 1:
+                    batches.setdefault(msg.destination, []).append(msg)
+                    continue
+
+            results.append(_deliver_one(db, msg, client=client, offsets=offsets, now=now))
+
+        for destination, msgs in batches.items():
+            sub = db.get(WebhookSubscription, destination.split(":", 1)[1])
+            results.extend(_dispatch_batched(db, sub, msgs, client=client, now=now))
+
+    return results
+
+
+def _replay_selection(
+    *,
+    aggregate_type: str | None,
+    aggregate_id: str | None,
+    event_type: str | None,
+    destination: str | None,
+    created_after: dt.datetime | None,
+    created_before: dt.datetime | None,
+):
+    stmt = select(OutboxMessage.id)
+    if aggregate_type is not None or aggregate_id is not None or event_type is not None:
+        stmt = stmt.join(DomainEvent, DomainEvent.id == OutboxMessage.event_id)
+    if aggregate_type is not None:
+        stmt = stmt.where(DomainEvent.aggregate_type == aggregate_type)
+    if aggregate_id is not None:
+        stmt = stmt.where(DomainEvent.aggregate_id == aggregate_id)
+    if event_type is not None:
+        stmt = stmt.where(DomainEvent.event_type == event_type)
+    if destination is not None:
+        stmt = stmt.where(OutboxMessage.destination == destination)
+    if created_after is not None:
+        stmt = stmt.where(OutboxMessage.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(OutboxMessage.created_at < created_before)
+    return stmt
+
+
+def count_replay(db: Session, **filters) -> int:
+    return db.execute(select(func.count()).select_from(_replay_selection(**filters).subquery())).scalar_one()
+
+
+def replay_outbox(
+    db: Session,
+    *,
+    chunk_size: int,
+    start_after: str = "",
+    progress: Callable[[int, str], None] | None = None,
+    **filters,
+) -> int:
+    selection = _replay_selection(**filters)
+    last_id = start_after
+    updated = 0
+    while True:
+        ids = db.execute(
+            selection.where(OutboxMessage.id > last_id).order_by(OutboxMessage.id.asc()).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return updated
+
+        db.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(ids))
+            .values(status="PENDING", attempts=0, last_error=None, next_attempt_at=utcnow())
+        )
+        db.commit()
+
+        last_id = ids[-1]
+        updated += len(ids)
+        if progress is not None:
+            progress(updated, last_id)
@@ -0,0 +1,160 @@
+import datetime as dt
+import json
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from app.models import DepositAccountSummary, LoanAccountSummary, ProjectionCheckpoint
+from app.money import q
+from app.services.queue import fetch_after
+from app.time import as_utc, utcnow
+
+
+PROJECTION_NAME = "account_summaries"
+TOPIC = "domain_events"
+
+
+def _dec(s: str) -> Decimal:
+    return Decimal(s)
+
+
+def _apply_deposit(read_db: Session, envelope: dict, event_time: dt.datetime) -> bool:
+    account_id = envelope["aggregate_id"]
+    payload = envelope["payload"]
+    event_type = envelope["event_type"]
+
+    if event_type == "DEPOSIT_ACCOUNT_OPENED":
+        opened_on = dt.date.fromisoformat(payload["opened_on"])
+        summary = read_db.get(DepositAccountSummary, account_id)
+        if summary is None:
+            summary = DepositAccountSummary(id=account_id)
+            read_db.add(summary)
+        summary.opened_on = opened_on
+        summary.status = "OPEN"
+        summary.annual_interest_rate = payload["annual_interest_rate"]
+        summary.day_count_basis = payload["day_count_basis"]
+        summary.current_balance = str(q(Decimal("0")))
+        summary.accrued_interest = str(q(Decimal("0")))
+        summary.last_accrual_date = opened_on
+        summary.created_at = event_time
+        summary.last_event_id = envelope["event_id"]
+        summary.last_event_time = event_time
+        read_db.flush()
+        return True
+
+    summary = read_db.get(DepositAccountSummary, account_id)
+    if summary is None:
+        return False
+
+    if event_type == "DEPOSIT_POSTED":
+        summary.current_balance = str(q(_dec(summary.current_balance) + _dec(payload["amount"])))
+    elif event_type == "WITHDRAWAL_POSTED":
+        summary.current_balance = str(q(_dec(summary.current_balance) - _dec(payload["amount"])))
+    elif event_type == "INTEREST_ACCRUED":
+        summary.accrued_interest = str(q(_dec(summary.accrued_interest) + _dec(payload["interest"])))
+        summary.last_accrual_date = dt.date.fromisoformat(payload["to_date"])
+    elif event_type == "MONTH_END_APPLIED":
+        summary.current_balance = str(q(_dec(summary.current_balance) + _dec(payload["interest_posted"])))
+        summary.accrued_interest = str(q(Decimal("0")))
+    else:
+        return False
+
+    summary.last_event_id = envelope["event_id"]
+    summary.last_event_time = event_time
+    return True
+
+
+def _apply_loan(read_db: Session, envelope: dict, event_time: dt.datetime) -> bool:
+    account_id = envelope["aggregate_id"]
+    payload = envelope["payload"]
+    event_type = envelope["event_type"]
+
+    if event_type == "LOAN_OPENED":
+        opened_on = dt.date.fromisoformat(payload["opened_on"])
+        summary = read_db.get(LoanAccountSummary, account_id)
+        if summary is None:
+            summary = LoanAccountSummary(id=account_id)
+            read_db.add(summary)
+        summary.opened_on = opened_on
+        summary.status = "OPEN"
+        summary.principal = payload["principal"]
+        summary.annual_interest_rate = payload["annual_interest_rate"]
+        summary.day_count_basis = payload["day_count_basis"]
+        summary.outstanding_principal = payload["principal"]
+        summary.accrued_interest = str(q(Decimal("0")))
+        summary.last_accrual_date = opened_on
+        summary.created_at = event_time
+        summary.last_event_id = envelope["event_id"]
+        summary.last_event_time = event_time
+        read_db.flush()
+        return True
+
+    summary = read_db.get(LoanAccountSummary, account_id)
+    if summary is None:
+        return False
+
+    if event_type == "LOAN_INTEREST_ACCRUED":
+        summary.accrued_interest = str(q(_dec(summary.accrued_interest) + _dec(payload["interest"])))
+        summary.last_accrual_date = dt.date.fromisoformat(payload["to_date"])
+    elif event_type == "LOAN_REPAYMENT_POSTED":
+        summary.accrued_interest = str(q(_dec(summary.accrued_interest) - _dec(payload["interest_paid"])))
+        summary.outstanding_principal = str(q(_dec(summary.outstanding_principal) - _dec(payload["principal_paid"])))
+    else:
+        return False
+
+    summary.last_event_id = envelope["event_id"]
+    summary.last_event_time = event_time
+    return True
+
+
+def apply_envelope(read_db: Session, envelope: dict) -> bool:
+    event_time = dt.datetime.fromisoformat(envelope["event_time"])
+    if envelope["aggregate_type"] == "deposit_account":
+        return _apply_deposit(read_db, envelope, event_time)
+    if envelope["aggregate_type"] == "loan_account":
+        return _apply_loan(read_db, envelope, event_time)
+    return False
+
+
+def get_checkpoint(read_db: Session) -> ProjectionCheckpoint | None:
+    return read_db.get(ProjectionCheckpoint, PROJECTION_NAME)
+
+
+def run_projection(db: Session, read_db: Session, *, max_messages: int) -> dict:
+    checkpoint = get_checkpoint(read_db)
+    if checkpoint is None:
+        checkpoint = ProjectionCheckpoint(name=PROJECTION_NAME, last_offset=-1, messages_applied=0)
+        read_db.add(checkpoint)
+
+    batch = fetch_after(db, topic=TOPIC, after_offset=checkpoint.last_offset, max_messages=max_messages)
+
+    applied = 0
+    skipped = 0
+    for offset, raw in batch:
+        envelope = json.loads(raw)
+        if apply_envelope(read_db, envelope):
+            applied += 1
+        else:
+            skipped += 1
+        checkpoint.last_offset = offset
+        checkpoint.last_event_time = dt.datetime.fromisoformat(envelope["event_time"])
+
+    now = utcnow()
+    caught_up = len(batch) < max_messages
+    checkpoint.messages_applied += applied
+    if caught_up:
+        checkpoint.synced_at = now
+    elif checkpoint.last_event_time is not None:
+        checkpoint.synced_at = as_utc(checkpoint.last_event_time)
+    checkpoint.updated_at = now
+    read_db.commit()
+
+    return {"applied": applied, "skipped": skipped, "caught_up": caught_up}
+
+
+def read_model_lag(read_db: Session) -> tuple[dt.datetime | None, float | None]:
+    checkpoint = get_checkpoint(read_db)
+    if checkpoint is None or checkpoint.synced_at is None:
+        return None, None
+    synced_at = as_utc(checkpoint.synced_at)
+    return synced_at, max(0.0, (utcnow() - synced_at).total_seconds())
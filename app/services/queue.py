@@ -0,0 +1,184 @@
+import asyncio
+import json
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models import DomainEvent, QueueConsumerOffset, QueueMessage, QueueTopicOffset
+from app.services.events import envelope_bytes
+from app.settings import settings
+from app.time import utcnow
+
+
+class OffsetAllocator:
+    def __init__(self, db: Session):
+        self._db = db
+
+    def next(self, topic: str) -> int:
+        counters = QueueTopicOffset.__table__
+        conn = self._db.connection()
+        # Bumping the counter row locks it until commit, so concurrent dispatchers never hand out the same offset.
+        bumped = conn.execute(
+            update(counters).where(counters.c.topic == topic).values(last_offset=counters.c.last_offset + 1)
+        )
+        if bumped.rowcount == 0:
+            conn.execute(insert(counters).values(topic=topic, last_offset=0))
+            return 0
+        return conn.execute(select(counters.c.last_offset).where(counters.c.topic == topic)).scalar_one()
+
+
+def publish(db: Session, *, topic: str, event: DomainEvent, offsets: OffsetAllocator) -> QueueMessage:
+    msg = QueueMessage(
+        topic=topic,
+        offset=offsets.next(topic),
+        event_id=event.id,
+        envelope=envelope_bytes(event) if settings.queue_payload_mode == "inline" else None,
+    )
+    db.add(msg)
+    return msg
+
+
+def fetch_after(db: Session, *, topic: str, after_offset: int, max_messages: int) -> list[tuple[int, bytes]]:
+    rows = (
+        db.query(QueueMessage, DomainEvent)
+        .outerjoin(DomainEvent, DomainEvent.id == QueueMessage.event_id)
+        .filter(QueueMessage.topic == topic)
+        .filter(QueueMessage.offset > after_offset)
+        .order_by(QueueMessage.offset.asc())
+        .limit(max_messages)
+        .all()
+    )
+
+    batch: list[tuple[int, bytes]] = []
+    for msg, domain_event in rows:
+        if msg.envelope is not None:
+            batch.append((msg.offset, msg.envelope))
+        elif domain_event is not None:
+            batch.append((msg.offset, envelope_bytes(domain_event)))
+    return batch
+
+
+def head_offset(db: Session, *, topic: str) -> int:
+    row = db.get(QueueTopicOffset, topic)
+    return -1 if row is None else row.last_offset
+
+
+def committed_offset(db: Session, *, topic: str, group: str) -> int:
+    row = db.get(QueueConsumerOffset, (topic, group))
+    return -1 if row is None else row.committed_offset
+
+
+def read_batch(*, topic: str, group: str, max_messages: int) -> tuple[int, list[tuple[int, bytes]]]:
+    with SessionLocal() as db:
+        committed = committed_offset(db, topic=topic, group=group)
+        return committed, fetch_after(db, topic=topic, after_offset=committed, max_messages=max_messages)
+
+
+def encode_poll_response(
+    *,
+    topic: str,
+    group: str,
+    committed_offset: int,
+    next_offset: int,
+    batch: list[tuple[int, bytes]],
+) -> bytes:
+    # Same shape as schemas.QueuePollResponse: {"topic", "group", "committed_offset", "next_offset",
+    # "messages": [{"offset", "envelope"}]}. Envelopes are stored as JSON bytes and are written out unchanged
+    # instead of being decoded and re-encoded.
+    fields = {"topic": topic, "group": group, "committed_offset": committed_offset, "next_offset": next_offset}
+    parts = [b"%s:%s" % (json.dumps(name).encode(), json.dumps(value).encode()) for name, value in fields.items()]
+    messages = b",".join(b'{"offset":%d,"envelope":%s}' % (offset, envelope) for offset, envelope in batch)
+    parts.append(b'"messages":[' + messages + b"]")
+    return b"{" + b",".join(parts) + b"}"
+
+
+class PublishNotifier:
+    def __init__(self):
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def listen(self) -> Iterator[asyncio.Event]:
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            yield waiter[1]
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+    def notify(self) -> None:
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, published in waiters:
+            try:
+                loop.call_soon_threadsafe(published.set)
+            except RuntimeError:
+                pass
+
+
+notifier = PublishNotifier()
+
+
+async def poll(*, topic: str, group: str, max_messages: int, wait_seconds: float) -> tuple[int, list[tuple[int, bytes]]]:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait_seconds
+    while True:
+        # Listen before reading so a publish that lands between the read and the wait is not missed.
+        with notifier.listen() as published:
+            committed, batch = await asyncio.to_thread(
+                read_batch, topic=topic, group=group, max_messages=max_messages
+            )
+            remaining = deadline - loop.time()
+            if batch or remaining <= 0:
+                return committed, batch
+            # Publishers in other processes cannot notify this one, so re-check on the poll interval as well.
+            try:
+                await asyncio.wait_for(published.wait(), timeout=min(remaining, settings.queue_poll_interval_seconds))
+            except asyncio.TimeoutError:
+                pass
+
+
+def ack(db: Session, *, topic: str, group: str, offset: int) -> int:
+    if offset > head_offset(db, topic=topic):
+        raise ValueError("offset_beyond_head")
+
+    row = db.get(QueueConsumerOffset, (topic, group))
+    if row is None:
+        row = QueueConsumerOffset(topic=topic, group_name=group, committed_offset=-1)
+        db.add(row)
+    if offset > row.committed_offset:
+        row.committed_offset = offset
+        row.updated_at = utcnow()
+    return row.committed_offset
+
+
+def list_groups(db: Session, *, topic: str) -> list[QueueConsumerOffset]:
+    return (
+        db.query(QueueConsumerOffset)
+        .filter(QueueConsumerOffset.topic == topic)
+        .order_by(QueueConsumerOffset.group_name.asc())
+        .all()
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_published_messages(session: Session, flush_context) -> None:
+    if any(isinstance(obj, QueueMessage) for obj in session.new):
+        session.info["queue_published"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_published_messages(session: Session) -> None:
+    if session.info.pop("queue_published", False):
+        notifier.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_messages(session: Session) -> None:
+    session.info.pop("queue_published", None)
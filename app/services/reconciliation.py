@@ -0,0 +1,162 @@
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+from sqlalchemy import Engine, Integer, Numeric, case, cast, create_engine, func
+from sqlalchemy.orm import Session
+
+from app.models import DepositAccount, LedgerEntry, LoanAccount, ReconciliationBreak, ReconciliationRun
+from app.money import q
+from app.time import utcnow
+
+
+# account_type -> (model, balance column, ledger control account, side that increases the balance)
+RECONCILED_BALANCES = {
+    "deposit_account": (DepositAccount, "current_balance", "customer_deposits", "credit"),
+    "loan_account": (LoanAccount, "outstanding_principal", "loan_receivable", "debit"),
+}
+
+_engines: dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def _engine(database_url: str) -> Engine:
+    with _engines_lock:
+        if database_url not in _engines:
+            connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+            _engines[database_url] = create_engine(database_url, connect_args=connect_args)
+        return _engines[database_url]
+
+
+def _cents(value: str) -> int:
+    return int(Decimal(value) * 100)
+
+
+def _format_cents(cents: int) -> str:
+    return str(q(Decimal(cents) / 100))
+
+
+def _ledger_cents(control_account: str, side: str):
+    cents = cast(func.round(cast(LedgerEntry.amount, Numeric(18, 2)) * 100), Integer)
+    increase = LedgerEntry.credit_account if side == "credit" else LedgerEntry.debit_account
+    decrease = LedgerEntry.debit_account if side == "credit" else LedgerEntry.credit_account
+    return func.sum(
+        case(
+            (increase == control_account, cents),
+            (decrease == control_account, -cents),
+            else_=0,
+        )
+    )
+
+
+def _in_range(column, after_id: str, upto_id: str | None):
+    condition = column > after_id
+    if upto_id is not None:
+        condition = condition & (column <= upto_id)
+    return condition
+
+
+def reconcile_range(database_url: str, account_type: str, after_id: str, upto_id: str | None) -> tuple[int, list[dict]]:
+    model, balance_column, control_account, side = RECONCILED_BALANCES[account_type]
+    with Session(_engine(database_url)) as db:
+        stored = dict(
+            db.query(model.id, getattr(model, balance_column))
+            .filter(_in_range(model.id, after_id, upto_id))
+            .all()
+        )
+        ledger = dict(
+            db.query(LedgerEntry.account_id, _ledger_cents(control_account, side))
+            .filter(LedgerEntry.account_type == account_type)
+            .filter(_in_range(LedgerEntry.account_id, after_id, upto_id))
+            .group_by(LedgerEntry.account_id)
+            .all()
+        )
+
+    breaks = []
+    for account_id in sorted(stored.keys() | ledger.keys()):
+        stored_cents = _cents(stored[account_id]) if account_id in stored else None
+        ledger_cents = ledger.get(account_id) or 0
+        if stored_cents == ledger_cents:
+            continue
+        breaks.append(
+            {
+                "account_type": account_type,
+                "account_id": account_id,
+                "stored_balance": _format_cents(stored_cents) if stored_cents is not None else None,
+                "ledger_balance": _format_cents(ledger_cents),
+                "difference": _format_cents((stored_cents or 0) - ledger_cents),
+            }
+        )
+    return len(stored), breaks
+
+
+def _ranges(db: Session, account_type: str, chunk_size: int) -> list[tuple[str, str | None]]:
+    model = RECONCILED_BALANCES[account_type][0]
+    ranges = []
+    after_id = ""
+    while True:
+        upto_id = (
+            db.query(model.id)
+            .filter(model.id > after_id)
+            .order_by(model.id.asc())
+            .offset(chunk_size - 1)
+            .limit(1)
+            .scalar()
+        )
+        ranges.append((after_id, upto_id))
+        if upto_id is None:
+            return ranges
+        after_id = upto_id
+
+
+def run_reconciliation(
+    db: Session,
+    *,
+    account_types: list[str] | None = None,
+    chunk_size: int,
+    workers: int,
+    progress: Callable[[int], None] | None = None,
+) -> ReconciliationRun:
+    account_types = account_types or list(RECONCILED_BALANCES)
+    for account_type in account_types:
+        if account_type not in RECONCILED_BALANCES:
+            raise ValueError(f"unknown_account_type:{account_type}")
+
+    run = ReconciliationRun(status="RUNNING", account_types=account_types, accounts_checked=0, breaks=0)
+    db.add(run)
+    db.commit()
+
+    database_url = db.get_bind().url.render_as_string(hide_password=False)
+    tasks = [
+        (database_url, account_type, after_id, upto_id)
+        for account_type in account_types
+        for after_id, upto_id in _ranges(db, account_type, chunk_size)
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    def record(checked: int, breaks: list[dict]) -> None:
+        for item in breaks:
+            db.add(ReconciliationBreak(run_id=run.id, **item))
+        run.accounts_checked += checked
+        run.breaks += len(breaks)
+        db.commit()
+        if progress is not None:
+            progress(run.accounts_checked)
+
+    if workers == 1 or len(tasks) == 1:
+        for task in tasks:
+            record(*reconcile_range(*task))
+    else:
+        # Spawned workers open their own engines instead of inheriting pooled connections.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+            for result in pool.map(reconcile_range, *zip(*tasks)):
+                record(*result)
+
+    run.status = "COMPLETED"
+    run.finished_at = utcnow()
+    db.commit()
+    return run
@@ -0,0 +1,251 @@
+import datetime as dt
+import gzip
+import json
+import os
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+
+from sqlalchemy import Date, DateTime, LargeBinary, exists, func
+from sqlalchemy.orm import Session
+
+from app.db import ReadSessionLocal
+from app.models import ChainCheckpoint, DomainEvent, OutboxMessage, QueueConsumerOffset, QueueMessage
+from app.services import projection
+from app.services.integrity import CHAINS, GLOBAL_KEY, verify_chain
+from app.settings import settings
+
+
+ARCHIVE_MODELS = {
+    "outbox_messages": OutboxMessage,
+    "queue_messages": QueueMessage,
+    "domain_events": DomainEvent,
+}
+
+FINAL_OUTBOX_STATUSES = ("SENT", "SKIPPED", "DEAD")
+
+
+def _model(table: str):
+    model = ARCHIVE_MODELS.get(table)
+    if model is None:
+        raise ValueError(f"unknown_archive_table:{table}")
+    return model
+
+
+def _partition_path(table: str, day: dt.date) -> str:
+    return os.path.join(settings.archive_dir, table, f"{day.isoformat()}.jsonl.gz")
+
+
+def _row_to_dict(row) -> dict:
+    out = {}
+    for col in row.__table__.columns:
+        value = getattr(row, col.key)
+        if isinstance(value, (dt.date, dt.datetime)):
+            value = value.isoformat()
+        elif isinstance(value, bytes):
+            value = value.decode()
+        out[col.key] = value
+    return out
+
+
+def _dict_to_row(model, data: dict):
+    values = {}
+    for col in model.__table__.columns:
+        value = data.get(col.key)
+        if value is not None and isinstance(col.type, DateTime):
+            value = dt.datetime.fromisoformat(value)
+        elif value is not None and isinstance(col.type, Date):
+            value = dt.date.fromisoformat(value)
+        elif value is not None and isinstance(col.type, LargeBinary):
+            value = value.encode()
+        values[col.key] = value
+    return model(**values)
+
+
+def _eligible(db: Session, table: str, cutoff: dt.datetime, verified_seq: int | None = None):
+    model = _model(table)
+    q = db.query(model).filter(model.created_at < cutoff)
+    if verified_seq is not None:
+        q = q.filter(model.chain_seq <= verified_seq)
+
+    if table == "outbox_messages":
+        q = q.filter(OutboxMessage.status.in_(FINAL_OUTBOX_STATUSES))
+    elif table == "queue_messages":
+        heads = (
+            db.query(QueueMessage.topic, func.max(QueueMessage.offset))
+            .group_by(QueueMessage.topic)
+            .all()
+        )
+        floors = dict(heads)
+        for topic, committed in (
+            db.query(QueueConsumerOffset.topic, func.min(QueueConsumerOffset.committed_offset))
+            .group_by(QueueConsumerOffset.topic)
+            .all()
+        ):
+            if topic in floors:
+                floors[topic] = min(floors[topic], committed + 1)
+        # The read-model projection consumes its topic like a group, but keeps its offset in the read database.
+        with ReadSessionLocal() as read_db:
+            projected = projection.get_checkpoint(read_db)
+        if projected is not None and projection.TOPIC in floors:
+            floors[projection.TOPIC] = min(floors[projection.TOPIC], projected.last_offset + 1)
+        if not floors:
+            return None
+        # Keep each topic's head row and anything a group or the projection has not consumed.
+        topic_filters = [(QueueMessage.topic == topic) & (QueueMessage.offset < floor) for topic, floor in floors.items()]
+        condition = topic_filters[0]
+        for f in topic_filters[1:]:
+            condition = condition | f
+        q = q.filter(condition)
+    elif table == "domain_events":
+        q = q.filter(~exists().where(OutboxMessage.event_id == DomainEvent.id))
+        q = q.filter(~exists().where(QueueMessage.event_id == DomainEvent.id, QueueMessage.envelope.is_(None)))
+
+    return q.order_by(model.created_at.asc())
+
+
+def archive_table(
+    db: Session,
+    *,
+    table: str,
+    cutoff: dt.datetime,
+    batch_size: int,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    model = _model(table)
+    verified_seq = None
+    if table in CHAINS:
+        # Only rows the verifier has already passed are archived, so its checkpoint covers every hole they leave.
+        verify_chain(db, chain=table, chunk_size=batch_size)
+        checkpoint = db.get(ChainCheckpoint, (table, GLOBAL_KEY))
+        verified_seq = checkpoint.last_seq if checkpoint is not None else 0
+
+    archived = 0
+    while True:
+        q = _eligible(db, table, cutoff, verified_seq)
+        if q is None:
+            return archived
+        rows = q.limit(batch_size).all()
+        if not rows:
+            return archived
+
+        by_day: dict[dt.date, list[dict]] = defaultdict(list)
+        for row in rows:
+            by_day[row.created_at.date()].append(_row_to_dict(row))
+        for day, items in by_day.items():
+            path = _partition_path(table, day)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(path, "at", encoding="utf-8") as fh:
+                for item in items:
+                    fh.write(json.dumps(item, separators=(",", ":")) + "\n")
+
+        ids = [row.id for row in rows]
+        db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        archived += len(ids)
+        if progress is not None:
+            progress(len(ids))
+        if len(rows) < batch_size:
+            return archived
+
+
+def run_retention(
+    db: Session,
+    *,
+    older_than: dt.datetime,
+    batch_size: int,
+    tables: list[str] | None = None,
+    progress: Callable[[int], None] | None = None,
+) -> dict[str, int]:
+    selected = tables or list(ARCHIVE_MODELS)
+    for table in selected:
+        _model(table)
+
+    total = 0
+
+    def _batch_done(count: int) -> None:
+        nonlocal total
+        total += count
+        if progress is not None:
+            progress(total)
+
+    # Order matters: events are only archived once no outbox or queue row references them.
+    result: dict[str, int] = {}
+    for table in ARCHIVE_MODELS:
+        if table in selected:
+            result[table] = archive_table(
+                db, table=table, cutoff=older_than, batch_size=batch_size, progress=_batch_done
+            )
+    return result
+
+
+def archive_partitions(table: str, *, date_from: dt.date | None, date_to: dt.date | None) -> list[dt.date]:
+    _model(table)
+    root = os.path.join(settings.archive_dir, table)
+    if not os.path.isdir(root):
+        return []
+
+    days = []
+    for name in os.listdir(root):
+        if not name.endswith(".jsonl.gz"):
+            continue
+        day = dt.date.fromisoformat(name[: -len(".jsonl.gz")])
+        if date_from is not None and day < date_from:
+            continue
+        if date_to is not None and day > date_to:
+            continue
+        days.append(day)
+    return sorted(days)
+
+
+def iter_archive(
+    table: str,
+    *,
+    date_from: dt.date | None = None,
+    date_to: dt.date | None = None,
+    filters: dict[str, str] | None = None,
+) -> Iterator[dict]:
+    wanted = {k: v for k, v in (filters or {}).items() if v is not None}
+    for day in archive_partitions(table, date_from=date_from, date_to=date_to):
+        seen: set[str] = set()
+        with gzip.open(_partition_path(table, day), "rt", encoding="utf-8") as fh:
+            for line in fh:
+                item = json.loads(line)
+                if item["id"] in seen:
+                    continue
+                seen.add(item["id"])
+                if all(str(item.get(k)) == v for k, v in wanted.items()):
+                    yield item
+
+
+def restore_archive(
+    db: Session,
+    *,
+    table: str,
+    date_from: dt.date | None,
+    date_to: dt.date | None,
+    filters: dict[str, str] | None,
+    batch_size: int,
+) -> int:
+    model = _model(table)
+    restored = 0
+    batch: list[dict] = []
+
+    def _flush() -> int:
+        ids = [item["id"] for item in batch]
+        present = {row[0] for row in db.query(model.id).filter(model.id.in_(ids)).all()}
+        count = 0
+        for item in batch:
+            if item["id"] not in present:
+                db.add(_dict_to_row(model, item))
+                count += 1
+        db.commit()
+        batch.clear()
+        return count
+
+    for item in iter_archive(table, date_from=date_from, date_to=date_to, filters=filters):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            restored += _flush()
+    if batch:
+        restored += _flush()
+    return restored
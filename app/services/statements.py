@@ -0,0 +1,256 @@
+import datetime as dt
+import glob
+import gzip
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from itertools import groupby, islice
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+
+from app.models import BalanceSnapshot, LedgerEntry
+from app.money import q
+from app.services.balances import signed_cents
+from app.services.reconciliation import RECONCILED_BALANCES
+from app.settings import settings
+from app.time import utcnow
+
+
+INTEREST_ACCOUNTS = ("interest_expense", "interest_income")
+MANIFEST_NAME = "manifest.json"
+
+
+def _money(cents: int) -> str:
+    return str(q(Decimal(cents) / 100))
+
+
+def _openings_query(period_start: dt.date):
+    snapshots = BalanceSnapshot.__table__
+    latest = (
+        select(snapshots.c.account_type, snapshots.c.account_id, func.max(snapshots.c.as_of).label("as_of"))
+        .where(snapshots.c.as_of < period_start)
+        .group_by(snapshots.c.account_type, snapshots.c.account_id)
+        .subquery()
+    )
+    return (
+        select(snapshots.c.account_type, snapshots.c.account_id, snapshots.c.balance_cents)
+        .join(
+            latest,
+            and_(
+                snapshots.c.account_type == latest.c.account_type,
+                snapshots.c.account_id == latest.c.account_id,
+                snapshots.c.as_of == latest.c.as_of,
+            ),
+        )
+        .order_by(snapshots.c.account_type.asc(), snapshots.c.account_id.asc())
+    )
+
+
+def _entries_query(period_start: dt.date, period_end: dt.date):
+    entries = LedgerEntry.__table__
+    return (
+        select(
+            entries.c.id,
+            entries.c.effective_date,
+            entries.c.account_type,
+            entries.c.account_id,
+            entries.c.txn_id,
+            entries.c.description,
+            entries.c.debit_account,
+            entries.c.credit_account,
+            entries.c.amount,
+        )
+        .where(entries.c.account_type.in_(list(RECONCILED_BALANCES)))
+        .where(entries.c.effective_date >= period_start, entries.c.effective_date <= period_end)
+        .order_by(
+            entries.c.account_type.asc(),
+            entries.c.account_id.asc(),
+            entries.c.effective_date.asc(),
+            entries.c.chain_seq.asc(),
+        )
+    )
+
+
+def _entry(row) -> dict:
+    return {
+        "id": row.id,
+        "effective_date": row.effective_date.isoformat(),
+        "txn_id": row.txn_id,
+        "description": row.description,
+        "amount": row.amount,
+        "cents": signed_cents(row, row.account_type),
+        "interest": row.debit_account in INTEREST_ACCOUNTS or row.credit_account in INTEREST_ACCOUNTS,
+    }
+
+
+def iter_accounts(openings: Iterator, entries: Iterator) -> Iterator[tuple[str, str, int, list[dict]]]:
+    # Both cursors are ordered by (account_type, account_id), so this is a merge join that holds one account at a time.
+    grouped = groupby(entries, key=lambda row: (row.account_type, row.account_id))
+    opening = next(openings, None)
+    group = next(grouped, None)
+    while opening is not None or group is not None:
+        opening_key = (opening.account_type, opening.account_id) if opening is not None else None
+        if group is None or (opening_key is not None and opening_key < group[0]):
+            yield (*opening_key, opening.balance_cents, [])
+            opening = next(openings, None)
+            continue
+
+        opening_cents = 0
+        if opening_key == group[0]:
+            opening_cents = opening.balance_cents
+            opening = next(openings, None)
+        yield (*group[0], opening_cents, [_entry(row) for row in group[1]])
+        group = next(grouped, None)
+
+
+def render_statement(
+    account_type: str,
+    account_id: str,
+    opening_cents: int,
+    entries: list[dict],
+    *,
+    period_start: dt.date,
+    period_end: dt.date,
+) -> dict:
+    running = opening_cents
+    interest = 0
+    transactions = []
+    for entry in entries:
+        running += entry["cents"]
+        if entry["interest"]:
+            interest += int(Decimal(entry["amount"]) * 100)
+        transactions.append(
+            {
+                "id": entry["id"],
+                "effective_date": entry["effective_date"],
+                "txn_id": entry["txn_id"],
+                "description": entry["description"],
+                "amount": entry["amount"],
+                "balance_change": _money(entry["cents"]),
+                "running_balance": _money(running),
+            }
+        )
+    return {
+        "account_type": account_type,
+        "account_id": account_id,
+        "period_start": period_start.isoformat(),
+        "period_end": period_end.isoformat(),
+        "opening_balance": _money(opening_cents),
+        "transactions": transactions,
+        "interest_posted": _money(interest),
+        "closing_balance": _money(running),
+    }
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_shard(
+    output_dir: str,
+    shard: int,
+    period_start: dt.date,
+    period_end: dt.date,
+    accounts: list[tuple[str, str, int, list[dict]]],
+) -> dict:
+    name = f"shard-{shard:05d}.jsonl.gz"
+    path = os.path.join(output_dir, name)
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+        for account_type, account_id, opening_cents, entries in accounts:
+            statement = render_statement(
+                account_type,
+                account_id,
+                opening_cents,
+                entries,
+                period_start=period_start,
+                period_end=period_end,
+            )
+            f.write(json.dumps(statement, separators=(",", ":")) + "\n")
+    os.replace(path + ".tmp", path)
+    return {
+        "file": name,
+        "accounts": len(accounts),
+        "first_account": list(accounts[0][:2]),
+        "last_account": list(accounts[-1][:2]),
+        "bytes": os.path.getsize(path),
+        "sha256": _sha256(path),
+    }
+
+
+def _batched(items: Iterator, size: int) -> Iterator[list]:
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def statement_dir(period_start: dt.date, period_end: dt.date) -> str:
+    return os.path.join(settings.statement_dir, f"{period_start.isoformat()}_{period_end.isoformat()}")
+
+
+def generate_statements(
+    db: Session,
+    *,
+    period_start: dt.date,
+    period_end: dt.date,
+    shard_size: int,
+    workers: int,
+    progress: Callable[[int], None] | None = None,
+) -> dict:
+    if period_end < period_start:
+        raise ValueError("period_end_before_period_start")
+
+    output_dir = statement_dir(period_start, period_end)
+    os.makedirs(output_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(output_dir, "shard-*.jsonl.gz*")):
+        os.remove(stale)
+
+    workers = workers or os.cpu_count() or 1
+    shards: list[dict] = []
+
+    def record(shard: dict) -> None:
+        shards.append(shard)
+        if progress is not None:
+            progress(sum(s["accounts"] for s in shards))
+
+    with db.get_bind().connect() as conn:
+        conn.execution_options(stream_results=True, yield_per=shard_size)
+        openings = conn.execute(_openings_query(period_start))
+        entries = conn.execute(_entries_query(period_start, period_end))
+        batches = enumerate(_batched(iter_accounts(iter(openings), iter(entries)), shard_size))
+
+        if workers == 1:
+            for shard, batch in batches:
+                record(render_shard(output_dir, shard, period_start, period_end, batch))
+        else:
+            # Only a couple of shards per worker are in flight, so memory stays bounded however large the book is.
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                pending = deque()
+                for shard, batch in batches:
+                    pending.append(pool.submit(render_shard, output_dir, shard, period_start, period_end, batch))
+                    if len(pending) >= workers * 2:
+                        record(pending.popleft().result())
+                while pending:
+                    record(pending.popleft().result())
+
+    manifest = {
+        "period_start": period_start.isoformat(),
+        "period_end": period_end.isoformat(),
+        "generated_at": utcnow().isoformat(),
+        "accounts": sum(s["accounts"] for s in shards),
+        "shards": shards,
+    }
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+    return {**manifest, "output_dir": output_dir}
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import logging
+import threading
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.failures import FailureTracker
+from app.models import DomainEvent
+from app.services.events import envelope_bytes
+from app.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        *,
+        after_seq: int,
+        aggregate_type: str | None = None,
+        aggregate_id: str | None = None,
+        event_type: str | None = None,
+    ):
+        self.loop = loop
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self.after_seq = after_seq
+        self.aggregate_type = aggregate_type
+        self.aggregate_id = aggregate_id
+        self.event_type = event_type
+        self.closed = False
+
+    def matches(self, ev: DomainEvent) -> bool:
+        return (
+            (self.aggregate_type is None or ev.aggregate_type == self.aggregate_type)
+            and (self.aggregate_id is None or ev.aggregate_id == self.aggregate_id)
+            and (self.event_type is None or ev.event_type == self.event_type)
+        )
+
+    def _offer(self, item: bytes | None) -> None:
+        if self.closed:
+            return
+        if item is None or self.queue.qsize() >= settings.event_stream_max_queue:
+            # A client that cannot keep up is disconnected and resumes with Last-Event-ID.
+            self.closed = True
+            item = None
+        self.queue.put_nowait(item)
+
+    def push(self, item: bytes | None) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._offer, item)
+        except RuntimeError:
+            self.closed = True
+
+
+def format_sse(ev: DomainEvent) -> bytes:
+    # Live tables show the idempotency key, which the stored envelope does not carry.
+    data = json.dumps(
+        {**json.loads(envelope_bytes(ev)), "idempotency_key": ev.idempotency_key},
+        separators=(",", ":"),
+    ).encode()
+    return b"id: %d\ndata: %s\n\n" % (ev.chain_seq, data)
+
+
+def head_seq() -> int:
+    with SessionLocal() as db:
+        return db.query(func.max(DomainEvent.chain_seq)).scalar() or 0
+
+
+class EventNotifier:
+    def __init__(self):
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.failures = FailureTracker(
+            logger,
+            "Event stream poll failed",
+            log_interval_seconds=settings.background_error_log_interval_seconds,
+        )
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def subscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.add(sub)
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._loop, name="event-notifier", daemon=True)
+                self._thread.start()
+        self.notify()
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(sub)
+
+    def disconnect_all(self) -> int:
+        with self._lock:
+            subs, self._subscriptions = self._subscriptions, set()
+        for sub in subs:
+            sub.push(None)
+        return len(subs)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        self.disconnect_all()
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join()
+
+    def poll_once(self) -> int:
+        with self._lock:
+            subs = [sub for sub in self._subscriptions if not sub.closed]
+        if not subs:
+            return 0
+
+        floor = min(sub.after_seq for sub in subs)
+        with SessionLocal() as db:
+            rows = (
+                db.query(DomainEvent)
+                .filter(DomainEvent.chain_seq > floor)
+                .order_by(DomainEvent.chain_seq.asc())
+                .limit(settings.event_stream_batch_size)
+                .all()
+            )
+            for ev in rows:
+                frame = format_sse(ev)
+                for sub in subs:
+                    if ev.chain_seq > sub.after_seq:
+                        if sub.matches(ev):
+                            sub.push(frame)
+                        sub.after_seq = ev.chain_seq
+        return len(rows)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(settings.event_stream_poll_interval_seconds)
+            self._wake.clear()
+            try:
+                while self.poll_once() >= settings.event_stream_batch_size:
+                    pass
+            except Exception as e:
+                # The next wake-up retries from each subscription's last delivered sequence.
+                if self.failures.record(e) >= settings.event_stream_max_failures:
+                    # Clients reconnect with Last-Event-ID instead of waiting on a stuck stream.
+                    dropped = self.disconnect_all()
+                    logger.warning("Event stream disconnected %d subscribers after repeated failures", dropped)
+                    self.failures.succeeded()
+            else:
+                self.failures.succeeded()
+
+    def stats(self) -> dict:
+        with self._lock:
+            subscribers = len(self._subscriptions)
+        return {"subscribers": subscribers, **self.failures.stats()}
+
+
+notifier = EventNotifier()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_appended_events(session: Session, flush_context) -> None:
+    if any(isinstance(obj, DomainEvent) for obj in session.new):
+        session.info["events_appended"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_committed_events(session: Session) -> None:
+    if session.info.pop("events_appended", False):
+        notifier.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_events(session: Session) -> None:
+    session.info.pop("events_appended", None)
@@ -3,6 +3,53 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./fintech.db"
+    read_model_database_url: str | None = None
+    max_conflict_retries: int = 3
+    hot_account_flush_interval_ms: int = 200
+    hot_account_flush_batch_size: int = 1000
+    background_error_log_interval_seconds: float = 60.0
+
+    account_cache_size: int = 10000
+
+    group_commit_enabled: bool = False
+    group_commit_window_ms: float = 2.0
+    group_commit_max_batch: int = 100
+
+    queue_enabled: bool = True
+    queue_payload_mode: str = "inline"
+    queue_poll_interval_seconds: float = 1.0
+
+    event_stream_poll_interval_seconds: float = 1.0
+    event_stream_batch_size: int = 500
+    event_stream_max_queue: int = 1000
+    event_stream_keepalive_seconds: float = 15.0
+    event_stream_max_failures: int = 5
+
+    circuit_window_size: int = 20
+    circuit_min_samples: int = 5
+    circuit_error_rate_threshold: float = 0.5
+    circuit_open_seconds: int = 30
+    circuit_max_open_seconds: int = 600
+    webhook_timeout_seconds: float = 5.0
+    webhook_min_timeout_seconds: float = 1.0
+
+    job_workers: int = 2
+    job_stale_seconds: int = 60
+    job_heartbeat_seconds: float = 10.0
+
+    retention_days: int = 90
+    retention_batch_size: int = 500
+    archive_dir: str = "./archive"
+
+    traffic_capture_path: str | None = None
+    traffic_capture_max_body_bytes: int = 65536
+
+    reconciliation_workers: int = 0
+    reconciliation_chunk_size: int = 5000
+
+    statement_dir: str = "./statements"
+    statement_workers: int = 0
+    statement_shard_size: int = 10000
 
 
 settings = Settings()
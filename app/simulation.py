@@ -0,0 +1,330 @@
+import argparse
+import datetime as dt
+import json
+import os
+import random
+import sys
+import time
+from collections.abc import Callable
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import contracts
+from app.db import SessionLocal
+from app.migrations import upgrade
+from app.models import BalanceSnapshot, DomainEvent, LedgerEntry, OutboxMessage, QueueMessage
+from app.money import q
+from app.replay import percentile
+from app.services import deposit as deposit_service
+from app.services import loan as loan_service
+from app.time import SimulatedClock, use_clock
+
+
+GROWTH_TABLES = (LedgerEntry, DomainEvent, OutboxMessage, QueueMessage, BalanceSnapshot)
+
+
+def _amount(rng: random.Random, low: int, high: int) -> Decimal:
+    return q(Decimal(rng.randint(low * 100, high * 100)) / 100)
+
+
+def _is_month_end(day: dt.date) -> bool:
+    return (day + dt.timedelta(days=1)).month != day.month
+
+
+def database_growth(db: Session) -> dict:
+    rows = {
+        model.__tablename__: db.execute(select(func.count()).select_from(model.__table__)).scalar()
+        for model in GROWTH_TABLES
+    }
+    url = db.get_bind().url
+    size = None
+    if url.get_backend_name() == "sqlite" and url.database and os.path.exists(url.database):
+        size = os.path.getsize(url.database)
+    return {"rows": rows, "db_bytes": size}
+
+
+class Simulation:
+    def __init__(self, db: Session, *, start: dt.date, seed: int, activity: float):
+        self.db = db
+        self.start = start
+        self.rng = random.Random(seed)
+        self.activity = activity
+        self.deposit_ids: list[str] = []
+        self.installments: dict[str, Decimal] = {}
+        self.latencies: list[float] = []
+
+    def _timed(self, operation: Callable[[], object]) -> None:
+        started = time.perf_counter()
+        try:
+            operation()
+            self.db.commit()
+        except ValueError:
+            # insufficient_funds and overpayments are part of a realistic mix; they still cost a round trip.
+            self.db.rollback()
+        self.latencies.append((time.perf_counter() - started) * 1000)
+
+    def open_portfolio(self, *, deposits: int, loans: int) -> None:
+        for _ in range(deposits):
+            acct = deposit_service.open_account(
+                self.db,
+                opened_on=self.start,
+                annual_interest_rate=Decimal(self.rng.randint(50, 500)) / 10000,
+                day_count_basis=365,
+                idempotency_key=None,
+            )
+            self.db.flush()
+            deposit_service.post_deposit(
+                self.db,
+                account_id=acct.id,
+                amount=_amount(self.rng, 100, 5000),
+                effective_date=self.start,
+                idempotency_key=None,
+            )
+            self.deposit_ids.append(acct.id)
+        for _ in range(loans):
+            principal = _amount(self.rng, 1000, 20000)
+            acct = loan_service.open_loan(
+                self.db,
+                opened_on=self.start,
+                principal=principal,
+                annual_interest_rate=Decimal(self.rng.randint(400, 1500)) / 10000,
+                day_count_basis=365,
+                idempotency_key=None,
+            )
+            self.db.flush()
+            self.installments[acct.id] = q(principal / 10)
+        self.db.commit()
+
+    def run_day(self, day: dt.date) -> None:
+        for account_id in self.deposit_ids:
+            if self.rng.random() < self.activity:
+                amount = _amount(self.rng, 10, 500)
+                self._timed(
+                    lambda: deposit_service.post_deposit(
+                        self.db, account_id=account_id, amount=amount, effective_date=day, idempotency_key=None
+                    )
+                )
+            if self.rng.random() < self.activity / 2:
+                amount = _amount(self.rng, 10, 300)
+                self._timed(
+                    lambda: deposit_service.post_withdrawal(
+                        self.db, account_id=account_id, amount=amount, effective_date=day, idempotency_key=None
+                    )
+                )
+            self._timed(lambda: deposit_service.accrue_interest(self.db, account_id=account_id, as_of_date=day))
+
+        for loan_id in self.installments:
+            self._timed(lambda: loan_service.accrue_interest(self.db, account_id=loan_id, as_of_date=day))
+
+        if _is_month_end(day):
+            for account_id in self.deposit_ids:
+                self._timed(lambda: deposit_service.apply_month_end(self.db, account_id=account_id, effective_date=day))
+            for loan_id, installment in self.installments.items():
+                self._timed(
+                    lambda: loan_service.post_repayment(
+                        self.db, account_id=loan_id, amount=installment, effective_date=day, idempotency_key=None
+                    )
+                )
+
+
+def run_simulation(
+    *,
+    start: dt.date,
+    days: int,
+    deposits: int,
+    loans: int,
+    activity: float = 0.3,
+    seed: int = 0,
+    growth_every: int = 30,
+    report: Callable[[dict], None] | None = None,
+) -> list[dict]:
+    clock = SimulatedClock(dt.datetime.combine(start, dt.time(0, 0), tzinfo=dt.UTC))
+    results = []
+    with use_clock(clock), SessionLocal() as db:
+        sim = Simulation(db, start=start, seed=seed, activity=activity)
+        sim.open_portfolio(deposits=deposits, loans=loans)
+
+        for offset in range(days):
+            day = start + dt.timedelta(days=offset)
+            clock.advance_to(dt.datetime.combine(day, dt.time(9, 0), tzinfo=dt.UTC))
+            sim.latencies = []
+            started = time.perf_counter()
+            sim.run_day(day)
+            latencies = sorted(sim.latencies)
+            result = {
+                "day": day.isoformat(),
+                "wall_ms": round((time.perf_counter() - started) * 1000, 3),
+                "operations": len(latencies),
+                "latency_ms": {
+                    "p50": percentile(latencies, 50),
+                    "p95": percentile(latencies, 95),
+                    "max": round(latencies[-1], 3) if latencies else None,
+                },
+            }
+            if (offset + 1) % growth_every == 0 or offset == days - 1:
+                result.update(database_growth(db))
+            results.append(result)
+            if report is not None:
+                report(result)
+    return results
+
+
+class InMemorySimulation:
+    def __init__(
+        self,
+        *,
+        start: dt.date,
+        seed: int,
+        activity: float,
+        sink: Callable[[contracts.Outcome], None] | None = None,
+    ):
+        self.start = start
+        self.rng = random.Random(seed)
+        self.activity = activity
+        self.sink = sink
+        self.deposits: list[contracts.DepositState] = []
+        self.loans: list[tuple[contracts.LoanState, int]] = []
+        self.operations = 0
+        self.rejected = 0
+        self.ledger_records = 0
+        self.event_records = 0
+
+    def _emit(self, outcome: contracts.Outcome) -> None:
+        self.operations += 1
+        self.ledger_records += len(outcome.ledger)
+        self.event_records += len(outcome.events)
+        if self.sink is not None:
+            self.sink(outcome)
+
+    def _ref(self) -> str:
+        return f"sim:{self.operations}"
+
+    def open_portfolio(self, *, deposits: int, loans: int) -> None:
+        rng = self.rng
+        for n in range(deposits):
+            state, outcome = contracts.open_deposit(
+                f"deposit-{n}", opened_on=self.start, annual_rate=rng.randint(50, 500) * 100, day_count_basis=365
+            )
+            self._emit(outcome)
+            self._emit(contracts.deposit(state, rng.randint(10000, 500000), effective_date=self.start, ref=self._ref()))
+            self.deposits.append(state)
+        for n in range(loans):
+            principal = rng.randint(100000, 2000000)
+            state, outcome = contracts.open_loan(
+                f"loan-{n}",
+                opened_on=self.start,
+                principal=principal,
+                annual_rate=rng.randint(400, 1500) * 100,
+                day_count_basis=365,
+                ref=self._ref(),
+            )
+            self._emit(outcome)
+            self.loans.append((state, (principal + 5) // 10))
+
+    def run_day(self, day: dt.date) -> None:
+        rng, activity = self.rng, self.activity
+        for state in self.deposits:
+            if rng.random() < activity:
+                self._emit(contracts.deposit(state, rng.randint(1000, 50000), effective_date=day, ref=self._ref()))
+            if rng.random() < activity / 2:
+                amount = rng.randint(1000, 30000)
+                try:
+                    self._emit(contracts.withdraw(state, amount, effective_date=day, ref=self._ref()))
+                except ValueError:
+                    self.operations += 1
+                    self.rejected += 1
+            self._emit(contracts.accrue_deposit(state, day))
+
+        for state, _ in self.loans:
+            self._emit(contracts.accrue_loan(state, day))
+
+        if _is_month_end(day):
+            for state in self.deposits:
+                self._emit(contracts.month_end(state, day))
+            for state, installment in self.loans:
+                self._emit(contracts.repay(state, installment, effective_date=day, ref=self._ref()))
+
+    def totals(self) -> dict:
+        return {
+            "deposit_balances": contracts.money(sum(state.balance for state in self.deposits)),
+            "deposit_accrued": contracts.money(sum(state.accrued for state in self.deposits)),
+            "loan_outstanding": contracts.money(sum(state.outstanding for state, _ in self.loans)),
+            "loan_accrued": contracts.money(sum(state.accrued for state, _ in self.loans)),
+        }
+
+
+def run_in_memory(
+    *,
+    start: dt.date,
+    days: int,
+    deposits: int,
+    loans: int,
+    activity: float = 0.3,
+    seed: int = 0,
+    growth_every: int = 30,
+    report: Callable[[dict], None] | None = None,
+    sink: Callable[[contracts.Outcome], None] | None = None,
+) -> list[dict]:
+    sim = InMemorySimulation(start=start, seed=seed, activity=activity, sink=sink)
+    sim.open_portfolio(deposits=deposits, loans=loans)
+
+    results = []
+    for offset in range(days):
+        day = start + dt.timedelta(days=offset)
+        operations, rejected = sim.operations, sim.rejected
+        started = time.perf_counter()
+        sim.run_day(day)
+        wall = time.perf_counter() - started
+        result = {
+            "day": day.isoformat(),
+            "wall_ms": round(wall * 1000, 3),
+            "operations": sim.operations - operations,
+            "rejected": sim.rejected - rejected,
+            "ops_per_sec": round((sim.operations - operations) / wall) if wall else None,
+        }
+        if (offset + 1) % growth_every == 0 or offset == days - 1:
+            result["records"] = {"ledger": sim.ledger_records, "events": sim.event_records}
+            result["totals"] = sim.totals()
+        results.append(result)
+        if report is not None:
+            report(result)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.simulation",
+        description="Drive a synthetic portfolio through the posting services on a simulated clock.",
+    )
+    parser.add_argument("--start", type=dt.date.fromisoformat, default=dt.date(2026, 1, 1))
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--deposits", type=int, default=100)
+    parser.add_argument("--loans", type=int, default=20)
+    parser.add_argument("--activity", type=float, default=0.3, help="daily probability of a deposit per account")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--growth-every", type=int, default=30, help="report table sizes every N simulated days")
+    parser.add_argument(
+        "--in-memory", action="store_true", help="run the contract engine directly, without a database"
+    )
+    args = parser.parse_args(argv)
+
+    runner = run_in_memory if args.in_memory else run_simulation
+    if not args.in_memory:
+        upgrade()
+    runner(
+        start=args.start,
+        days=args.days,
+        deposits=args.deposits,
+        loans=args.loans,
+        activity=args.activity,
+        seed=args.seed,
+        growth_every=args.growth_every,
+        report=lambda result: print(json.dumps(result), flush=True),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,54 @@
 import datetime as dt
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+
+Clock = Callable[[], dt.datetime]
+
+_clock: Clock | None = None
 
 
 def utcnow() -> dt.datetime:
+    if _clock is not None:
+        return _clock()
     return dt.datetime.now(dt.UTC)
+
+
+def as_utc(value: dt.datetime) -> dt.datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=dt.UTC)
+    return value
+
+
+def set_clock(clock: Clock | None) -> None:
+    global _clock
+    _clock = clock
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    previous = _clock
+    set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
+
+
+class SimulatedClock:
+    def __init__(self, start: dt.datetime, *, tick: dt.timedelta = dt.timedelta(microseconds=1)):
+        self._now = as_utc(start)
+        self._tick = tick
+        self._lock = threading.Lock()
+
+    def __call__(self) -> dt.datetime:
+        # Every read moves time forward a little so timestamps stay unique and ordered, as they would in real time.
+        with self._lock:
+            now = self._now
+            self._now += self._tick
+            return now
+
+    def advance_to(self, moment: dt.datetime) -> None:
+        with self._lock:
+            self._now = max(self._now, as_utc(moment))
@@ -0,0 +1,19 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def database(tmp_path, monkeypatch):
+    from app import db
+    from app.migrations import upgrade
+    from app.settings import settings
+
+    # Each test gets its own migrated SQLite file, so rows never leak from one test into another.
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{tmp_path / 'fintech.db'}")
+    monkeypatch.setattr(settings, "read_model_database_url", None)
+    monkeypatch.setattr(db, "_engine", None)
+    monkeypatch.setattr(db, "_read_engine", None)
+    upgrade()
+    yield settings.database_url
+    for engine in (db._engine, db._read_engine):
+        if engine is not None:
+            engine.dispose()
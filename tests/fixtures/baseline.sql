@@ -0,0 +1,124 @@
+BEGIN TRANSACTION;
+CREATE TABLE deposit_accounts (
+	id VARCHAR NOT NULL, 
+	opened_on DATE NOT NULL, 
+	status VARCHAR NOT NULL, 
+	annual_interest_rate VARCHAR NOT NULL, 
+	day_count_basis INTEGER NOT NULL, 
+	current_balance VARCHAR NOT NULL, 
+	accrued_interest VARCHAR NOT NULL, 
+	last_accrual_date DATE, 
+	created_at DATETIME NOT NULL, 
+	PRIMARY KEY (id)
+);
+INSERT INTO "deposit_accounts" VALUES('485d7cf1-5e67-43d2-8828-589898046e80','2026-01-01','OPEN','0.050000',365,'120.49','0.00','2026-01-31','2026-10-19 02:01:14.774422');
+CREATE TABLE domain_events (
+	id VARCHAR NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	aggregate_type VARCHAR NOT NULL, 
+	aggregate_id VARCHAR NOT NULL, 
+	event_type VARCHAR NOT NULL, 
+	event_time DATETIME NOT NULL, 
+	payload JSON NOT NULL, 
+	idempotency_key VARCHAR, 
+	PRIMARY KEY (id)
+);
+INSERT INTO "domain_events" VALUES('b82e29ec-2529-4594-bbad-85b9bba1c6b3','2026-10-19 02:01:14.776254','deposit_account','485d7cf1-5e67-43d2-8828-589898046e80','DEPOSIT_ACCOUNT_OPENED','2026-10-19 02:01:14.775210','{"opened_on": "2026-01-01", "annual_interest_rate": "0.050000", "day_count_basis": 365}','open-d1');
+INSERT INTO "domain_events" VALUES('6d808a4f-90a5-4504-8c59-ba70c26d2de8','2026-10-19 02:01:14.793056','deposit_account','485d7cf1-5e67-43d2-8828-589898046e80','DEPOSIT_POSTED','2026-10-19 02:01:14.791732','{"amount": "100.00", "effective_date": "2026-01-02"}','dep-0');
+INSERT INTO "domain_events" VALUES('57da5f15-e1b8-40eb-a103-b5e0b1bed83c','2026-10-19 02:01:14.804301','deposit_account','485d7cf1-5e67-43d2-8828-589898046e80','DEPOSIT_POSTED','2026-10-19 02:01:14.803661','{"amount": "50.00", "effective_date": "2026-01-03"}','dep-1');
+INSERT INTO "domain_events" VALUES('1f3d9803-59be-4721-98ad-b347929e016b','2026-10-19 02:01:14.813307','deposit_account','485d7cf1-5e67-43d2-8828-589898046e80','WITHDRAWAL_POSTED','2026-10-19 02:01:14.812666','{"amount": "30.00", "effective_date": "2026-01-05"}',NULL);
+INSERT INTO "domain_events" VALUES('47e29771-ba1f-47ad-8ae7-f6fe6c1b7c32','2026-10-19 02:01:14.822493','deposit_account','485d7cf1-5e67-43d2-8828-589898046e80','INTEREST_ACCRUED','2026-10-19 02:01:14.821262','{"from_date": "2026-01-01", "to_date": "2026-01-31", "days": 30, "interest": "0.49"}',NULL);
+INSERT INTO "domain_events" VALUES('32d5d934-3608-4a04-a276-8c7b6b37ec58','2026-10-19 02:01:14.831281','deposit_account','485d7cf1-5e67-43d2-8828-589898046e80','MONTH_END_APPLIED','2026-10-19 02:01:14.830061','{"effective_date": "2026-01-31", "interest_posted": "0.49"}',NULL);
+INSERT INTO "domain_events" VALUES('a10d4dbb-a098-4f3d-b118-cbfa7dce2d0a','2026-10-19 02:01:14.841665','loan_account','979532d4-b0f7-4cd7-8a3b-ed044a43037a','LOAN_OPENED','2026-10-19 02:01:14.841364','{"opened_on": "2026-01-01", "principal": "1000.00", "annual_interest_rate": "0.100000", "day_count_basis": 365}',NULL);
+INSERT INTO "domain_events" VALUES('503ad1a5-302b-4fdc-98e7-fd6b2dbadf1d','2026-10-19 02:01:14.851487','loan_account','979532d4-b0f7-4cd7-8a3b-ed044a43037a','LOAN_INTEREST_ACCRUED','2026-10-19 02:01:14.851173','{"from_date": "2026-01-01", "to_date": "2026-01-31", "days": 30, "interest": "8.22"}',NULL);
+INSERT INTO "domain_events" VALUES('6468e7a9-3221-48fb-85dd-e62cb7cb3b39','2026-10-19 02:01:14.858783','loan_account','979532d4-b0f7-4cd7-8a3b-ed044a43037a','LOAN_REPAYMENT_POSTED','2026-10-19 02:01:14.858294','{"amount": "100.00", "interest_paid": "8.22", "principal_paid": "91.78", "effective_date": "2026-01-31"}',NULL);
+CREATE TABLE ledger_entries (
+	id VARCHAR NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	effective_date DATE NOT NULL, 
+	account_type VARCHAR NOT NULL, 
+	account_id VARCHAR NOT NULL, 
+	txn_id VARCHAR NOT NULL, 
+	description VARCHAR NOT NULL, 
+	debit_account VARCHAR NOT NULL, 
+	credit_account VARCHAR NOT NULL, 
+	amount VARCHAR NOT NULL, 
+	PRIMARY KEY (id)
+);
+INSERT INTO "ledger_entries" VALUES('f3bff7b9-d1ff-4374-99af-cf92d3f276cf','2026-10-19 02:01:14.794693','2026-01-02','deposit_account','485d7cf1-5e67-43d2-8828-589898046e80','deposit:dep-0','Customer deposit','cash','customer_deposits','100.00');
+INSERT INTO "ledger_entries" VALUES('47295953-cbfb-4a4e-86c0-2d079512f3e8','2026-10-19 02:01:14.804557','2026-01-03','deposit_account','485d7cf1-5e67-43d2-8828-589898046e80','deposit:dep-1','Customer deposit','cash','customer_deposits','50.00');
+INSERT INTO "ledger_entries" VALUES('188cb093-37b8-4320-9c28-5a95483d078a','2026-10-19 02:01:14.813589','2026-01-05','deposit_account','485d7cf1-5e67-43d2-8828-589898046e80','withdrawal:2026-10-19T02:01:14.812568+00:00','Customer withdrawal','customer_deposits','cash','30.00');
+INSERT INTO "ledger_entries" VALUES('343c1fcb-c210-439d-91b9-516d1279edef','2026-10-19 02:01:14.831568','2026-01-31','deposit_account','485d7cf1-5e67-43d2-8828-589898046e80','interest_post:2026-01-31:485d7cf1-5e67-43d2-8828-589898046e80','Month-end interest posting','interest_expense','customer_deposits','0.49');
+INSERT INTO "ledger_entries" VALUES('9c136bdb-3c3d-4a59-92ba-2594acd022f6','2026-10-19 02:01:14.841994','2026-01-01','loan_account','979532d4-b0f7-4cd7-8a3b-ed044a43037a','loan_disburse:2026-10-19T02:01:14.841257+00:00','Loan disbursement','loan_receivable','cash','1000.00');
+INSERT INTO "ledger_entries" VALUES('cbf81342-f925-4d7e-840d-63baf2a811dd','2026-10-19 02:01:14.859498','2026-01-31','loan_account','979532d4-b0f7-4cd7-8a3b-ed044a43037a','loan_payment_interest:2026-10-19T02:01:14.858196+00:00','Loan payment (interest)','cash','interest_income','8.22');
+INSERT INTO "ledger_entries" VALUES('f82d294d-5f45-4981-9e2e-50b7cf704eaf','2026-10-19 02:01:14.859505','2026-01-31','loan_account','979532d4-b0f7-4cd7-8a3b-ed044a43037a','loan_payment_principal:2026-10-19T02:01:14.858196+00:00','Loan payment (principal)','cash','loan_receivable','91.78');
+CREATE TABLE loan_accounts (
+	id VARCHAR NOT NULL, 
+	opened_on DATE NOT NULL, 
+	status VARCHAR NOT NULL, 
+	principal VARCHAR NOT NULL, 
+	annual_interest_rate VARCHAR NOT NULL, 
+	day_count_basis INTEGER NOT NULL, 
+	outstanding_principal VARCHAR NOT NULL, 
+	accrued_interest VARCHAR NOT NULL, 
+	last_accrual_date DATE, 
+	created_at DATETIME NOT NULL, 
+	PRIMARY KEY (id)
+);
+INSERT INTO "loan_accounts" VALUES('979532d4-b0f7-4cd7-8a3b-ed044a43037a','2026-01-01','OPEN','1000.00','0.100000',365,'908.22','0.00','2026-01-31','2026-10-19 02:01:14.840630');
+CREATE TABLE outbox_messages (
+	id VARCHAR NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	event_id VARCHAR NOT NULL, 
+	destination VARCHAR NOT NULL, 
+	status VARCHAR NOT NULL, 
+	attempts INTEGER NOT NULL, 
+	max_attempts INTEGER NOT NULL, 
+	next_attempt_at DATETIME, 
+	last_error VARCHAR, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(event_id) REFERENCES domain_events (id)
+);
+INSERT INTO "outbox_messages" VALUES('dfd7c9c1-3abb-4fac-8ff9-1da68a4c62bf','2026-10-19 02:01:14.780231','b82e29ec-2529-4594-bbad-85b9bba1c6b3','webhook:115b59c2-42cd-4495-9779-5d47487fc0a2','PENDING',1,10,'2026-10-19 02:01:15.866524','[Errno 111] Connection refused');
+INSERT INTO "outbox_messages" VALUES('fbc37492-88fb-4999-aa55-f5fd840d58a5','2026-10-19 02:01:14.780245','b82e29ec-2529-4594-bbad-85b9bba1c6b3','queue:domain_events','SENT',1,10,NULL,NULL);
+INSERT INTO "outbox_messages" VALUES('d6958dcb-f5d7-40a7-8f4e-e71ff759a586','2026-10-19 02:01:14.796373','6d808a4f-90a5-4504-8c59-ba70c26d2de8','webhook:115b59c2-42cd-4495-9779-5d47487fc0a2','PENDING',1,10,'2026-10-19 02:01:15.866524','[Errno 111] Connection refused');
+INSERT INTO "outbox_messages" VALUES('ad5c1a3d-ada2-4d9e-8bb7-f679927a4a81','2026-10-19 02:01:14.796385','6d808a4f-90a5-4504-8c59-ba70c26d2de8','queue:domain_events','SENT',1,10,NULL,NULL);
+INSERT INTO "outbox_messages" VALUES('fd330665-e96d-4dcb-8ec3-698dce865dd3','2026-10-19 02:01:14.805867','57da5f15-e1b8-40eb-a103-b5e0b1bed83c','webhook:115b59c2-42cd-4495-9779-5d47487fc0a2','PENDING',1,10,'2026-10-19 02:01:15.866524','[Errno 111] Connection refused');
+INSERT INTO "outbox_messages" VALUES('4663b38f-c90e-4294-91cb-5e8567aa912a','2026-10-19 02:01:14.805880','57da5f15-e1b8-40eb-a103-b5e0b1bed83c','queue:domain_events','SENT',1,10,NULL,NULL);
+INSERT INTO "outbox_messages" VALUES('393f06ac-a373-4ade-b750-25852a192d4d','2026-10-19 02:01:14.814813','1f3d9803-59be-4721-98ad-b347929e016b','webhook:115b59c2-42cd-4495-9779-5d47487fc0a2','PENDING',1,10,'2026-10-19 02:01:15.866524','[Errno 111] Connection refused');
+INSERT INTO "outbox_messages" VALUES('90a78a06-9682-4957-92a1-811a6560d13e','2026-10-19 02:01:14.814826','1f3d9803-59be-4721-98ad-b347929e016b','queue:domain_events','SENT',1,10,NULL,NULL);
+INSERT INTO "outbox_messages" VALUES('6a0389f6-0d1a-468e-ad6f-507c670618a7','2026-10-19 02:01:14.823652','47e29771-ba1f-47ad-8ae7-f6fe6c1b7c32','webhook:115b59c2-42cd-4495-9779-5d47487fc0a2','PENDING',1,10,'2026-10-19 02:01:15.866524','[Errno 111] Connection refused');
+INSERT INTO "outbox_messages" VALUES('2b7861ac-9a38-4fe7-9a18-978a7ddb33f4','2026-10-19 02:01:14.823663','47e29771-ba1f-47ad-8ae7-f6fe6c1b7c32','queue:domain_events','SENT',1,10,NULL,NULL);
+INSERT INTO "outbox_messages" VALUES('01dd80aa-2bbf-432e-a003-f3a8612996e9','2026-10-19 02:01:14.832800','32d5d934-3608-4a04-a276-8c7b6b37ec58','webhook:115b59c2-42cd-4495-9779-5d47487fc0a2','PENDING',1,10,'2026-10-19 02:01:15.866524','[Errno 111] Connection refused');
+INSERT INTO "outbox_messages" VALUES('731d6290-3963-472f-a3a0-85e3bde806ed','2026-10-19 02:01:14.832813','32d5d934-3608-4a04-a276-8c7b6b37ec58','queue:domain_events','SENT',1,10,NULL,NULL);
+INSERT INTO "outbox_messages" VALUES('cc2b5633-9290-4264-b1b3-8b6e7c4dcfea','2026-10-19 02:01:14.843071','a10d4dbb-a098-4f3d-b118-cbfa7dce2d0a','webhook:115b59c2-42cd-4495-9779-5d47487fc0a2','PENDING',1,10,'2026-10-19 02:01:15.866524','[Errno 111] Connection refused');
+INSERT INTO "outbox_messages" VALUES('e53eacce-984b-4cc9-87e9-34db95ff375f','2026-10-19 02:01:14.843081','a10d4dbb-a098-4f3d-b118-cbfa7dce2d0a','queue:domain_events','SENT',1,10,NULL,NULL);
+INSERT INTO "outbox_messages" VALUES('a0da39cf-1a03-4cf4-8f68-a6707762816e','2026-10-19 02:01:14.853450','503ad1a5-302b-4fdc-98e7-fd6b2dbadf1d','webhook:115b59c2-42cd-4495-9779-5d47487fc0a2','PENDING',1,10,'2026-10-19 02:01:15.866524','[Errno 111] Connection refused');
+INSERT INTO "outbox_messages" VALUES('9cc71e02-9720-4c79-9f4d-67b37e807c56','2026-10-19 02:01:14.853459','503ad1a5-302b-4fdc-98e7-fd6b2dbadf1d','queue:domain_events','SENT',1,10,NULL,NULL);
+INSERT INTO "outbox_messages" VALUES('91db12d6-11b7-49ad-8a44-d2545b3ac968','2026-10-19 02:01:14.860884','6468e7a9-3221-48fb-85dd-e62cb7cb3b39','webhook:115b59c2-42cd-4495-9779-5d47487fc0a2','PENDING',1,10,'2026-10-19 02:01:15.866524','[Errno 111] Connection refused');
+INSERT INTO "outbox_messages" VALUES('92ed6aa6-dffa-466a-88cd-3aa42beeef6c','2026-10-19 02:01:14.860891','6468e7a9-3221-48fb-85dd-e62cb7cb3b39','queue:domain_events','SENT',1,10,NULL,NULL);
+CREATE TABLE queue_messages (
+	id VARCHAR NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	topic VARCHAR NOT NULL, 
+	payload JSON NOT NULL, 
+	PRIMARY KEY (id)
+);
+INSERT INTO "queue_messages" VALUES('52e1d27e-0a92-4705-9447-4ed5fa5e0f61','2026-10-19 02:01:15.258878','domain_events','{"event_id": "b82e29ec-2529-4594-bbad-85b9bba1c6b3", "aggregate_type": "deposit_account", "aggregate_id": "485d7cf1-5e67-43d2-8828-589898046e80", "event_type": "DEPOSIT_ACCOUNT_OPENED", "event_time": "2026-10-19T02:01:14.775210", "payload": {"opened_on": "2026-01-01", "annual_interest_rate": "0.050000", "day_count_basis": 365}}');
+INSERT INTO "queue_messages" VALUES('3ebe1ff5-0d48-48b4-a57c-cd43807fa4a8','2026-10-19 02:01:15.258889','domain_events','{"event_id": "6d808a4f-90a5-4504-8c59-ba70c26d2de8", "aggregate_type": "deposit_account", "aggregate_id": "485d7cf1-5e67-43d2-8828-589898046e80", "event_type": "DEPOSIT_POSTED", "event_time": "2026-10-19T02:01:14.791732", "payload": {"amount": "100.00", "effective_date": "2026-01-02"}}');
+INSERT INTO "queue_messages" VALUES('2d67d9bc-09fc-46d0-bcf3-f50c2b93962f','2026-10-19 02:01:15.258893','domain_events','{"event_id": "57da5f15-e1b8-40eb-a103-b5e0b1bed83c", "aggregate_type": "deposit_account", "aggregate_id": "485d7cf1-5e67-43d2-8828-589898046e80", "event_type": "DEPOSIT_POSTED", "event_time": "2026-10-19T02:01:14.803661", "payload": {"amount": "50.00", "effective_date": "2026-01-03"}}');
+INSERT INTO "queue_messages" VALUES('906a04b5-88e3-4446-9b40-3085ec644a79','2026-10-19 02:01:15.258897','domain_events','{"event_id": "1f3d9803-59be-4721-98ad-b347929e016b", "aggregate_type": "deposit_account", "aggregate_id": "485d7cf1-5e67-43d2-8828-589898046e80", "event_type": "WITHDRAWAL_POSTED", "event_time": "2026-10-19T02:01:14.812666", "payload": {"amount": "30.00", "effective_date": "2026-01-05"}}');
+INSERT INTO "queue_messages" VALUES('6e60cf52-f815-4453-8418-6e77fce18026','2026-10-19 02:01:15.258901','domain_events','{"event_id": "47e29771-ba1f-47ad-8ae7-f6fe6c1b7c32", "aggregate_type": "deposit_account", "aggregate_id": "485d7cf1-5e67-43d2-8828-589898046e80", "event_type": "INTEREST_ACCRUED", "event_time": "2026-10-19T02:01:14.821262", "payload": {"from_date": "2026-01-01", "to_date": "2026-01-31", "days": 30, "interest": "0.49"}}');
+INSERT INTO "queue_messages" VALUES('3c0ed174-41b4-4c0f-b06c-1a2cc60bc594','2026-10-19 02:01:15.258905','domain_events','{"event_id": "32d5d934-3608-4a04-a276-8c7b6b37ec58", "aggregate_type": "deposit_account", "aggregate_id": "485d7cf1-5e67-43d2-8828-589898046e80", "event_type": "MONTH_END_APPLIED", "event_time": "2026-10-19T02:01:14.830061", "payload": {"effective_date": "2026-01-31", "interest_posted": "0.49"}}');
+INSERT INTO "queue_messages" VALUES('06bb7fe7-f22a-47ea-b0ee-d82c077753ef','2026-10-19 02:01:15.258910','domain_events','{"event_id": "a10d4dbb-a098-4f3d-b118-cbfa7dce2d0a", "aggregate_type": "loan_account", "aggregate_id": "979532d4-b0f7-4cd7-8a3b-ed044a43037a", "event_type": "LOAN_OPENED", "event_time": "2026-10-19T02:01:14.841364", "payload": {"opened_on": "2026-01-01", "principal": "1000.00", "annual_interest_rate": "0.100000", "day_count_basis": 365}}');
+INSERT INTO "queue_messages" VALUES('790f24cb-25d8-464c-a134-d5b25a5c1a58','2026-10-19 02:01:15.258918','domain_events','{"event_id": "503ad1a5-302b-4fdc-98e7-fd6b2dbadf1d", "aggregate_type": "loan_account", "aggregate_id": "979532d4-b0f7-4cd7-8a3b-ed044a43037a", "event_type": "LOAN_INTEREST_ACCRUED", "event_time": "2026-10-19T02:01:14.851173", "payload": {"from_date": "2026-01-01", "to_date": "2026-01-31", "days": 30, "interest": "8.22"}}');
+INSERT INTO "queue_messages" VALUES('79bee00c-6d9e-465c-98b0-899aab675c27','2026-10-19 02:01:15.258923','domain_events','{"event_id": "6468e7a9-3221-48fb-85dd-e62cb7cb3b39", "aggregate_type": "loan_account", "aggregate_id": "979532d4-b0f7-4cd7-8a3b-ed044a43037a", "event_type": "LOAN_REPAYMENT_POSTED", "event_time": "2026-10-19T02:01:14.858294", "payload": {"amount": "100.00", "interest_paid": "8.22", "principal_paid": "91.78", "effective_date": "2026-01-31"}}');
+CREATE TABLE webhook_subscriptions (
+	id VARCHAR NOT NULL, 
+	created_at DATETIME NOT NULL, 
+	target_url VARCHAR NOT NULL, 
+	enabled BOOLEAN NOT NULL, 
+	PRIMARY KEY (id)
+);
+INSERT INTO "webhook_subscriptions" VALUES('115b59c2-42cd-4495-9779-5d47487fc0a2','2026-10-19 02:01:14.758930','http://127.0.0.1:9/hook',1);
+COMMIT;
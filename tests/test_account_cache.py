@@ -0,0 +1,50 @@
+def test_account_reads_are_cached_by_version(monkeypatch):
+    from fastapi.testclient import TestClient
+    from sqlalchemy import update
+
+    from app.db import get_engine
+    from app.main import app
+    from app.models import DepositAccount
+    from app.services.account_cache import account_cache
+    from app.settings import settings
+
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    url = f"/deposit/accounts/{account_id}"
+
+    before = client.get("/cache/accounts").json()
+    assert client.get(url).json()["current_balance"] == "0.00"
+    assert client.get(url).json()["current_balance"] == "0.00"
+    stats = client.get("/cache/accounts").json()
+    assert stats["misses"] == before["misses"] + 1
+    assert stats["hits"] == before["hits"] + 1
+
+    client.post(f"{url}/deposit", json={"amount": "12.00", "effective_date": "2026-01-02"})
+    assert client.get("/cache/accounts").json()["invalidations"] > stats["invalidations"]
+    assert client.get(url).json()["current_balance"] == "12.00"
+
+    # Another worker's write bumps the version without touching this process's cache.
+    with get_engine().begin() as conn:
+        conn.execute(
+            update(DepositAccount)
+            .where(DepositAccount.id == account_id)
+            .values(day_count_basis=360, version=DepositAccount.version + 1)
+        )
+    assert client.get(url).json()["day_count_basis"] == 360
+
+    loan_id = client.post(
+        "/loan/accounts",
+        json={"opened_on": "2026-01-01", "principal": "100.00", "annual_interest_rate": "0.00", "day_count_basis": 365},
+    ).json()["id"]
+    monkeypatch.setattr(settings, "account_cache_size", 1)
+    evictions = client.get("/cache/accounts").json()["evictions"]
+    client.get(f"/loan/accounts/{loan_id}")
+    assert client.get(f"/loan/accounts/{loan_id}").json()["outstanding_principal"] == "100.00"
+    client.get(url)
+    stats = client.get("/cache/accounts").json()
+    assert stats["evictions"] > evictions
+    assert stats["size"] == 1
+    account_cache.clear()
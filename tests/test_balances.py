@@ -0,0 +1,44 @@
+def test_balance_as_of_includes_back_dated_postings():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+
+    def balance(as_of: str) -> dict:
+        r = client.get(f"/deposit/accounts/{account_id}/balance", params={"as_of": as_of})
+        assert r.status_code == 200
+        return r.json()
+
+    client.post(f"/deposit/accounts/{account_id}/deposit", json={"amount": "100.00", "effective_date": "2026-01-05"})
+    client.post(f"/deposit/accounts/{account_id}/withdraw", json={"amount": "30.00", "effective_date": "2026-01-20"})
+
+    assert balance("2026-01-04")["balance"] == "0.00"
+    assert balance("2026-01-10") == {
+        "account_id": account_id,
+        "as_of": "2026-01-10",
+        "balance": "100.00",
+        "snapshot_date": "2026-01-05",
+    }
+    assert balance("2026-01-31")["balance"] == "70.00"
+
+    r = client.post(f"/deposit/accounts/{account_id}/deposit", json={"amount": "25.00", "effective_date": "2026-01-08"})
+    assert r.status_code == 200
+    assert balance("2026-01-07")["balance"] == "100.00"
+    assert balance("2026-01-08")["balance"] == "125.00"
+    assert balance("2026-01-31")["balance"] == "95.00"
+    assert client.get(f"/deposit/accounts/{account_id}").json()["current_balance"] == "95.00"
+
+    loan_id = client.post(
+        "/loan/accounts",
+        json={"opened_on": "2026-01-01", "principal": "500.00", "annual_interest_rate": "0.00", "day_count_basis": 365},
+    ).json()["id"]
+    client.post(f"/loan/accounts/{loan_id}/repay", json={"amount": "200.00", "effective_date": "2026-02-01"})
+    assert client.get(f"/loan/accounts/{loan_id}/balance", params={"as_of": "2026-01-31"}).json()["balance"] == "500.00"
+    assert client.get(f"/loan/accounts/{loan_id}/balance", params={"as_of": "2026-02-01"}).json()["balance"] == "300.00"
+
+    assert client.get("/deposit/accounts/missing/balance", params={"as_of": "2026-01-01"}).status_code == 404
@@ -0,0 +1,61 @@
+import datetime as dt
+from decimal import Decimal
+
+
+def test_concurrent_withdrawals_cannot_both_pass_funds_check():
+    from fastapi.testclient import TestClient
+
+    from app.db import SessionLocal, retry_on_conflict
+    from app.main import app
+    from app.models import DepositAccount
+    from app.services.deposit import post_withdrawal
+
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "100.00", "effective_date": "2026-01-01"},
+    )
+
+    first = SessionLocal()
+    second = SessionLocal()
+    try:
+        stale = second.get(DepositAccount, account_id)
+        assert first.get(DepositAccount, account_id).version == stale.version
+
+        def withdraw(db):
+            return post_withdrawal(
+                db,
+                account_id=account_id,
+                amount=Decimal("80.00"),
+                effective_date=dt.date(2026, 1, 2),
+                idempotency_key=None,
+            )
+
+        retry_on_conflict(first, lambda: withdraw(first))
+
+        attempts = {"n": 0}
+
+        def second_op():
+            attempts["n"] += 1
+            return withdraw(second)
+
+        try:
+            retry_on_conflict(second, second_op)
+        except ValueError as e:
+            assert str(e) == "insufficient_funds"
+        else:
+            raise AssertionError("stale withdrawal was applied")
+        assert attempts["n"] == 2
+        assert stale.current_balance == "20.00"
+    finally:
+        first.close()
+        second.close()
+
+    acct = client.get(f"/deposit/accounts/{account_id}").json()
+    assert acct["current_balance"] == "20.00"
+    ledger = client.get("/ledger", params={"account_id": account_id}).json()
+    assert ledger["total"] == 2
@@ -0,0 +1,71 @@
+import datetime as dt
+import random
+from decimal import Decimal
+
+import pytest
+
+
+def test_contract_engine_matches_decimal_rules_and_runs_in_memory():
+    from app import contracts
+    from app.money import q
+    from app.simulation import run_in_memory
+
+    rng = random.Random(3)
+    for _ in range(2000):
+        balance, rate, days = rng.randint(-10**9, 10**9), rng.randint(0, 250000), rng.randint(1, 400)
+        basis = rng.choice((360, 365))
+        expected = q(Decimal(balance) / 100 * (Decimal(rate) / 10**6) * Decimal(days) / Decimal(basis))
+        assert contracts.money(contracts.interest_cents(balance, rate, days, basis)) == str(expected)
+
+    opened = dt.date(2026, 1, 1)
+    state, outcome = contracts.open_deposit("d-1", opened_on=opened, annual_rate=36500, day_count_basis=365)
+    assert not hasattr(state, "__dict__")
+    assert outcome.events[0].payload["annual_interest_rate"] == "0.036500"
+
+    contracts.deposit(state, 100000, effective_date=opened, ref="k1")
+    with pytest.raises(ValueError, match="insufficient_funds"):
+        contracts.withdraw(state, 100001, effective_date=opened, ref="k2")
+    assert state.balance == 100000
+
+    accrual = contracts.accrue_deposit(state, dt.date(2026, 1, 31))
+    assert accrual.events[0].payload == {"from_date": "2026-01-01", "to_date": "2026-01-31", "days": 30, "interest": "3.00"}
+    assert contracts.accrue_deposit(state, dt.date(2026, 1, 31)) is contracts.NOTHING
+    posting = contracts.month_end(state, dt.date(2026, 1, 31))
+    assert (state.balance, state.accrued) == (100300, 0)
+    assert posting.ledger[0].txn_id == "interest_post:2026-01-31:d-1"
+
+    loan, _ = contracts.open_loan(
+        "l-1", opened_on=opened, principal=50000, annual_rate=73000, day_count_basis=365, ref="k3"
+    )
+    contracts.accrue_loan(loan, dt.date(2026, 1, 11))
+    repayment = contracts.repay(loan, 1000, effective_date=dt.date(2026, 1, 11), ref="k4")
+    allocation = [(r.credit_account, r.amount) for r in repayment.ledger]
+    assert allocation == [("interest_income", 100), ("loan_receivable", 900)]
+    repayment = contracts.repay(loan, 60000, effective_date=dt.date(2026, 1, 11), ref="k5")
+    assert repayment.events[0].payload["principal_paid"] == "491.00"
+    assert (loan.outstanding, loan.accrued) == (0, 0)
+
+    outcomes = []
+    results = run_in_memory(
+        start=dt.date(2026, 1, 25),
+        days=10,
+        deposits=200,
+        loans=20,
+        activity=0.5,
+        seed=1,
+        growth_every=5,
+        sink=outcomes.append,
+    )
+    assert [r["day"] for r in results][-1] == "2026-02-03"
+    assert all(r["operations"] >= 220 for r in results)
+    assert results[-1]["records"]["ledger"] == sum(len(o.ledger) for o in outcomes)
+
+    net = {"customer_deposits": 0, "loan_receivable": 0}
+    for record in (r for o in outcomes for r in o.ledger):
+        if record.credit_account in net:
+            net[record.credit_account] += record.amount
+        if record.debit_account in net:
+            net[record.debit_account] -= record.amount
+    totals = results[-1]["totals"]
+    assert contracts.money(net["customer_deposits"]) == totals["deposit_balances"]
+    assert contracts.money(-net["loan_receivable"]) == totals["loan_outstanding"]
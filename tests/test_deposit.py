@@ -1,12 +1,8 @@
 import os
-import uuid
 import datetime as dt
 
 
-def test_deposit_idempotency_and_interest_flow(tmp_path, monkeypatch):
-    db_path = tmp_path / f"fintech_{uuid.uuid4().hex}.db"
-    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
-
+def test_deposit_idempotency_and_interest_flow():
     from fastapi.testclient import TestClient
 
     from app.main import app
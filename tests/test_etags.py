@@ -0,0 +1,49 @@
+def test_account_and_list_endpoints_honour_if_none_match():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+
+    first = client.get(f"/deposit/accounts/{account_id}")
+    etag = first.headers["ETag"]
+    cached = client.get(f"/deposit/accounts/{account_id}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    listing = client.get("/deposit/accounts", params={"limit": 5})
+    list_etag = listing.headers["ETag"]
+    assert client.get("/deposit/accounts", params={"limit": 5}, headers={"If-None-Match": list_etag}).status_code == 304
+    assert client.get("/deposit/accounts", params={"limit": 6}, headers={"If-None-Match": list_etag}).status_code == 200
+
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "5.00", "effective_date": "2026-01-02"},
+    )
+    changed = client.get(f"/deposit/accounts/{account_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["current_balance"] == "5.00"
+    assert client.get("/deposit/accounts", params={"limit": 5}, headers={"If-None-Match": list_etag}).status_code == 200
+
+    client.post(f"/deposit/accounts/{account_id}/write-behind", json={"enabled": True})
+    etag = client.get(f"/deposit/accounts/{account_id}").headers["ETag"]
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "1.00", "effective_date": "2026-01-03"},
+    )
+    journaled = client.get(f"/deposit/accounts/{account_id}", headers={"If-None-Match": etag})
+    assert journaled.status_code == 200
+    assert journaled.json()["current_balance"] == "6.00"
+    client.post(f"/deposit/accounts/{account_id}/write-behind", json={"enabled": False})
+
+    loan_id = client.post(
+        "/loan/accounts",
+        json={"opened_on": "2026-01-01", "principal": "100.00", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    loan_etag = client.get(f"/loan/accounts/{loan_id}").headers["ETag"]
+    assert client.get(f"/loan/accounts/{loan_id}", headers={"If-None-Match": loan_etag}).status_code == 304
+    assert client.get("/loan/accounts/missing", headers={"If-None-Match": loan_etag}).status_code == 404
@@ -0,0 +1,113 @@
+def test_events_carry_per_aggregate_sequence_and_delta_query():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    for amount in ("1.00", "2.00", "3.00"):
+        client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": amount, "effective_date": "2026-01-02"},
+        )
+
+    history = client.get("/events", params={"aggregate_id": account_id}).json()
+    assert sorted(e["sequence"] for e in history["items"]) == [1, 2, 3, 4]
+
+    delta = client.get("/events", params={"aggregate_id": account_id, "after_sequence": 2}).json()
+    assert [e["sequence"] for e in delta["items"]] == [3, 4]
+    assert [e["payload"]["amount"] for e in delta["items"]] == ["2.00", "3.00"]
+
+    assert client.get("/events", params={"after_sequence": 2}).status_code == 400
+
+
+def test_event_stream_resumes_and_pushes_committed_events():
+    import asyncio
+    import json
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services.stream import Subscription, notifier
+
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "1.00", "effective_date": "2026-01-02", "idempotency_key": "stream-dep-1"},
+    )
+
+    loop = asyncio.new_event_loop()
+    sub = Subscription(loop, after_seq=0, aggregate_id=account_id)
+
+    def next_frames(n):
+        async def collect():
+            return [await asyncio.wait_for(sub.queue.get(), timeout=5) for _ in range(n)]
+
+        frames = loop.run_until_complete(collect())
+        return [json.loads(f.decode().split("data: ", 1)[1]) for f in frames]
+
+    try:
+        notifier.subscribe(sub)
+        backlog = next_frames(2)
+        assert [e["event_type"] for e in backlog] == ["DEPOSIT_ACCOUNT_OPENED", "DEPOSIT_POSTED"]
+        assert [e["idempotency_key"] for e in backlog] == [None, "stream-dep-1"]
+
+        client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "2.00", "effective_date": "2026-01-03"},
+        )
+        live = next_frames(1)
+        assert live[0]["payload"]["amount"] == "2.00"
+        assert live[0]["sequence"] == 3
+    finally:
+        notifier.unsubscribe(sub)
+        loop.close()
+
+
+def test_event_stream_logs_failures_and_disconnects_after_repeated_ones(monkeypatch, caplog):
+    import asyncio
+
+    from fastapi.testclient import TestClient
+
+    from app import routes
+    from app.main import app
+    from app.services import stream
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "event_stream_poll_interval_seconds", 0.01)
+    monkeypatch.setattr(settings, "event_stream_max_failures", 3)
+    notifier = stream.EventNotifier()
+    monkeypatch.setattr(routes, "notifier", notifier)
+
+    def broken():
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(notifier, "poll_once", broken)
+
+    loop = asyncio.new_event_loop()
+    sub = stream.Subscription(loop, after_seq=0)
+    try:
+        with caplog.at_level("WARNING", logger="app.services.stream"):
+            notifier.subscribe(sub)
+            closed = loop.run_until_complete(asyncio.wait_for(sub.queue.get(), timeout=5))
+        assert closed is None
+        assert sub.closed
+
+        stats = TestClient(app).get("/events/stream/stats").json()
+        assert stats["subscribers"] == 0
+        assert stats["failures"] >= 3
+        assert stats["last_error"] == "RuntimeError: database is locked"
+
+        records = [r for r in caplog.records if r.name == "app.services.stream"]
+        assert records[0].exc_info is not None
+        assert any("disconnected 1 subscribers" in r.getMessage() for r in records)
+    finally:
+        notifier.shutdown()
+        loop.close()
@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_group_commit_batches_postings_and_isolates_failures(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services.group_commit import group_commit
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "group_commit_enabled", True)
+    monkeypatch.setattr(settings, "group_commit_window_ms", 50.0)
+    batch_sizes: list[int] = []
+    apply = group_commit.apply
+    monkeypatch.setattr(group_commit, "apply", lambda batch: (batch_sizes.append(len(batch)), apply(batch)))
+
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+
+    def post(i: int):
+        if i == 0:
+            return client.post(
+                f"/deposit/accounts/{account_id}/withdraw",
+                json={"amount": "1000.00", "effective_date": "2026-01-02"},
+            )
+        return client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "5.00", "effective_date": "2026-01-02", "idempotency_key": f"gc-{account_id}-{i % 10}"},
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            responses = list(pool.map(post, range(21)))
+    finally:
+        group_commit.shutdown()
+
+    assert responses[0].status_code == 400
+    assert responses[0].json()["detail"] == "insufficient_funds"
+    assert all(r.status_code == 200 for r in responses[1:])
+    assert max(batch_sizes) > 1
+
+    assert client.get(f"/deposit/accounts/{account_id}").json()["current_balance"] == "50.00"
+    assert client.get("/ledger", params={"account_id": account_id}).json()["total"] == 10
+    assert client.post("/integrity/verify", json={}).json()["ok"] is True
+
+
+def test_group_commit_retries_only_version_conflicts(monkeypatch):
+    from fastapi.testclient import TestClient
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import Session
+    from sqlalchemy.orm.exc import StaleDataError
+
+    from app.main import app
+    from app.services.group_commit import group_commit
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "group_commit_enabled", True)
+    client = TestClient(app, raise_server_exceptions=False)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+
+    calls = {"flush": 0}
+
+    def stale(self):
+        calls["flush"] += 1
+        raise StaleDataError("deposit_accounts version changed")
+
+    def locked(self):
+        raise OperationalError("COMMIT", {}, Exception("database is locked"))
+
+    try:
+        with monkeypatch.context() as m:
+            m.setattr(Session, "flush", stale)
+            r = client.post(
+                f"/deposit/accounts/{account_id}/deposit",
+                json={"amount": "5.00", "effective_date": "2026-01-02"},
+            )
+        assert r.status_code == 409
+        assert r.json()["detail"] == "concurrent_update"
+        assert calls["flush"] == settings.max_conflict_retries + 1
+
+        with monkeypatch.context() as m:
+            m.setattr(Session, "commit", locked)
+            r = client.post(
+                f"/deposit/accounts/{account_id}/deposit",
+                json={"amount": "5.00", "effective_date": "2026-01-02"},
+            )
+        assert r.status_code == 500
+
+        with monkeypatch.context() as m:
+            m.setattr(Session, "flush", locked)
+            r = client.post(
+                f"/deposit/accounts/{account_id}/deposit",
+                json={"amount": "5.00", "effective_date": "2026-01-02"},
+            )
+        assert r.status_code == 500
+
+        r = client.post(
+            f"/deposit/accounts/{account_id}/withdraw",
+            json={"amount": "1.00", "effective_date": "2026-01-02"},
+        )
+        assert r.status_code == 400
+    finally:
+        group_commit.shutdown()
+
+    assert client.get(f"/deposit/accounts/{account_id}").json()["current_balance"] == "0.00"
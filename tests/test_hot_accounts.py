@@ -0,0 +1,98 @@
+import time
+
+
+def test_write_behind_deposits_are_journaled_then_flushed():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+
+    r = client.post(f"/deposit/accounts/{account_id}/write-behind", json={"enabled": True})
+    assert r.status_code == 200
+
+    for i in range(3):
+        r = client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "10.00", "effective_date": "2026-01-02", "idempotency_key": f"hot-{account_id}-{i}"},
+        )
+        assert r.status_code == 200
+        assert r.json()["current_balance"] == f"{10 * (i + 1)}.00"
+
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "10.00", "effective_date": "2026-01-02", "idempotency_key": f"hot-{account_id}-0"},
+    )
+
+    assert client.get(f"/deposit/accounts/{account_id}").json()["current_balance"] == "30.00"
+    assert client.get("/ledger", params={"account_id": account_id}).json()["total"] == 0
+
+    r = client.post("/deposit/hot-accounts/flush")
+    assert r.status_code == 200
+    assert r.json()["entries"] >= 3
+
+    assert client.get(f"/deposit/accounts/{account_id}").json()["current_balance"] == "30.00"
+    assert client.get("/ledger", params={"account_id": account_id}).json()["total"] == 3
+    events = client.get("/events", params={"aggregate_id": account_id, "event_type": "DEPOSIT_POSTED"}).json()
+    assert events["total"] == 3
+
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "5.00", "effective_date": "2026-01-03"},
+    )
+    r = client.post(
+        f"/deposit/accounts/{account_id}/withdraw",
+        json={"amount": "35.00", "effective_date": "2026-01-03"},
+    )
+    assert r.status_code == 200
+    assert r.json()["current_balance"] == "0.00"
+
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "7.00", "effective_date": "2026-01-04"},
+    )
+    r = client.post(f"/deposit/accounts/{account_id}/write-behind", json={"enabled": False})
+    assert r.json()["current_balance"] == "7.00"
+    assert client.get("/ledger", params={"account_id": account_id}).json()["total"] == 6
+
+
+def test_flusher_logs_failures_and_counts_them(monkeypatch, caplog):
+    from fastapi.testclient import TestClient
+
+    from app import jobs, routes
+    from app.main import app
+    from app.settings import settings
+
+    def broken(db, *, max_accounts):
+        raise RuntimeError("journal unavailable")
+
+    monkeypatch.setattr(settings, "hot_account_flush_interval_ms", 10)
+    monkeypatch.setattr(settings, "background_error_log_interval_seconds", 60.0)
+    monkeypatch.setattr(jobs.deposit_service, "flush_hot_accounts", broken)
+    flusher = jobs.HotAccountFlusher()
+
+    with caplog.at_level("ERROR", logger="app.jobs"):
+        flusher.start()
+        try:
+            for _ in range(100):
+                if flusher.failures.failures >= 3:
+                    break
+                time.sleep(0.02)
+        finally:
+            flusher.shutdown()
+
+    logged = [r for r in caplog.records if r.name == "app.jobs"]
+    assert len(logged) == 1
+    assert logged[0].exc_info is not None
+
+    stats = flusher.stats()
+    assert stats["failures"] >= 3
+    assert stats["consecutive_failures"] == stats["failures"]
+    assert stats["last_error"] == "RuntimeError: journal unavailable"
+
+    monkeypatch.setattr(routes, "hot_account_flusher", flusher)
+    assert TestClient(app).get("/deposit/hot-accounts/flusher").json()["failures"] == stats["failures"]
@@ -0,0 +1,95 @@
+import datetime as dt
+import sqlite3
+import uuid
+from pathlib import Path
+
+from sqlalchemy import create_engine, select
+
+
+BASELINE_DUMP = Path(__file__).parent / "fixtures" / "baseline.sql"
+
+
+def test_ids_are_time_ordered_and_legacy_ids_are_rekeyed(tmp_path):
+    from fastapi.testclient import TestClient
+
+    from app.ids import is_time_ordered, new_id
+    from app.main import app
+    from app.migrations import upgrade
+    from app.models import DepositAccount, DomainEvent, OutboxMessage, QueueMessage
+
+    ids = [new_id() for _ in range(5000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(is_time_ordered(i) and uuid.UUID(i).version == 7 for i in ids)
+
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    assert is_time_ordered(account_id)
+    for i in range(3):
+        client.post(f"/deposit/accounts/{account_id}/deposit", json={"amount": "1.00", "effective_date": "2026-01-02"})
+
+    page = client.get("/outbox/messages", params={"aggregate_id": account_id, "limit": 2}).json()["items"]
+    rest = client.get(
+        "/outbox/messages",
+        params={"aggregate_id": account_id, "before_id": page[-1]["id"]},
+    ).json()["items"]
+    assert [m["id"] for m in page + rest] == sorted((m["id"] for m in page + rest), reverse=True)
+    assert len(page + rest) == 4
+
+    events = client.get("/events", params={"aggregate_id": account_id, "limit": 2}).json()["items"]
+    older = client.get("/events", params={"aggregate_id": account_id, "before_seq": events[-1]["chain_seq"]}).json()
+    assert [e["sequence"] for e in events + older["items"]] == [4, 3, 2, 1]
+
+    # A real legacy database: dumped from one the baseline app wrote, with uuid4 ids everywhere.
+    path = tmp_path / "legacy.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_DUMP.read_text())
+        legacy = {
+            table: dict(conn.execute(f"SELECT id, created_at FROM {table}").fetchall())
+            for table in ("outbox_messages", "queue_messages", "deposit_accounts", "domain_events")
+        }
+    assert not any(is_time_ordered(i) for ids in legacy.values() for i in ids)
+
+    engine = create_engine(f"sqlite:///{path}")
+    upgrade(engine)
+    with engine.connect() as conn:
+        for model in (OutboxMessage, QueueMessage):
+            rows = conn.execute(select(model.id, model.created_at).order_by(model.id)).all()
+            assert len(rows) == len(legacy[model.__tablename__])
+            assert all(is_time_ordered(row.id) for row in rows)
+            assert [row.created_at for row in rows] == sorted(row.created_at for row in rows)
+        assert {row.id for row in conn.execute(select(DepositAccount.id))} == set(legacy["deposit_accounts"])
+        assert {row.id for row in conn.execute(select(DomainEvent.id))} == set(legacy["domain_events"])
+        orphans = select(OutboxMessage.id).where(OutboxMessage.event_id.not_in(select(DomainEvent.id)))
+        assert conn.execute(orphans).first() is None
+
+def test_account_lists_page_by_created_at_and_id():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.time import use_clock
+
+    client = TestClient(app)
+    # Every account gets the same created_at, so the order comes down to the id tie-break.
+    created = dt.datetime(2026, 1, 1, tzinfo=dt.UTC)
+    with use_clock(lambda: created):
+        deposits = [
+            client.post("/deposit/accounts", json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"}).json()["id"]
+            for _ in range(3)
+        ]
+        loans = [
+            client.post(
+                "/loan/accounts",
+                json={"opened_on": "2026-01-01", "principal": "100.00", "annual_interest_rate": "0.00"},
+            ).json()["id"]
+            for _ in range(3)
+        ]
+
+    for path, ids in (("/deposit/accounts", deposits), ("/loan/accounts", loans)):
+        first = client.get(path, params={"limit": 2}).json()["items"]
+        rest = client.get(path, params={"limit": 2, "before_id": first[-1]["id"]}).json()["items"]
+        assert [a["id"] for a in first + rest] == sorted(ids, reverse=True)
+        assert client.get(path, params={"before_id": "missing"}).status_code == 400
@@ -0,0 +1,118 @@
+def test_hash_chain_verification_is_incremental_and_detects_tampering():
+    from fastapi.testclient import TestClient
+
+    from app.db import SessionLocal
+    from app.main import app
+    from app.models import LedgerEntry
+
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "10.00", "effective_date": "2026-01-02"},
+    )
+
+    first = client.post("/integrity/verify", json={}).json()
+    assert first["ok"] is True
+    assert {c["chain"] for c in first["chains"]} == {"ledger_entries", "domain_events"}
+
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "5.00", "effective_date": "2026-01-03"},
+    )
+    second = client.post("/integrity/verify", json={"chains": ["ledger_entries"]}).json()
+    assert second["ok"] is True
+    assert second["chains"][0]["verified"] == 1
+
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "1.00", "effective_date": "2026-01-04"},
+    )
+    with SessionLocal() as db:
+        entry = (
+            db.query(LedgerEntry)
+            .filter(LedgerEntry.account_id == account_id)
+            .order_by(LedgerEntry.chain_seq.desc())
+            .first()
+        )
+        entry.amount = "100.00"
+        db.commit()
+
+    third = client.post("/integrity/verify", json={"chains": ["ledger_entries"]}).json()
+    assert third["ok"] is False
+    assert third["chains"][0]["failure"]["error"] == "chain_hash_mismatch"
+
+    assert client.post("/integrity/verify", json={"chains": ["accounts"]}).status_code == 400
+
+    with SessionLocal() as db:
+        db.get(LedgerEntry, third["chains"][0]["failure"]["id"]).amount = "1.00"
+        db.commit()
+    assert client.post("/integrity/verify", json={"chains": ["ledger_entries"]}).json()["ok"] is True
+
+
+def test_writes_on_different_accounts_do_not_conflict_on_the_chain(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "max_conflict_retries", 0)
+    client = TestClient(app)
+
+    def open_account(_):
+        return client.post("/deposit/accounts", json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"})
+
+    def deposit(account_id):
+        return client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "1.00", "effective_date": "2026-01-02"},
+        )
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        opened = list(pool.map(open_account, range(32)))
+        assert [r.status_code for r in opened] == [200] * 32
+        account_ids = [r.json()["id"] for r in opened]
+        # Each round touches every account once; only same-account writes may still conflict.
+        deposits = [r for _ in range(3) for r in pool.map(deposit, account_ids)]
+    assert [r.status_code for r in deposits] == [200] * len(deposits)
+
+    result = client.post("/integrity/verify", json={}).json()
+    assert result["ok"] is True
+    assert {c["chain"]: c["verified"] for c in result["chains"]} == {"ledger_entries": 96, "domain_events": 128}
+
+
+def test_verify_treats_archived_events_as_checkpointed(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path / "archive"))
+    client = TestClient(app)
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    for day in (2, 3):
+        client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "1.00", "effective_date": f"2026-01-0{day}"},
+        )
+    client.post("/outbox/dispatch", json={"max_messages": 500})
+
+    archived = client.post("/retention/run", json={"retention_days": 0, "tables": ["outbox_messages"]}).json()
+    assert archived["archived"]["outbox_messages"] >= 3
+    assert client.post("/retention/run", json={"retention_days": 0}).json()["archived"]["domain_events"] >= 3
+
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "1.00", "effective_date": "2026-01-04"},
+    )
+    result = client.post("/integrity/verify", json={"chains": ["domain_events"]}).json()
+    assert result["ok"] is True
+    assert result["chains"][0]["verified"] == 1
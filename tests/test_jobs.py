@@ -0,0 +1,152 @@
+import datetime as dt
+import time
+
+
+def _wait(client, job_id):
+    for _ in range(100):
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("SUCCEEDED", "FAILED", "CANCELLED"):
+            return job
+        time.sleep(0.05)
+    return job
+
+
+def test_job_submit_poll_cancel_and_resume():
+    from fastapi.testclient import TestClient
+
+    from app.db import SessionLocal
+    from app.jobs import JOB_HANDLERS, job_handler, runner
+    from app.main import app
+    from app.models import Job
+
+    client = TestClient(app)
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.10"},
+    ).json()["id"]
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "365.00", "effective_date": "2026-01-01"},
+    )
+
+    job = client.post(
+        "/jobs",
+        json={"kind": "bulk_accrual", "params": {"as_of_date": "2026-01-11", "account_types": ["deposit_account"]}},
+    ).json()
+    job = _wait(client, job["id"])
+    assert job["status"] == "SUCCEEDED"
+    assert job["processed"] == job["total"]
+    assert client.get(f"/deposit/accounts/{account_id}").json()["accrued_interest"] == "1.00"
+
+    assert client.post("/jobs", json={"kind": "nope"}).status_code == 400
+
+    seen: list[dict | None] = []
+
+    @job_handler("test_resumable")
+    def _resumable(ctx, params):
+        seen.append(ctx.checkpoint)
+        start = (ctx.checkpoint or {}).get("step", 0)
+        for step in range(start, params["steps"]):
+            ctx.report(step + 1, total=params["steps"], checkpoint={"step": step + 1})
+            time.sleep(params.get("sleep", 0))
+        return {"steps": params["steps"]}
+
+    try:
+        with SessionLocal() as db:
+            stale = Job(
+                kind="test_resumable",
+                status="RUNNING",
+                params={"steps": 3},
+                processed=1,
+                checkpoint={"step": 1},
+                cancel_requested=False,
+                updated_at=dt.datetime(2000, 1, 1, tzinfo=dt.UTC),
+            )
+            db.add(stale)
+            db.commit()
+            stale_id = stale.id
+
+        runner.start()
+        resumed = _wait(client, stale_id)
+        assert resumed["status"] == "SUCCEEDED"
+        assert seen[0] == {"step": 1}
+        assert resumed["processed"] == 3
+
+        slow = client.post("/jobs", json={"kind": "test_resumable", "params": {"steps": 200, "sleep": 0.01}}).json()
+        time.sleep(0.1)
+        client.post(f"/jobs/{slow['id']}/cancel")
+        cancelled = _wait(client, slow["id"])
+        assert cancelled["status"] == "CANCELLED"
+        assert 0 < cancelled["processed"] < 200
+    finally:
+        JOB_HANDLERS.pop("test_resumable", None)
+
+
+def test_restart_does_not_reclaim_a_job_that_is_still_heartbeating(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.jobs import JOB_HANDLERS, job_handler, runner
+    from app.main import app
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "job_stale_seconds", 1)
+    monkeypatch.setattr(settings, "job_heartbeat_seconds", 0.05)
+    client = TestClient(app)
+    runs: list[str] = []
+
+    @job_handler("test_quiet")
+    def _quiet(ctx, params):
+        # Never reports progress, so only the heartbeat keeps the job fresh.
+        runs.append(ctx.job_id)
+        time.sleep(1.5)
+        return {}
+
+    try:
+        job = client.post("/jobs", json={"kind": "test_quiet", "params": {}}).json()
+        time.sleep(1.2)
+        runner.start()
+        assert _wait(client, job["id"])["status"] == "SUCCEEDED"
+        assert runs == [job["id"]]
+    finally:
+        JOB_HANDLERS.pop("test_quiet", None)
+
+
+def test_retention_and_verify_report_progress_per_batch(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.db import SessionLocal
+    from app.main import app
+    from app.services.integrity import verify_chains
+    from app.services.retention import run_retention
+    from app.settings import settings
+    from app.time import utcnow
+
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path / "archive"))
+    client = TestClient(app)
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.05"},
+    ).json()["id"]
+    for day in (2, 3, 4):
+        client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "10.00", "effective_date": f"2026-01-0{day}"},
+        )
+
+    verified: list[int] = []
+    with SessionLocal() as db:
+        results = verify_chains(db, chains=["ledger_entries"], chunk_size=1, progress=verified.append)
+    assert len(verified) > 1
+    assert verified == sorted(verified)
+    assert verified[-1] == results[0]["verified"]
+
+    client.post("/outbox/dispatch", json={"max_messages": 500})
+    archived_so_far: list[int] = []
+    with SessionLocal() as db:
+        archived = run_retention(
+            db, older_than=utcnow(), batch_size=1, tables=["outbox_messages"], progress=archived_so_far.append
+        )
+    assert len(archived_so_far) > 1
+    assert archived_so_far[-1] == archived["outbox_messages"]
@@ -1,10 +1,4 @@
-import uuid
-
-
-def test_loan_open_accrue_and_repay(tmp_path, monkeypatch):
-    db_path = tmp_path / f"fintech_{uuid.uuid4().hex}.db"
-    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
-
+def test_loan_open_accrue_and_repay():
     from fastapi.testclient import TestClient
 
     from app.main import app
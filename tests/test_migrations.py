@@ -0,0 +1,113 @@
+import sqlite3
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+
+BASELINE_DUMP = Path(__file__).parent / "fixtures" / "baseline.sql"
+
+
+def _schema(engine) -> dict[str, tuple[set, set]]:
+    inspector = inspect(engine)
+    return {
+        table: (
+            {c["name"] for c in inspector.get_columns(table)},
+            {i["name"] for i in inspector.get_indexes(table)},
+        )
+        for table in inspector.get_table_names()
+        if not table.endswith("schema_version")
+    }
+
+
+def test_migration_runner_versions_schema(tmp_path):
+    from app.migrations import MIGRATIONS, SchemaOutOfDate, check_schema, current_version, upgrade
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    with pytest.raises(SchemaOutOfDate):
+        check_schema(engine)
+
+    applied = upgrade(engine)
+    assert applied["database"] == [number for number, _, _ in MIGRATIONS]
+    assert applied["read_model"]
+    assert {"deposit_accounts", "outbox_messages", "deposit_account_summaries"} <= set(inspect(engine).get_table_names())
+
+    check_schema(engine)
+    assert upgrade(engine) == {"database": [], "read_model": []}
+    with engine.connect() as conn:
+        assert current_version(conn) == MIGRATIONS[-1][0]
+
+
+def test_app_startup_only_checks_schema_version():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        assert client.get("/health").json() == {"status": "ok"}
+
+
+def test_upgraded_schema_matches_the_models(tmp_path):
+    from app.migrations import upgrade
+    from app.models import Base, ReadModelBase
+
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    upgrade(migrated)
+    declared = create_engine(f"sqlite:///{tmp_path / 'declared.db'}")
+    Base.metadata.create_all(declared)
+    ReadModelBase.metadata.create_all(declared)
+    assert _schema(migrated) == _schema(declared)
+
+
+def test_upgrade_from_a_database_created_by_the_baseline_app(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import db
+    from app.main import app
+    from app.migrations import MIGRATIONS, upgrade
+    from app.models import Base, ReadModelBase
+    from app.settings import settings
+
+    # The dump was taken from a database the baseline commit's app wrote through its own routes.
+    path = tmp_path / "baseline.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript(BASELINE_DUMP.read_text())
+
+    engine = create_engine(f"sqlite:///{path}")
+    assert upgrade(engine)["database"] == [number for number, _, _ in MIGRATIONS]
+    declared = create_engine(f"sqlite:///{tmp_path / 'declared.db'}")
+    Base.metadata.create_all(declared)
+    ReadModelBase.metadata.create_all(declared)
+    assert _schema(engine) == _schema(declared)
+
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{path}")
+    monkeypatch.setattr(db, "_engine", engine)
+    client = TestClient(app)
+
+    deposit = client.get("/deposit/accounts").json()["items"][0]
+    assert deposit["current_balance"] == "120.49"
+    loan = client.get("/loan/accounts").json()["items"][0]
+    assert loan["outstanding_principal"] == "908.22"
+
+    events = client.get("/events", params={"aggregate_id": deposit["id"], "limit": 100}).json()["items"]
+    assert [e["sequence"] for e in reversed(events)] == list(range(1, len(events) + 1))
+    assert client.post("/integrity/verify", json={}).json()["ok"] is True
+
+    retried = client.post(
+        f"/deposit/accounts/{deposit['id']}/deposit",
+        json={"amount": "100.00", "effective_date": "2026-01-02", "idempotency_key": "dep-0"},
+    )
+    assert retried.json()["current_balance"] == "120.49"
+    fresh = client.post(
+        f"/deposit/accounts/{deposit['id']}/deposit",
+        json={"amount": "1.00", "effective_date": "2026-02-01"},
+    )
+    assert fresh.json()["current_balance"] == "121.49"
+
+    polled = client.get("/queue/domain_events/poll", params={"group": "audit", "max": 100}).json()
+    legacy_events = [m["envelope"]["event_id"] for m in polled["messages"]]
+    assert [m["offset"] for m in polled["messages"]] == list(range(len(legacy_events)))
+    assert len(legacy_events) == 9
+    assert client.get("/outbox/messages", params={"limit": 500}).json()["total"] >= 18
+    assert client.post("/integrity/verify", json={}).json()["ok"] is True
@@ -0,0 +1,44 @@
+import time
+
+
+def test_outbox_replay_filters_dry_run_and_background():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.05"},
+    ).json()["id"]
+    for _ in range(3):
+        client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "5.00", "effective_date": "2026-01-02"},
+        )
+    client.post("/outbox/dispatch", json={"max_messages": 500})
+
+    filters = {"aggregate_id": account_id, "event_type": "DEPOSIT_POSTED"}
+    dry = client.post("/outbox/replay", json={**filters, "dry_run": True}).json()
+    assert dry == {"matched": 3}
+    assert client.get("/outbox/messages", params={"aggregate_id": account_id, "status": "PENDING"}).json()["total"] == 0
+
+    future = client.post("/outbox/replay", json={**filters, "created_after": "2999-01-01T00:00:00Z", "dry_run": True})
+    assert future.json() == {"matched": 0}
+
+    sync = client.post("/outbox/replay", json={**filters, "chunk_size": 2}).json()
+    assert sync == {"updated": 3}
+    assert client.get("/outbox/messages", params={"aggregate_id": account_id, "status": "PENDING"}).json()["total"] == 3
+
+    job = client.post("/outbox/replay", json={"aggregate_id": account_id, "background": True, "chunk_size": 1}).json()
+    assert job["kind"] == "outbox_replay"
+    for _ in range(50):
+        progress = client.get(f"/jobs/{job['id']}").json()
+        if progress["status"] in ("SUCCEEDED", "FAILED"):
+            break
+        time.sleep(0.05)
+    assert progress["status"] == "SUCCEEDED"
+    assert progress["total"] == 4
+    assert progress["processed"] == 4
+    assert progress["result"] == {"updated": 4}
@@ -0,0 +1,142 @@
+import uuid
+
+
+def test_queue_consumer_group_poll_and_ack(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.settings import settings
+
+    client = TestClient(app)
+    group = f"consumer-{uuid.uuid4().hex}"
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.05"},
+    ).json()["id"]
+    client.post("/outbox/dispatch", json={"max_messages": 500})
+
+    from app.schemas import QueuePollResponse
+
+    polled = client.get("/queue/domain_events/poll", params={"group": group, "max": 1000})
+    assert QueuePollResponse.model_validate_json(polled.content).group == group
+    first = polled.json()
+    assert first["committed_offset"] == -1
+    opened = [m for m in first["messages"] if m["envelope"]["aggregate_id"] == account_id]
+    assert opened[0]["envelope"]["event_type"] == "DEPOSIT_ACCOUNT_OPENED"
+
+    ack = client.post("/queue/domain_events/ack", json={"group": group, "offset": first["next_offset"] - 1})
+    assert ack.status_code == 200
+    assert ack.json()["committed_offset"] == first["next_offset"] - 1
+
+    empty = client.get("/queue/domain_events/poll", params={"group": group, "wait": 0.3}).json()
+    assert empty["messages"] == []
+
+    monkeypatch.setattr(settings, "queue_payload_mode", "reference")
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "42.00", "effective_date": "2026-01-02"},
+    )
+    client.post("/outbox/dispatch", json={"max_messages": 500})
+
+    from app.db import SessionLocal
+    from app.models import QueueMessage
+
+    with SessionLocal() as db:
+        latest = db.query(QueueMessage).order_by(QueueMessage.offset.desc()).first()
+        assert latest.envelope is None
+
+    second = client.get("/queue/domain_events/poll", params={"group": group, "max": 10}).json()
+    assert [m["envelope"]["event_type"] for m in second["messages"]] == ["DEPOSIT_POSTED"]
+    assert second["messages"][0]["envelope"]["payload"]["amount"] == "42.00"
+
+    beyond = client.post("/queue/domain_events/ack", json={"group": group, "offset": second["next_offset"] + 5})
+    assert beyond.status_code == 400
+
+    groups = client.get("/queue/domain_events/groups").json()
+    assert any(g["group"] == group and g["lag"] == 1 for g in groups["items"])
+
+
+def test_long_polls_wait_off_the_threadpool_and_wake_on_publish(monkeypatch):
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "queue_poll_interval_seconds", 30.0)
+    group = f"waiter-{uuid.uuid4().hex}"
+
+    with TestClient(app) as client:
+        account_id = client.post(
+            "/deposit/accounts",
+            json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+        ).json()["id"]
+        client.post("/outbox/dispatch", json={"max_messages": 500})
+        head = client.get("/queue/domain_events/groups").json()["head_offset"]
+        client.post("/queue/domain_events/ack", json={"group": group, "offset": head})
+
+        def long_poll(_):
+            return client.get("/queue/domain_events/poll", params={"group": group, "wait": 20}).json()
+
+        started = time.monotonic()
+        # More waiters than the default 40-thread pool that serves sync routes.
+        with ThreadPoolExecutor(max_workers=60) as pool:
+            polls = [pool.submit(long_poll, i) for i in range(50)]
+            time.sleep(0.5)
+            deposit = client.post(
+                f"/deposit/accounts/{account_id}/deposit",
+                json={"amount": "3.00", "effective_date": "2026-01-02"},
+            )
+            assert deposit.status_code == 200
+            client.post("/outbox/dispatch", json={"max_messages": 500})
+            results = [p.result() for p in polls]
+
+    assert time.monotonic() - started < 10
+    assert all(r["messages"][0]["envelope"]["event_type"] == "DEPOSIT_POSTED" for r in results)
+
+
+def test_concurrent_dispatchers_get_distinct_offsets():
+    import threading
+
+    from fastapi.testclient import TestClient
+
+    from app.db import SessionLocal
+    from app.main import app
+    from app.models import DomainEvent, QueueMessage
+    from app.services import queue as queue_service
+
+    client = TestClient(app)
+    for _ in range(4):
+        client.post("/deposit/accounts", json={"opened_on": "2026-01-01", "annual_interest_rate": "0.05"})
+    with SessionLocal() as db:
+        event_ids = [event_id for (event_id,) in db.query(DomainEvent.id).order_by(DomainEvent.id).all()]
+
+    start = threading.Barrier(len(event_ids))
+    errors: list[Exception] = []
+
+    def dispatch(event_id: str) -> None:
+        try:
+            with SessionLocal() as db:
+                offsets = queue_service.OffsetAllocator(db)
+                event = db.get(DomainEvent, event_id)
+                start.wait()
+                queue_service.publish(db, topic="concurrent", event=event, offsets=offsets)
+                db.commit()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=dispatch, args=(event_id,)) for event_id in event_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with SessionLocal() as db:
+        published = db.query(QueueMessage).filter(QueueMessage.topic == "concurrent").all()
+        assert sorted(m.offset for m in published) == list(range(len(event_ids)))
+        assert sorted(m.event_id for m in published) == event_ids
+        assert queue_service.head_offset(db, topic="concurrent") == len(event_ids) - 1
@@ -0,0 +1,54 @@
+def test_read_model_projects_account_summaries():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+
+    open_resp = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.10", "day_count_basis": 365},
+    )
+    account_id = open_resp.json()["id"]
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "150.00", "effective_date": "2026-01-01"},
+    )
+    client.post(
+        f"/deposit/accounts/{account_id}/withdraw",
+        json={"amount": "20.00", "effective_date": "2026-01-02"},
+    )
+    client.post(f"/deposit/accounts/{account_id}/accrue", json={"as_of_date": "2026-01-11"})
+
+    loan_resp = client.post(
+        "/loan/accounts",
+        json={"opened_on": "2026-01-01", "principal": "500.00", "annual_interest_rate": "0.12"},
+    )
+    loan_id = loan_resp.json()["id"]
+    client.post(
+        f"/loan/accounts/{loan_id}/repay",
+        json={"amount": "100.00", "effective_date": "2026-01-15"},
+    )
+
+    stale = client.get(f"/deposit/accounts/{account_id}", params={"read_model": True})
+    assert stale.status_code == 404
+
+    assert client.post("/outbox/dispatch", json={"max_messages": 500}).status_code == 200
+    while True:
+        run = client.post("/read-model/project", json={"max_messages": 500}).json()
+        if run["caught_up"]:
+            break
+
+    primary = client.get(f"/deposit/accounts/{account_id}").json()
+    projected = client.get(f"/deposit/accounts/{account_id}", params={"read_model": True})
+    assert projected.status_code == 200
+    assert projected.json() == primary
+    assert projected.json()["current_balance"] == "130.00"
+    assert float(projected.headers["X-Read-Model-Lag"]) >= 0
+
+    loan = client.get(f"/loan/accounts/{loan_id}", params={"read_model": True}).json()
+    assert loan == client.get(f"/loan/accounts/{loan_id}").json()
+    assert loan["outstanding_principal"] == "400.00"
+
+    listing = client.get("/deposit/accounts", params={"read_model": True}).json()
+    assert account_id in {item["id"] for item in listing["items"]}
@@ -0,0 +1,52 @@
+def test_reconciliation_reports_balance_breaks():
+    from fastapi.testclient import TestClient
+
+    from app.db import SessionLocal
+    from app.main import app
+    from app.models import DepositAccount
+
+    client = TestClient(app)
+    deposit_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    client.post(
+        f"/deposit/accounts/{deposit_id}/deposit",
+        json={"amount": "25.00", "effective_date": "2026-01-02"},
+    )
+    loan_id = client.post(
+        "/loan/accounts",
+        json={"opened_on": "2026-01-01", "principal": "1000.00", "annual_interest_rate": "0.10"},
+    ).json()["id"]
+    client.post(
+        f"/loan/accounts/{loan_id}/repay",
+        json={"amount": "100.00", "effective_date": "2026-01-01"},
+    )
+
+    clean = client.post("/reconciliation/run", json={"workers": 2, "chunk_size": 2}).json()
+    assert clean["status"] == "COMPLETED"
+    assert clean["accounts_checked"] >= 2
+    assert all(b["account_id"] not in (deposit_id, loan_id) for b in clean["items"])
+
+    with SessionLocal() as db:
+        db.get(DepositAccount, deposit_id).current_balance = "30.00"
+        db.commit()
+
+    run = client.post("/reconciliation/run", json={"account_types": ["deposit_account"], "workers": 1}).json()
+    breaks = [b for b in run["items"] if b["account_id"] == deposit_id]
+    assert breaks == [
+        {
+            "account_type": "deposit_account",
+            "account_id": deposit_id,
+            "stored_balance": "30.00",
+            "ledger_balance": "25.00",
+            "difference": "5.00",
+        }
+    ]
+    assert client.get(f"/reconciliation/runs/{run['id']}").json()["breaks"] == run["breaks"]
+
+    with SessionLocal() as db:
+        db.get(DepositAccount, deposit_id).current_balance = "25.00"
+        db.commit()
+
+    assert client.post("/reconciliation/run", json={"account_types": ["cards"]}).status_code == 400
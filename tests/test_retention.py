@@ -0,0 +1,113 @@
+import uuid
+
+
+def test_retention_archives_and_restores_history(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path / "archive"))
+    client = TestClient(app)
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.05"},
+    ).json()["id"]
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "10.00", "effective_date": "2026-01-02"},
+    )
+    client.post("/outbox/dispatch", json={"max_messages": 500})
+
+    run = client.post("/retention/run", json={"retention_days": 0, "batch_size": 2})
+    assert run.status_code == 200
+    archived = run.json()["archived"]
+    assert archived["outbox_messages"] >= 2
+    assert archived["domain_events"] >= 1
+
+    hot = client.get("/outbox/messages", params={"aggregate_id": account_id}).json()
+    assert hot["total"] == 0
+
+    events = client.get("/archive/domain_events", params={"aggregate_id": account_id}).json()["items"]
+    assert {e["event_type"] for e in events} <= {"DEPOSIT_ACCOUNT_OPENED", "DEPOSIT_POSTED"}
+    assert events
+
+    restored = client.post(
+        "/archive/domain_events/restore",
+        json={"filters": {"aggregate_id": account_id}},
+    )
+    assert restored.json()["restored"] == len(events)
+    again = client.post(
+        "/archive/domain_events/restore",
+        json={"filters": {"aggregate_id": account_id}},
+    )
+    assert again.json()["restored"] == 0
+    assert client.get("/events", params={"aggregate_id": account_id}).json()["total"] == len(events)
+
+    assert client.post("/retention/run", json={"tables": ["ledger_entries"]}).status_code == 400
+
+
+def test_idempotent_retry_after_events_are_archived(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path / "archive"))
+    client = TestClient(app)
+
+    key = f"open-{uuid.uuid4().hex}"
+    opened = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00", "idempotency_key": key},
+    ).json()["id"]
+    deposit = {"amount": "25.00", "effective_date": "2026-01-02", "idempotency_key": f"dep-{key}"}
+    client.post(f"/deposit/accounts/{opened}/deposit", json=deposit)
+    client.post("/outbox/dispatch", json={"max_messages": 500})
+
+    archived = client.post("/retention/run", json={"retention_days": 0}).json()["archived"]
+    assert archived["domain_events"] >= 2
+    assert client.get("/events", params={"aggregate_id": opened}).json()["total"] == 0
+
+    retried = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00", "idempotency_key": key},
+    ).json()["id"]
+    assert retried == opened
+    client.post(f"/deposit/accounts/{opened}/deposit", json=deposit)
+    assert client.get(f"/deposit/accounts/{opened}").json()["current_balance"] == "25.00"
+
+
+def test_retention_keeps_queue_messages_the_projection_has_not_applied(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.db import SessionLocal
+    from app.main import app
+    from app.models import QueueMessage
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "archive_dir", str(tmp_path / "archive"))
+    client = TestClient(app)
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.05"},
+    ).json()["id"]
+    for day in (2, 3, 4):
+        client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "10.00", "effective_date": f"2026-01-0{day}"},
+        )
+    client.post("/outbox/dispatch", json={"max_messages": 500})
+    assert client.post("/read-model/project", json={"max_messages": 2}).json()["applied"] == 2
+
+    archived = client.post(
+        "/retention/run", json={"retention_days": 0, "tables": ["queue_messages"]}
+    ).json()["archived"]
+    assert archived["queue_messages"] == 2
+    with SessionLocal() as db:
+        assert [m.offset for m in db.query(QueueMessage).order_by(QueueMessage.offset)] == [2, 3]
+
+    client.post("/read-model/project", json={"max_messages": 500})
+    assert client.get(f"/deposit/accounts/{account_id}", params={"read_model": True}).json()["current_balance"] == "30.00"
@@ -0,0 +1,45 @@
+import datetime as dt
+
+
+def test_simulation_drives_services_on_a_simulated_clock():
+    from app.db import SessionLocal
+    from app.models import DepositAccount, DomainEvent
+    from app.simulation import run_simulation
+    from app.time import as_utc, utcnow
+
+    reported = []
+    results = run_simulation(
+        start=dt.date(2021, 1, 20),
+        days=15,
+        deposits=3,
+        loans=1,
+        activity=0.5,
+        seed=7,
+        growth_every=10,
+        report=reported.append,
+    )
+
+    assert reported == results
+    assert [r["day"] for r in results] == [(dt.date(2021, 1, 20) + dt.timedelta(days=i)).isoformat() for i in range(15)]
+    assert all(r["wall_ms"] >= 0 and r["operations"] >= 4 for r in results)
+    month_end = next(r for r in results if r["day"] == "2021-01-31")
+    assert month_end["operations"] >= 8
+    assert "rows" not in results[0]
+    assert results[9]["rows"]["ledger_entries"] > 0
+    assert results[-1]["rows"]["domain_events"] >= results[9]["rows"]["domain_events"]
+
+    assert utcnow().year > 2021
+    with SessionLocal() as db:
+        account_ids = [
+            account_id
+            for (account_id,) in db.query(DepositAccount.id).filter(DepositAccount.opened_on == dt.date(2021, 1, 20))
+        ]
+        assert len(account_ids) == 3
+        latest = (
+            db.query(DomainEvent.event_time)
+            .filter(DomainEvent.aggregate_id.in_(account_ids))
+            .order_by(DomainEvent.event_time.desc())
+            .limit(1)
+            .scalar()
+        )
+        assert as_utc(latest).date() == dt.date(2021, 2, 3)
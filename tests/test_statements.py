@@ -0,0 +1,60 @@
+import gzip
+import json
+import os
+
+
+def test_statements_are_sharded_with_opening_and_closing_balances(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "statement_dir", str(tmp_path / "statements"))
+    client = TestClient(app)
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2030-11-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    client.post(f"/deposit/accounts/{account_id}/deposit", json={"amount": "100.00", "effective_date": "2030-11-15"})
+    client.post(f"/deposit/accounts/{account_id}/deposit", json={"amount": "40.00", "effective_date": "2030-12-03"})
+    client.post(f"/deposit/accounts/{account_id}/withdraw", json={"amount": "15.00", "effective_date": "2030-12-20"})
+    client.post(f"/deposit/accounts/{account_id}/deposit", json={"amount": "5.00", "effective_date": "2031-01-02"})
+
+    loan_id = client.post(
+        "/loan/accounts",
+        json={"opened_on": "2030-12-01", "principal": "500.00", "annual_interest_rate": "0.00", "day_count_basis": 365},
+    ).json()["id"]
+
+    for workers in (1, 2):
+        r = client.post(
+            "/statements/run",
+            json={"period_start": "2030-12-01", "period_end": "2030-12-31", "shard_size": 1, "workers": workers},
+        )
+        assert r.status_code == 200
+        manifest = r.json()
+
+        statements = {}
+        for shard in manifest["shards"]:
+            assert shard["accounts"] == 1
+            with gzip.open(os.path.join(manifest["output_dir"], shard["file"]), "rt", encoding="utf-8") as f:
+                for line in f:
+                    statement = json.loads(line)
+                    statements[statement["account_id"]] = statement
+        assert len(statements) == manifest["accounts"]
+
+        with open(os.path.join(manifest["output_dir"], "manifest.json"), encoding="utf-8") as f:
+            assert json.load(f)["shards"] == manifest["shards"]
+
+        deposit = statements[account_id]
+        assert deposit["opening_balance"] == "100.00"
+        assert [t["running_balance"] for t in deposit["transactions"]] == ["140.00", "125.00"]
+        assert deposit["closing_balance"] == "125.00"
+        assert deposit["interest_posted"] == "0.00"
+
+        loan = statements[loan_id]
+        assert loan["opening_balance"] == "0.00"
+        assert loan["closing_balance"] == "500.00"
+
+    r = client.post("/statements/run", json={"period_start": "2030-12-31", "period_end": "2030-12-01"})
+    assert r.status_code == 400
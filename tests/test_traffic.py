@@ -0,0 +1,52 @@
+import json
+
+
+def test_capture_records_traffic_and_replay_remaps_created_ids(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.capture import writer
+    from app.main import app
+    from app.replay import load_capture, replay
+    from app.settings import settings
+
+    capture_path = tmp_path / "traffic.jsonl"
+    monkeypatch.setattr(settings, "traffic_capture_path", str(capture_path))
+    client = TestClient(app)
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.00"},
+    ).json()["id"]
+    for _ in range(2):
+        client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "3.00", "effective_date": "2026-01-02", "idempotency_key": f"cap-{account_id}"},
+        )
+    client.get(f"/deposit/accounts/{account_id}")
+
+    monkeypatch.setattr(settings, "traffic_capture_path", None)
+    writer.close()
+
+    records = load_capture(str(capture_path))
+    assert [(r["method"], r["status"]) for r in records] == [("POST", 200), ("POST", 200), ("POST", 200), ("GET", 200)]
+    assert records[0]["response_id"] == account_id
+    assert json.loads(records[1]["body"])["amount"] == "3.00"
+    assert all(r["duration_ms"] >= 0 for r in records)
+
+    before = client.get("/deposit/accounts").json()["total"]
+    report = replay(
+        records,
+        client_factory=lambda: TestClient(app, raise_server_exceptions=False),
+        speed=None,
+        concurrency=4,
+    )
+    assert report["requests"] == 4
+    assert report["errors"] == 0
+    assert report["status"] == {"2xx": 4}
+    assert report["latency_ms"]["p50"] is not None
+
+    accounts = client.get("/deposit/accounts", params={"limit": 1}).json()
+    assert accounts["total"] == before + 1
+    assert accounts["items"][0]["id"] != account_id
+    assert accounts["items"][0]["current_balance"] == "3.00"
+    assert client.get(f"/deposit/accounts/{account_id}").json()["current_balance"] == "3.00"
@@ -0,0 +1,226 @@
+import json
+
+import httpx
+
+
+def test_batched_webhook_delivery(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services import outbox
+
+    requests: list[list[dict]] = []
+    rejected: set[str] = set()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        batch = json.loads(request.content)
+        requests.append(batch)
+        results = [
+            {"event_id": e["event_id"], "status": "error" if e["event_id"] in rejected else "ok"}
+            for e in batch
+        ]
+        return httpx.Response(200, json={"results": results})
+
+    monkeypatch.setattr(outbox, "_http_client", lambda: httpx.Client(transport=httpx.MockTransport(handler)))
+    client = TestClient(app)
+
+    client.post("/outbox/dispatch", json={"max_messages": 500})
+    sub = client.post(
+        "/webhooks/subscriptions",
+        json={"target_url": "http://subscriber.test/hook", "batch_max_size": 10},
+    ).json()
+    assert sub["batch_max_size"] == 10
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.05"},
+    ).json()["id"]
+    for i in range(3):
+        client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "10.00", "effective_date": "2026-01-02"},
+        )
+    events = client.get("/events", params={"aggregate_id": account_id}).json()["items"]
+    rejected.add(events[0]["id"])
+
+    results = client.post("/outbox/dispatch", json={"max_messages": 500}).json()["results"]
+    assert len(requests) == 1
+    assert len(requests[0]) == 4
+    webhook_results = [r for r in results if r["destination"] == f"webhook:{sub['id']}"]
+    assert sorted(r["status"] for r in webhook_results) == ["RETRY", "SENT", "SENT", "SENT"]
+
+    client.patch(f"/webhooks/subscriptions/{sub['id']}", json={"batch_linger_ms": 60000})
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "10.00", "effective_date": "2026-01-03"},
+    )
+    dispatched = client.post("/outbox/dispatch", json={"max_messages": 500}).json()
+    results = dispatched["results"]
+    assert len(requests) == 1
+    assert [r["status"] for r in results if r["destination"] == f"webhook:{sub['id']}"] == ["LINGER"]
+    assert dispatched["lingering"] == 1
+    assert dispatched["processed"] == len(results) - 1
+
+    from app.db import SessionLocal
+    from app.models import OutboxMessage, WebhookSubscription
+    from app.time import utcnow
+
+    client.patch(f"/webhooks/subscriptions/{sub['id']}", json={"batch_linger_ms": 0})
+    client.post(
+        f"/deposit/accounts/{account_id}/deposit",
+        json={"amount": "10.00", "effective_date": "2026-01-04"},
+    )
+    with SessionLocal() as db:
+        pending = (
+            db.query(OutboxMessage)
+            .filter(OutboxMessage.destination == f"webhook:{sub['id']}")
+            .filter(OutboxMessage.status == "PENDING")
+            .order_by(OutboxMessage.id.asc())
+            .all()
+        )
+        lingering, exhausted = pending[-2:]
+        lingering_id = lingering.id
+        exhausted.attempts = exhausted.max_attempts
+        db.flush()
+        with httpx.Client(transport=httpx.MockTransport(handler)) as http:
+            sent = outbox._dispatch_batched(
+                db, db.get(WebhookSubscription, sub["id"]), [lingering], client=http, now=utcnow()
+            )
+        db.commit()
+    assert [r["id"] for r in sent] == [lingering_id]
+    assert len(requests[-1]) == 1
+
+    disabled = client.patch(f"/webhooks/subscriptions/{sub['id']}", json={"enabled": False})
+    assert disabled.json()["enabled"] is False
+
+
+def test_circuit_breaker_skips_unhealthy_subscription(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services import outbox
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "circuit_min_samples", 3)
+    calls: list[str] = []
+    healthy = {"value": False}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        return httpx.Response(200 if healthy["value"] else 503)
+
+    monkeypatch.setattr(outbox, "_http_client", lambda: httpx.Client(transport=httpx.MockTransport(handler)))
+    client = TestClient(app)
+
+    client.post("/outbox/dispatch", json={"max_messages": 500})
+    sub = client.post("/webhooks/subscriptions", json={"target_url": "http://down.test/hook"}).json()
+    destination = f"webhook:{sub['id']}"
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.05"},
+    ).json()["id"]
+    for _ in range(5):
+        client.post(
+            f"/deposit/accounts/{account_id}/deposit",
+            json={"amount": "1.00", "effective_date": "2026-01-02"},
+        )
+
+    results = client.post("/outbox/dispatch", json={"max_messages": 500}).json()["results"]
+    statuses = [r["status"] for r in results if r["destination"] == destination]
+    assert statuses == ["RETRY", "RETRY", "RETRY", "CIRCUIT_OPEN", "CIRCUIT_OPEN", "CIRCUIT_OPEN"]
+    assert len(calls) == 3
+
+    health = client.get(f"/webhooks/subscriptions/{sub['id']}/health").json()
+    assert health["circuit_state"] == "OPEN"
+    assert health["error_rate"] == 1.0
+
+    results = client.post("/outbox/dispatch", json={"max_messages": 500}).json()["results"]
+    assert all(r["destination"] != destination for r in results)
+    assert len(calls) == 3
+
+    from app.db import SessionLocal
+    from app.models import WebhookSubscriptionHealth
+    from app.time import utcnow
+
+    with SessionLocal() as db:
+        db.get(WebhookSubscriptionHealth, sub["id"]).next_probe_at = utcnow()
+        db.commit()
+
+    healthy["value"] = True
+    results = client.post("/outbox/dispatch", json={"max_messages": 500}).json()["results"]
+    assert [r["status"] for r in results if r["destination"] == destination] == ["SENT", "SENT", "SENT"]
+    assert client.get(f"/webhooks/subscriptions/{sub['id']}/health").json()["circuit_state"] == "CLOSED"
+
+
+def test_subscription_filters_limit_outbox_fan_out():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+
+    sub = client.post(
+        "/webhooks/subscriptions",
+        json={
+            "target_url": "http://filtered.test/hook",
+            "event_types": ["WITHDRAWAL_POSTED"],
+            "aggregate_types": ["deposit_account"],
+        },
+    ).json()
+    assert sub["event_types"] == ["WITHDRAWAL_POSTED"]
+    destination = f"webhook:{sub['id']}"
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.05"},
+    ).json()["id"]
+    client.post(f"/deposit/accounts/{account_id}/deposit", json={"amount": "10.00", "effective_date": "2026-01-02"})
+    client.post(f"/deposit/accounts/{account_id}/withdraw", json={"amount": "4.00", "effective_date": "2026-01-03"})
+    client.post(f"/deposit/accounts/{account_id}/accrue", json={"as_of_date": "2026-01-10"})
+
+    def fanned_out() -> list[str]:
+        event_types = {
+            e["id"]: e["event_type"]
+            for e in client.get("/events", params={"aggregate_id": account_id}).json()["items"]
+        }
+        items = client.get(
+            "/outbox/messages",
+            params={"aggregate_id": account_id, "destination": destination},
+        ).json()["items"]
+        return sorted(event_types[m["event_id"]] for m in items)
+
+    assert fanned_out() == ["WITHDRAWAL_POSTED"]
+    queued = client.get("/outbox/messages", params={"aggregate_id": account_id, "destination": "queue:domain_events"})
+    assert queued.json()["total"] == 4
+
+    r = client.patch(f"/webhooks/subscriptions/{sub['id']}", json={"event_types": None})
+    assert r.json()["event_types"] is None
+    for field in ("enabled", "target_url", "batch_max_size", "batch_linger_ms"):
+        assert client.patch(f"/webhooks/subscriptions/{sub['id']}", json={field: None}).status_code == 422
+    assert client.patch(f"/webhooks/subscriptions/{sub['id']}", json={}).json()["enabled"] is True
+    client.post(f"/deposit/accounts/{account_id}/deposit", json={"amount": "1.00", "effective_date": "2026-01-11"})
+    assert fanned_out() == ["DEPOSIT_POSTED", "WITHDRAWAL_POSTED"]
+
+    assert client.post(
+        "/webhooks/subscriptions", json={"target_url": "http://filtered.test/hook", "event_types": []}
+    ).status_code == 422
+
+
+def test_queue_outbox_rows_can_be_turned_off(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.settings import settings
+
+    monkeypatch.setattr(settings, "queue_enabled", False)
+    client = TestClient(app)
+
+    account_id = client.post(
+        "/deposit/accounts",
+        json={"opened_on": "2026-01-01", "annual_interest_rate": "0.05"},
+    ).json()["id"]
+    client.post(f"/deposit/accounts/{account_id}/deposit", json={"amount": "10.00", "effective_date": "2026-01-02"})
+
+    assert client.get("/events", params={"aggregate_id": account_id}).json()["total"] == 2
+    assert client.get("/outbox/messages", params={"aggregate_id": account_id}).json()["total"] == 0